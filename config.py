@@ -19,3 +19,127 @@ AUDIO_SHARE_PORT = 9092
 AUDIO_SAMPLE_RATE = 48000
 AUDIO_CHANNELS = 2
 AUDIO_CHUNK_SIZE = 1024  # ~21ms buffering at 48kHz (lower lag; was 2048 ≈ 43ms)
+
+# Silence gate for the audio stream: while the capture stays below both thresholds
+# nothing is sent except a tiny keep-alive frame every AUDIO_KEEPALIVE_INTERVAL s.
+AUDIO_SILENCE_GATE = True
+AUDIO_SILENCE_RMS_DBFS = -65.0   # gate opens when chunk RMS is above this
+AUDIO_SILENCE_PEAK_DBFS = -50.0  # ...or when any single sample peaks above this
+AUDIO_SILENCE_HANG_MS = 300      # keep sending this long after sound stops (don't clip tails)
+AUDIO_KEEPALIVE_INTERVAL = 1.0   # seconds between keep-alive frames while suppressed
+
+# Alerts live-audio playback (phone -> Mac): adaptive jitter buffer in front of the
+# dedicated playback thread.
+ALERTS_JITTER_TARGET_MS = 100      # pre-buffer before playback starts (and the adaptive floor)
+ALERTS_JITTER_MAX_TARGET_MS = 300  # ceiling the target can grow to after underruns
+ALERTS_JITTER_MAX_MS = 600         # buffered audio beyond this is dropped (overrun)
+
+# Alerts live-audio recording (~/Desktop/intruders/streams)
+ALERTS_RECORDING_MAX_SECONDS = 600    # rotate to a new file after this long...
+ALERTS_RECORDING_MAX_MB = 50          # ...or this size
+ALERTS_RECORDING_IDLE_SECONDS = 30    # finalize the file after this long without audio
+ALERTS_RECORDING_COMPRESS = ""        # "" (keep WAV), "flac" or "aac" — via macOS afconvert
+ALERTS_RECORDING_DIR_MAX_MB = 1024    # oldest recordings are pruned beyond this total
+
+# Alert clip library: named deterrent sounds decoded once and played from memory
+ALERT_CLIPS_DIR = os.path.expanduser("~/Desktop/intruders/clips")
+ALERT_CLIP_CACHE_MB = 64            # LRU cap on decoded PCM held in memory
+ALERT_CLIP_SAMPLE_RATE = 48000      # clips are resampled to this once, at load time
+ALERT_CLIP_FRAMES_PER_BUFFER = 256  # ~5ms output callback period -> trigger-to-sound latency
+ALERT_CLIP_IDLE_STOP = 60           # seconds of silence before the clip output stream is paused
+# Decode every clip and open the output stream when the app starts (off for replay_input.py)
+ALERT_CLIP_PRELOAD = os.environ.get('ALERT_CLIP_PRELOAD', '1') != '0'
+
+# Intruder captures (/system/capture-and-lock): one session_<timestamp> dir each
+INTRUDERS_DIR = os.path.expanduser("~/Desktop/intruders")
+# Gallery thumbnails: name -> longest edge in px, cached under <session>/thumbs/
+INTRUDER_THUMB_SIZES = {"small": 160, "medium": 480, "large": 1280}
+INTRUDER_THUMB_QUALITY = 80   # JPEG quality
+INTRUDER_THUMB_WORKERS = 2
+INTRUDER_THUMB_WAIT = 5.0     # s a thumbnail request waits for generation before 503
+
+# Spoken announcements (keyboard/mouse lock) — one speech worker owns the TTS engine
+SPEECH_VOICE = 'com.apple.voice.compact.en-AU.Karen'
+SPEECH_RATE = 100       # words per minute
+SPEECH_QUEUE_MAX = 3    # pending phrases kept; older ones are dropped
+SPEECH_CACHE_DIR = os.path.expanduser("~/Library/Caches/MacPyCtrl/speech")
+
+# Mouse WebSocket (/system/mouse_ws): queued move/scroll deltas are summed and
+# injected at most once per tick; clicks/presses flush them first to keep order.
+MOUSE_WS_TICK_MS = 8      # ~125 injections/s max
+MOUSE_WS_MAX_BATCH = 256  # messages drained per read before injecting
+
+# Key/combo injection for /system/pressKey, input_ws and brightness keys:
+# auto (native Quartz CGEvent posting, else osascript) | quartz | osascript | fake
+KEY_INJECTION_BACKEND = os.environ.get('KEY_INJECTION_BACKEND', 'auto').lower()
+
+# Remote typing (/system/keyboardType): "paste" mode puts the text on the clipboard
+# and sends cmd+v; "background" mode types it in rate-limited chunks on the input
+# worker, with progress and a cancel endpoint.
+KEYBOARD_PASTE_RESTORE_DELAY = 0.5  # s to wait before restoring the old clipboard (the paste is async)
+KEYBOARD_TYPE_CHUNK_CHARS = 32      # characters injected per chunk
+KEYBOARD_TYPE_CHARS_PER_SEC = 200   # background typing rate limit
+
+# Server-side input macros (/system/macro/*): saved macros live in this JSON file
+MACROS_FILE = "macros.json"
+MACRO_MAX_STEPS = 200
+MACRO_MAX_WAIT_MS = 30000  # longest single wait step
+
+# Primary display geometry cache (tap-to-click, mouse_ws absolute moves, screen
+# streams): re-read on a display reconfiguration, or at most this often.
+DISPLAY_GEOMETRY_TTL = 5.0
+
+# Input session recording (/system/input/record/*) for replay_input.py benchmarks
+INPUT_SESSIONS_DIR = os.path.expanduser("~/Library/Application Support/MacPyCtrl/input_sessions")
+INPUT_SESSION_MAX_EVENTS = 500000  # recording stops by itself beyond this
+
+# AppleScript execution (media volume/status, osascript key fallback):
+# auto/persistent (warm osascript workers reusing compiled scripts) | osascript
+# (one process per call) | fake
+APPLESCRIPT_BACKEND = os.environ.get('APPLESCRIPT_BACKEND', 'auto').lower()
+APPLESCRIPT_WORKERS = 3      # concurrent scripts (one warm worker process each)
+APPLESCRIPT_TIMEOUT = 5.0    # s per call; a persistent worker that overruns is restarted
+
+# Volume / display brightness / keyboard backlight get+set:
+# auto (frameworks loaded once per process, osascript for anything unavailable) |
+# native | osascript | fake
+NATIVE_CONTROLS_BACKEND = os.environ.get('NATIVE_CONTROLS_BACKEND', 'auto').lower()
+
+# Slider setters (/media/volume-set, /system/keyboard-light-set, /system/brightness-set):
+# only the latest requested value is applied, at most once per this many seconds
+SLIDER_MIN_INTERVAL = 0.1
+
+# Command dispatcher for non-input OS-action routes (media keys, mute, brightness
+# keys, lock, sleep); input injections run on the input worker instead. Lanes in
+# priority order, each with a cap on how many workers it may occupy at once, so
+# a slow lock/sleep can never hold up media keys.
+COMMAND_WORKERS = 3
+COMMAND_LANE_LIMITS = {"media": 2, "housekeeping": 1}
+COMMAND_SYNC_TIMEOUT = 5.0   # s a synchronous request waits before answering 202 + job id
+COMMAND_JOB_HISTORY = 200    # finished jobs kept for /system/jobs/<id>
+
+# /media/status: the assembled result is shared by concurrent pollers for this long
+MEDIA_STATUS_TTL = 1.0
+
+# /system/snapshot: per-field cache TTLs (s) and how long the endpoint waits for
+# slow probes before answering with what it has
+SNAPSHOT_BATTERY_TTL = 30.0
+SNAPSHOT_DEVICES_TTL = 5.0
+SNAPSHOT_STREAMS_TTL = 2.0
+SNAPSHOT_TIMEOUT = 0.5
+
+# State push (/system/state/stream, Server-Sent Events): seconds between samples
+# per source. A source is only sampled while at least one client subscribes to it,
+# and only changed values are pushed.
+STATE_PUSH_INTERVALS = {
+    "battery": 60.0,
+    "media": 2.0,
+    "devices": 10.0,
+    "streams": 5.0,
+}
+STATE_PUSH_KEEPALIVE = 15.0  # s between SSE comment lines on a quiet stream
+
+# System stats (/system/stats): sampled in the background, served from memory
+STATS_SAMPLE_INTERVAL = 2.0    # s between samples
+STATS_HISTORY_SECONDS = 3600   # ring buffer length
+STATS_PROVIDER = os.environ.get('STATS_PROVIDER', 'auto').lower()  # auto | psutil | proc | macos
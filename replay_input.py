@@ -0,0 +1,417 @@
+"""
+Input session replay benchmark.
+
+Replays a session recorded with POST /system/input/record/start + /stop (a JSONL
+log of mouse_ws, input_ws and keyboardType/pressKey traffic) against an
+in-process copy of the server whose pynput controllers, clipboard and key
+injection / AppleScript / native-controls backends are all fakes, with the alert
+clip preload off — nothing touches the real keyboard, pointer, clipboard or audio
+devices, so it also runs on Linux.
+
+Reports achieved events/s, end-to-end latency percentiles (client send ->
+fake injection for pointer buttons, send -> reply for input_ws and HTTP), the
+server's own input_metrics histograms, and dropped/reordered events.
+
+Usage:
+    python replay_input.py SESSION.jsonl [--speed 4] [--json]
+"""
+
+import argparse
+import base64
+import json
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+import types
+import urllib.request
+
+# ---------------------------------------------------------------------------
+# Fake pynput, installed before any src import so every controller gets it
+# ---------------------------------------------------------------------------
+
+injections = []  # (perf_counter, op, arg) in injection order
+_injections_lock = threading.Lock()
+
+
+def _injected(op, arg=None):
+    with _injections_lock:
+        injections.append((time.perf_counter(), op, arg))
+
+
+def reset_injections():
+    """Forget the fake injections recorded so far."""
+    with _injections_lock:
+        injections.clear()
+
+
+def injected_ops():
+    """(op, arg) of every fake injection so far, in injection order."""
+    with _injections_lock:
+        return [(op, arg) for _, op, arg in injections]
+
+
+class _Names:
+    """Stands in for pynput's Key/Button enums: any attribute is its own name."""
+
+    def __getattr__(self, name):
+        return name
+
+
+class _FakeKeyboard:
+    def press(self, key):
+        _injected("key_down", key)
+
+    def release(self, key):
+        _injected("key_up", key)
+
+    def type(self, text):
+        _injected("type", text)
+
+
+class _FakeMouse:
+    def __init__(self):
+        self._position = (0, 0)
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        self._position = value
+        _injected("moveto", value)
+
+    def move(self, dx, dy):
+        _injected("move", (dx, dy))
+
+    def scroll(self, dx, dy):
+        _injected("scroll", (dx, dy))
+
+    def click(self, button, count=1):
+        _injected("click", button)
+
+    def press(self, button):
+        _injected("down", button)
+
+    def release(self, button):
+        _injected("up", button)
+
+
+class _FakeListener:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+def install_fake_pynput():
+    pynput = types.ModuleType("pynput")
+    keyboard = types.ModuleType("pynput.keyboard")
+    mouse = types.ModuleType("pynput.mouse")
+    keyboard.Key, keyboard.Controller, keyboard.Listener = _Names(), _FakeKeyboard, _FakeListener
+    mouse.Button, mouse.Controller, mouse.Listener = _Names(), _FakeMouse, _FakeListener
+    pynput.keyboard, pynput.mouse = keyboard, mouse
+    sys.modules.update({"pynput": pynput, "pynput.keyboard": keyboard, "pynput.mouse": mouse})
+
+
+_clipboard_text = ""
+
+
+def _get_clipboard():
+    return _clipboard_text
+
+
+def _set_clipboard(text):
+    global _clipboard_text
+    _clipboard_text = str(text)
+
+
+def install_fake_clipboard():
+    """Swap pbcopy/pbpaste for an in-memory clipboard (paste-mode typing).
+    Call before anything imports src.controllers."""
+    from src.utils import clipboard
+    clipboard.get_clipboard, clipboard.set_clipboard = _get_clipboard, _set_clipboard
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+
+    def pick(q):
+        return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+    return {
+        "count": len(values),
+        "p50_ms": pick(0.50),
+        "p90_ms": pick(0.90),
+        "p99_ms": pick(0.99),
+        "max_ms": round(values[-1], 3),
+    }
+
+
+def load_session(path):
+    """Recorded events grouped by connection: {conn: {"ch", "proto", "events": [...]}}."""
+    connections = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            conn = connections.setdefault(entry["conn"], {"ch": entry["ch"], "proto": "json", "events": []})
+            if "proto" in entry:
+                conn["proto"] = entry["proto"]
+            conn["events"].append(entry)
+    return connections
+
+
+class Replay:
+    def __init__(self, base_url, token, speed):
+        self.base_url = base_url
+        self.token = token
+        self.speed = speed
+        self.start = None
+        self.sent = 0
+        self.button_sends = []  # (perf_counter, op, button) in send order
+        self.move_sent = [0, 0]
+        self.ws_sends = {}  # input_ws id -> perf_counter
+        self.ws_replies = []  # (id, perf_counter, status)
+        self.http_latency_ms = []
+        self.http_errors = 0
+        self._lock = threading.Lock()
+
+    def _wait_until(self, t):
+        delay = self.start + t / self.speed - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _ws_url(self, path, **params):
+        query = "&".join(f"{k}={v}" for k, v in {"token": self.token, **params}.items())
+        return f"{self.base_url.replace('http', 'ws', 1)}{path}?{query}"
+
+    def run_mouse(self, conn):
+        import simple_websocket
+        from src.controllers.mouse_controller import BIN_RECORD, BIN_OPCODES, BIN_BUTTONS, BIN_OP_TIMESTAMP
+
+        binary = conn["proto"] == "bin"
+        ws = simple_websocket.Client.connect(self._ws_url("/system/mouse_ws", **({"proto": "bin"} if binary else {})))
+        if binary:
+            ws.receive(timeout=5)  # {"proto": "bin"} ack
+        try:
+            for event in conn["events"]:
+                self._wait_until(event["t"])
+                now_ms = time.time() * 1000
+                if "bin" in event:
+                    raw = base64.b64decode(event["bin"])
+                    records = [(BIN_OPCODES.get(op), BIN_BUTTONS.get(b), dx, dy)
+                               for op, b, dx, dy in BIN_RECORD.iter_unpack(raw) if op != BIN_OP_TIMESTAMP]
+                    low32 = int(now_ms) % 2**32
+                    payload = struct.pack("<BBHH", BIN_OP_TIMESTAMP, 0, low32 & 0xFFFF, low32 >> 16) + raw
+                else:
+                    msg = json.loads(event["text"])
+                    records = [(msg.get("t"), msg.get("b") or "left", msg.get("dx", 0), msg.get("dy", 0))]
+                    msg["ts"] = now_ms
+                    payload = json.dumps(msg)
+                sent_at = time.perf_counter()
+                ws.send(payload)
+                with self._lock:
+                    for t, b, dx, dy in records:
+                        self.sent += 1
+                        if t == "move":
+                            self.move_sent[0] += dx
+                            self.move_sent[1] += dy
+                        elif t in ("click", "down", "up"):
+                            self.button_sends.append((sent_at, t, b or "left"))
+        finally:
+            ws.close()
+
+    def run_input_ws(self, conn):
+        import simple_websocket
+
+        ws = simple_websocket.Client.connect(self._ws_url("/system/input_ws"))
+        expected = 0
+
+        def receive_replies():
+            while True:
+                try:
+                    raw = ws.receive(timeout=10)
+                except Exception:
+                    return
+                if raw is None:
+                    return
+                reply = json.loads(raw)
+                with self._lock:
+                    self.ws_replies.append((reply.get("id"), time.perf_counter(), reply.get("status")))
+
+        receiver = threading.Thread(target=receive_replies, daemon=True)
+        receiver.start()
+        try:
+            for event in conn["events"]:
+                self._wait_until(event["t"])
+                msg = json.loads(event["text"])
+                with self._lock:
+                    self.sent += 1
+                    event_id = f"{id(conn)}-{expected}"
+                    self.ws_sends[event_id] = time.perf_counter()
+                msg["id"], msg["ts"] = event_id, time.time() * 1000
+                ws.send(json.dumps(msg))
+                expected += 1
+            # Give the worker time to answer everything before closing
+            deadline = time.perf_counter() + 10
+            while time.perf_counter() < deadline:
+                with self._lock:
+                    if len([r for r in self.ws_replies if str(r[0]).startswith(f"{id(conn)}-")]) >= expected:
+                        break
+                time.sleep(0.01)
+        finally:
+            ws.close()
+
+    def run_http(self, conn):
+        for event in conn["events"]:
+            self._wait_until(event["t"])
+            body = dict(event["body"], ts=time.time() * 1000)
+            req = urllib.request.Request(
+                f"{self.base_url}{event['path']}", data=json.dumps(body).encode(), method="POST",
+                headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.token}"},
+            )
+            sent_at = time.perf_counter()
+            with self._lock:
+                self.sent += 1
+            try:
+                urllib.request.urlopen(req, timeout=10).read()
+                with self._lock:
+                    self.http_latency_ms.append((time.perf_counter() - sent_at) * 1000)
+            except Exception:
+                with self._lock:
+                    self.http_errors += 1
+
+    def run(self, connections):
+        runners = {"mouse_ws": self.run_mouse, "input_ws": self.run_input_ws, "http": self.run_http}
+        threads = [threading.Thread(target=runners[c["ch"]], args=(c,), daemon=True)
+                   for c in connections.values() if c["ch"] in runners]
+        self.start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        time.sleep(0.2)  # let the last coalesced mouse tick land
+        return time.perf_counter() - self.start
+
+    def report(self, connections, duration):
+        from src.utils.input_metrics import input_metrics
+
+        recorded = max((e["t"] for c in connections.values() for e in c["events"]), default=0.0)
+        with _injections_lock:
+            done = list(injections)
+
+        # Pointer buttons: matched in order against what was injected
+        buttons = [(t, op, arg) for t, op, arg in done if op in ("click", "down", "up")]
+        sent_seq = [(op, b) for _, op, b in self.button_sends]
+        injected_seq = [(op, str(b)) for _, op, b in buttons]
+        button_latency = [(inj[0] - sent[0]) * 1000 for sent, inj in zip(self.button_sends, buttons)]
+        move_injected = [sum(arg[i] for _, op, arg in done if op == "move") for i in (0, 1)]
+
+        reply_ids = [r[0] for r in self.ws_replies]
+        ws_latency = [(at - self.ws_sends[i]) * 1000 for i, at, _ in self.ws_replies if i in self.ws_sends]
+        sent_order = {i: n for n, i in enumerate(self.ws_sends)}
+        ws_order = [sent_order[i] for i in reply_ids if i in sent_order]
+
+        return {
+            "recorded_s": round(recorded, 3),
+            "replayed_s": round(duration, 3),
+            "speed": self.speed,
+            "events_sent": self.sent,
+            "events_per_sec": round(self.sent / duration, 1) if duration else 0.0,
+            "mouse_ws": {
+                "buttons_sent": len(sent_seq),
+                "buttons_injected": len(injected_seq),
+                "buttons_dropped": max(0, len(sent_seq) - len(injected_seq)),
+                "buttons_reordered": sum(1 for a, b in zip(sent_seq, injected_seq) if a != b),
+                "move_sent": self.move_sent,
+                "move_injected": move_injected,
+                "move_injections": sum(1 for _, op, _ in done if op == "move"),
+                "button_latency": percentiles(button_latency),
+            },
+            "input_ws": {
+                "sent": len(self.ws_sends),
+                "replies": len(self.ws_replies),
+                "dropped": len(set(self.ws_sends) - set(reply_ids)),
+                "reordered": sum(1 for a, b in zip(ws_order, ws_order[1:]) if b < a),
+                "errors": sum(1 for r in self.ws_replies if r[2] != "success"),
+                "latency": percentiles(ws_latency),
+            },
+            "http": {
+                "errors": self.http_errors,
+                "latency": percentiles(self.http_latency_ms),
+            },
+            "server": input_metrics.snapshot()["latency"],
+        }
+
+
+def print_report(report):
+    print(f"Replayed {report['events_sent']} events: {report['recorded_s']}s recorded, "
+          f"{report['replayed_s']}s at {report['speed']}x -> {report['events_per_sec']} events/s")
+    for section in ("mouse_ws", "input_ws", "http"):
+        print(f"\n[{section}]")
+        for key, value in report[section].items():
+            print(f"  {key}: {value}")
+    print("\n[server input_metrics]")
+    for kind, hists in report["server"].items():
+        for name, h in hists.items():
+            if h.get("count"):
+                print(f"  {kind}.{name}: n={h['count']} mean={h['mean_ms']}ms p50<={h['p50_ms']} "
+                      f"p90<={h['p90_ms']} p99<={h['p99_ms']} max={h['max_ms']}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded input session against fake controllers.")
+    parser.add_argument("session", help="JSONL session from /system/input/record")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier (default 1x)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    install_fake_pynput()
+    # Set before config is first imported: every OS-facing backend is a fake, and
+    # registering alerts_bp must not open an audio device to preload clips
+    os.environ["KEY_INJECTION_BACKEND"] = "fake"
+    os.environ["APPLESCRIPT_BACKEND"] = "fake"
+    os.environ["NATIVE_CONTROLS_BACKEND"] = "fake"
+    os.environ["ALERT_CLIP_PRELOAD"] = "0"
+    install_fake_clipboard()
+
+    from werkzeug.serving import make_server
+    from src import app
+    from src.utils.auth_manager import auth_manager
+
+    # Throwaway device token; keep the real auth_data.json untouched
+    auth_manager.data_file_path = os.path.join(tempfile.mkdtemp(), "auth_data.json")
+    token = auth_manager.generate_permanent_token("replay-bench", "replay_input.py")
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    connections = load_session(args.session)
+    replay = Replay(f"http://127.0.0.1:{server.server_port}", token, args.speed)
+    duration = replay.run(connections)
+    report = replay.report(connections, duration)
+    server.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
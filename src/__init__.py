@@ -1,13 +1,24 @@
-from src.server import create_app
 from .utils.logger import setup_logger
 
-app = create_app()
 # Setup default logger
 # logger = setup_logger()
 
+
+def __getattr__(name):
+    # The app is built on first access (`from src import app`), not when the package
+    # is imported: the stream subprocesses import src.utils/src.streams modules and
+    # must not pull in the Flask app, its blueprints and their service singletons.
+    if name == "app":
+        from src.server import create_app
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
+    app = __getattr__("app")
     app.run(
         host=app.config['SERVER_HOST'],
         port=app.config['SERVER_PORT'],
         debug=app.config['DEBUG_MODE']
-    )
\ No newline at end of file
+    )
@@ -1,20 +1,29 @@
 from flask import Blueprint, request, jsonify
+from flask_sock import Sock
 from src.utils import setup_logger
 from datetime import datetime
 from werkzeug.utils import secure_filename
 import subprocess
 import os
 import pyaudio
-import threading
 import numpy as np
-import wave
+import json
+import threading
 import atexit
+from config import ALERT_CLIP_SAMPLE_RATE, ALERT_CLIP_PRELOAD
 from src.utils.auth_manager import auth_manager
+from src.utils.audio_format import parse_format_header
+from src.services.audio_playback import AudioPlayer
+from src.services.audio_recorder import AudioRecorder
+from src.services.alert_clips import ClipLibrary, ClipPlayer, CLIP_NAME_RE
 
 logger = setup_logger()
 
 alerts_bp = Blueprint('alerts', __name__)
 alerts_bp.before_request(auth_manager.auth_middleware())
+# WebSocket routes attach to alerts_bp (bp=...), so they sit behind the same auth
+# middleware; the app-level Sock in server.py never needs to know about them.
+sock = Sock()
 
 @alerts_bp.route('/upload/audio', methods=['POST'])
 def handle_audio_upload():
@@ -61,12 +70,6 @@ def handle_audio_upload():
 
 # Global audio variables
 p = None
-stream = None
-current_file = None
-current_sample_rate = None
-current_channels = None
-playback_lock = threading.Lock()
-file_lock = threading.Lock()
 
 def get_pyaudio():
     """Lazy-initialize PyAudio on first use instead of at module import."""
@@ -75,15 +78,19 @@ def get_pyaudio():
         p = pyaudio.PyAudio()
     return p
 
+# Live playback runs on its own thread behind a jitter buffer; handlers only enqueue.
+player = AudioPlayer(get_pyaudio)
+
 # Configuration
 UPLOAD_DIR = os.path.expanduser("~/Desktop/intruders/streams")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Recording is queued to a writer thread that keeps the WAV open between chunks.
+recorder = AudioRecorder(UPLOAD_DIR)
+
 @alerts_bp.route('/stream/audio', methods=['POST'])
 def handle_audio_stream():
     """Endpoint for receiving real-time audio chunks"""
-    global stream, current_file, current_sample_rate, current_channels
-    
     logger.info("Incoming audio stream request")
 
     # Get audio metadata from headers
@@ -91,84 +98,18 @@ def handle_audio_stream():
         sample_rate = int(request.headers.get('X-Sample-Rate', 44100))
         channels = int(request.headers.get('X-Channels', 1))
         audio_data = request.get_data()
-        
+
+        if sample_rate <= 0 or channels not in (1, 2):
+            return jsonify({'error': 'Unsupported audio format'}), 400
         if not audio_data:
             logger.warning("Empty audio chunk received")
             return jsonify({'error': 'No audio data provided'}), 400
 
-        # Initialize or reconfigure PyAudio stream if needed
-        with playback_lock:
-            if (not stream or 
-                current_sample_rate != sample_rate or 
-                current_channels != channels):
-                
-                if stream:
-                    try:
-                        stream.stop_stream()
-                        stream.close()
-                    except:
-                        logger.warning("Error closing previous stream")
-                    
-                stream = get_pyaudio().open(
-                    format=pyaudio.paInt16,
-                    channels=channels,
-                    rate=sample_rate,
-                    output=True,
-                    frames_per_buffer=1024
-                )
-                current_sample_rate = sample_rate
-                current_channels = channels
-                logger.info(f"New audio stream: {sample_rate}Hz, {channels} channel(s)")
-
-            # Audio processing
-            audio_array = np.frombuffer(audio_data, dtype=np.int16)
-            
-            # Real-time playback
-            try:
-                stream.write(audio_array.tobytes())
-            except Exception as e:
-                logger.error(f"Playback error: {str(e)}")
-                # Try to reinitialize stream on error
-                try:
-                    stream.stop_stream()
-                    stream.close()
-                    stream = get_pyaudio().open(
-                        format=pyaudio.paInt16,
-                        channels=channels,
-                        rate=sample_rate,
-                        output=True,
-                        frames_per_buffer=1024
-                    )
-                except:
-                    logger.error("Failed to recover audio stream")
-
-        # File handling with proper locks
-        with file_lock:
-            try:
-                # Create a new file if necessary
-                if (not current_file or 
-                    current_sample_rate != sample_rate or 
-                    current_channels != channels):
-                    
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    current_file = os.path.join(UPLOAD_DIR, 
-                        f"{timestamp}_{sample_rate}Hz_{channels}ch.wav")
-                    
-                    # Initialize new WAV file
-                    with wave.open(current_file, 'wb') as wf:
-                        wf.setnchannels(channels)
-                        wf.setsampwidth(2)  # 16-bit = 2 bytes
-                        wf.setframerate(sample_rate)
-                        wf.writeframes(audio_array.tobytes())
-                else:
-                    # Append to existing file
-                    with wave.open(current_file, 'ab') as wf:
-                        wf.writeframes(audio_array.tobytes())
-                
-                logger.info(f"Processed {len(audio_data)} bytes to {current_file}")
-            except Exception as e:
-                logger.error(f"File writing error: {str(e)}")
-                return jsonify({"error": f"File writing failed: {str(e)}"}), 500
+        # Audio processing
+        audio_bytes = np.frombuffer(audio_data, dtype=np.int16).tobytes()
+        player.enqueue(audio_bytes, sample_rate, channels)
+
+        filename = recorder.write(audio_bytes, sample_rate, channels)
 
     except Exception as e:
         logger.error(f"Audio processing failed: {str(e)}")
@@ -176,16 +117,173 @@ def handle_audio_stream():
 
     return jsonify({
         'status': 'processed',
-        'filename': os.path.basename(current_file) if current_file else None,
+        'filename': os.path.basename(filename),
         'sample_rate': sample_rate,
         'channels': channels
     }), 200
 
+
+@sock.route('/stream/audio_ws', bp=alerts_bp)
+def audio_stream_ws(ws):
+    """Persistent phone -> Mac live audio: one authenticated socket instead of a POST per chunk.
+
+    Auth runs once, at the handshake (the blueprint middleware, via ?token=).
+    Protocol: a text frame carries the format header, e.g.
+    {"sampleRate": 44100, "channels": 1} (acked with {"status": "ready", ...});
+    every binary frame after it is raw Int16 PCM. Send a new header to switch
+    format mid-stream. A rejected header leaves the previous format in place;
+    audio sent before the first accepted header is dropped (with one error
+    reply). Playback and recording are the same as /stream/audio.
+    """
+    audio_format = None  # (sample_rate, channels) once a header was accepted
+    pending = b""  # partial frame carried over to the next message
+    chunks = 0
+    warned_no_header = False
+    logger.info("Audio ingest WS connected")
+
+    while True:
+        msg = ws.receive()
+        if msg is None:
+            break
+
+        if isinstance(msg, str):
+            try:
+                audio_format = parse_format_header(msg)
+            except ValueError as e:
+                ws.send(json.dumps({"error": f"Invalid format header: {e}"}))
+                continue
+            sample_rate, channels = audio_format
+            pending = b""
+            logger.info(f"Audio ingest format: {sample_rate}Hz, {channels} channel(s)")
+            ws.send(json.dumps({"status": "ready", "sample_rate": sample_rate, "channels": channels}))
+            continue
+
+        if audio_format is None:
+            if not warned_no_header:
+                ws.send(json.dumps({"error": "Send a format header before audio"}))
+                warned_no_header = True
+            continue
+
+        # Only hand whole frames to PyAudio/wave; keep any remainder for the next message.
+        data = pending + msg
+        usable = len(data) - len(data) % (2 * channels)
+        pending = data[usable:]
+        if not usable:
+            continue
+        audio_bytes = data[:usable]
+
+        player.enqueue(audio_bytes, sample_rate, channels)
+        recorder.write(audio_bytes, sample_rate, channels)
+        chunks += 1
+
+    logger.info(f"Audio ingest WS disconnected after {chunks} chunks")
+
+
+@alerts_bp.route('/stream/stats', methods=['POST'])
+def audio_stream_stats():
+    """Live-stream counters: jitter buffer (underruns, overruns, target delay) and recorder."""
+    return jsonify({"status": "success", "playback": player.get_stats(), "recording": recorder.get_stats()})
+
+# Named deterrent clips: decoded to PCM once, played through one warm output stream.
+clips = ClipLibrary()
+clip_player = ClipPlayer(get_pyaudio)
+
+
+def _preload_clips():
+    # Open the output stream now so the first trigger doesn't pay for it
+    try:
+        clip_player.start()
+    except Exception as e:
+        logger.warning(f"Could not open alert clip output stream: {str(e)}")
+    for name in clips.names():
+        try:
+            clips.get(name)
+        except Exception as e:
+            logger.warning(f"Could not preload alert clip '{name}': {str(e)}")
+
+
+@alerts_bp.record_once
+def _start_clip_preload(state):
+    # Preload when the app registers the blueprint, not at import time, so merely
+    # importing this module (tests, tooling) starts no threads.
+    if not ALERT_CLIP_PRELOAD:
+        return
+    threading.Thread(target=_preload_clips, name="alert-clips-preload", daemon=True).start()
+
+
+@alerts_bp.route('/clips/list', methods=['POST'])
+def list_clips():
+    """Available clips (built-in + uploaded) and cache state. Also warms the output stream."""
+    try:
+        clip_player.start()
+        return jsonify({
+            "status": "success",
+            "clips": [{"name": n, "cached": clips.is_cached(n)} for n in clips.names()],
+            "playing": clip_player.playing(),
+            "cache": clips.stats(),
+        })
+    except Exception as e:
+        logger.error(f"Error listing alert clips: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+
+@alerts_bp.route('/clips/<name>/play', methods=['POST'])
+def play_clip(name):
+    """Play a named clip immediately from memory (no file I/O, no process spawn)."""
+    if not CLIP_NAME_RE.match(name):
+        return jsonify({"status": "error", "error": "Invalid clip name"}), 400
+    try:
+        pcm = clips.get(name)
+        if pcm is None:
+            return jsonify({"status": "error", "error": f"Unknown clip: {name}"}), 404
+        clip_player.play(name, pcm)
+        logger.info(f"Alert clip '{name}' triggered")
+        return jsonify({"status": "success", "clip": name})
+    except Exception as e:
+        logger.error(f"Error playing alert clip '{name}': {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+
+@alerts_bp.route('/clips/stop', methods=['POST'])
+def stop_clips():
+    clip_player.stop_all()
+    return jsonify({"status": "success"})
+
+
+@alerts_bp.route('/clips/upload', methods=['POST'])
+def upload_clip():
+    """Add or replace a clip. Multipart: 'audio' file + 'name' field."""
+    name = request.form.get("name", "")
+    if not CLIP_NAME_RE.match(name):
+        return jsonify({"status": "error", "error": "Clip name must be 1-64 of A-Z a-z 0-9 _ -"}), 400
+    if 'audio' not in request.files or request.files['audio'].filename == '':
+        return jsonify({"status": "error", "error": "No audio file provided"}), 400
+    try:
+        pcm = clips.save(name, request.files['audio'])
+        logger.info(f"Alert clip '{name}' saved ({len(pcm)} frames)")
+        return jsonify({"status": "success", "clip": name,
+                        "duration": round(len(pcm) / ALERT_CLIP_SAMPLE_RATE, 2)})
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error saving alert clip '{name}': {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+
+@alerts_bp.route('/clips/delete', methods=['POST'])
+def delete_clip():
+    """Remove an uploaded clip. Body: {"name": "..."}. Built-in clips can't be deleted."""
+    name = (request.get_json(silent=True) or {}).get("name", "")
+    if not isinstance(name, str) or not CLIP_NAME_RE.match(name) or not clips.delete(name):
+        return jsonify({"status": "error", "error": "not found"}), 404
+    logger.info(f"Alert clip '{name}' deleted")
+    return jsonify({"status": "success"})
+
+
 def cleanup_audio():
-    global p, stream
-    if stream:
-        stream.stop_stream()
-        stream.close()
+    player.stop()
+    recorder.stop()
+    clip_player.close()
     if p is not None:
         p.terminate()
     logger.info("Audio resources released")
@@ -0,0 +1,120 @@
+import json
+import time
+from ..utils import setup_logger
+from flask import request
+from src.utils.auth_manager import auth_manager
+from src.services.input_worker import input_worker
+from src.utils.input_metrics import input_metrics, parse_client_ts, wall_ms
+from src.services.input_recorder import session_recorder
+from src.controllers.system_controller import (
+    inject_text, inject_special_key, inject_combo, inject_paste, restore_clipboard_option,
+)
+
+logger = setup_logger()
+
+
+def parse_input_event(msg):
+    """Turn one input message into a zero-arg injection callable (ValueError if invalid).
+
+    {"t": "text", "text": "hello"}                  -> type text
+    {"t": "paste", "text": "long snippet"}          -> clipboard + cmd+v (clipboard restored)
+    {"t": "key", "key": "enter"}                    -> named key (SPECIAL_KEYS)
+    {"t": "combo", "key": "c", "modifiers": ["cmd"]} -> key + modifiers (KEY_CODES / single char)
+    """
+    if not isinstance(msg, dict):
+        raise ValueError("Event must be a JSON object")
+    t = msg.get("t")
+    if t == "text":
+        text = msg.get("text")
+        if not isinstance(text, str):
+            raise ValueError("'text' must be a string")
+        return lambda: inject_text(text)
+    if t == "paste":
+        text = msg.get("text")
+        if not isinstance(text, str):
+            raise ValueError("'text' must be a string")
+        return lambda: inject_paste(text, restore_clipboard_option(msg))
+    if t == "key":
+        key = msg.get("key")
+        if not isinstance(key, str) or not key:
+            raise ValueError("Missing 'key'")
+        return lambda: inject_special_key(key)
+    if t == "combo":
+        key = msg.get("key")
+        modifiers = msg.get("modifiers") or []
+        if not isinstance(key, str) or not key:
+            raise ValueError("Missing 'key'")
+        if not isinstance(modifiers, list):
+            raise ValueError("'modifiers' must be a list")
+        return lambda: inject_combo(key, modifiers)
+    raise ValueError(f"Unknown event type: {t}")
+
+
+def register_input_ws(sock):
+    """Register the /system/input_ws WebSocket on a flask_sock Sock instance."""
+
+    @sock.route("/system/input_ws")
+    def input_ws(ws):
+        """Streamed keyboard input: text, named keys and modifier combos over one socket.
+
+        Each JSON text frame is one event (see parse_input_event), optionally with an
+        "id" and a client send time "ts" (epoch ms). Events are injected in order by the shared input worker; every event
+        is answered with {"id", "status", "queue_ms", "inject_ms", "total_ms"}
+        (or "error"), plus "client_to_server_ms" when "ts" was sent, so the client
+        sees per-event server-side latency.
+        """
+        # Auth via ?token= (a browser WebSocket can't set an Authorization header).
+        token = request.args.get("token", "")
+        _, err = auth_manager.validate_permanent_token(token)
+        if err:
+            logger.info(f"input_ws rejected: {err}")
+            return  # closes the socket
+
+        logger.info("input_ws connected")
+        stats = input_metrics.open_connection("input_ws")
+        try:
+            while True:
+                raw = ws.receive()
+                if raw is None:
+                    break
+                received_at, received_wall = time.perf_counter(), wall_ms()
+                session_recorder.record("input_ws", stats.id, raw, received_at)
+                event_id = client_ts = None
+                try:
+                    msg = json.loads(raw)
+                    if isinstance(msg, dict):
+                        event_id = msg.get("id")
+                        client_ts = parse_client_ts(msg.get("ts"))
+                    action = parse_input_event(msg)
+                except ValueError as e:
+                    # Reported through the worker too: it is the only thread that sends on `ws`
+                    def action(e=e):
+                        raise e
+
+                def on_done(error, timing, event_id=event_id, received_at=received_at,
+                            received_wall=received_wall, client_ts=client_ts):
+                    reply = {"id": event_id, "status": "error" if error else "success", **timing}
+                    if client_ts is not None:
+                        reply["client_to_server_ms"] = round(max(0.0, received_wall - client_ts), 2)
+                    if error:
+                        reply["error"] = str(error)
+                    else:
+                        stats.injections += 1
+                        input_metrics.record(
+                            "input_ws", received_at,
+                            received_at + timing["queue_ms"] / 1000,
+                            received_at + timing["total_ms"] / 1000,
+                            client_ts, received_wall,
+                        )
+                    stats.queue_depth = input_worker.depth()
+                    try:
+                        ws.send(json.dumps(reply))
+                    except Exception:
+                        pass  # client went away; the injection already happened
+
+                input_worker.submit(action, on_done, received_at)
+                stats.record_events()
+                stats.queue_depth = input_worker.depth()
+        finally:
+            input_metrics.close_connection(stats)
+        logger.info(f"input_ws disconnected ({stats.events} events)")
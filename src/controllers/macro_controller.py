@@ -0,0 +1,153 @@
+import re
+from flask import Blueprint, jsonify, request
+from ..utils import setup_logger
+from src.utils.auth_manager import auth_manager
+from src.services.input_worker import input_worker
+from src.services.macros import MacroStore, MacroRunner
+from src.controllers.input_controller import parse_input_event
+from src.controllers.system_controller import inject_click
+from config import MACRO_MAX_STEPS, MACRO_MAX_WAIT_MS
+
+logger = setup_logger()
+
+macro_bp = Blueprint('macro', __name__)
+macro_bp.before_request(auth_manager.auth_middleware())
+
+MACRO_NAME_RE = re.compile(r"^[A-Za-z0-9_ -]{1,64}$")
+
+store = MacroStore()
+runner = MacroRunner(input_worker)
+
+
+def _compile_step(step):
+    """One macro step -> ("wait", seconds) or ("do", action). ValueError if invalid.
+
+    Steps are input_ws events ({"t": "text"|"paste"|"key"|"combo", ...}) plus
+    {"t": "click", "rx": 0..1, "ry": 0..1, "button": "left"|"right"} and
+    {"t": "wait", "ms": 500}.
+    """
+    if not isinstance(step, dict):
+        raise ValueError("Step must be a JSON object")
+    t = step.get("t")
+    if t == "wait":
+        try:
+            ms = float(step.get("ms"))
+        except (TypeError, ValueError):
+            raise ValueError("'ms' must be a number")
+        if not 0 <= ms <= MACRO_MAX_WAIT_MS:
+            raise ValueError(f"'ms' must be between 0 and {MACRO_MAX_WAIT_MS}")
+        return "wait", ms / 1000.0
+    if t == "click":
+        try:
+            rx, ry = float(step.get("rx")), float(step.get("ry"))
+        except (TypeError, ValueError):
+            raise ValueError("'rx'/'ry' must be numbers")
+        if not (0.0 <= rx <= 1.0 and 0.0 <= ry <= 1.0):
+            raise ValueError("rx/ry must be between 0 and 1")
+        button = step.get("button", "left")
+        if button not in ("left", "right"):
+            raise ValueError(f"Unknown button: {button}")
+        return "do", lambda: inject_click(rx, ry, button)
+    return "do", parse_input_event(step)
+
+
+def _compile(steps):
+    if not isinstance(steps, list) or not steps:
+        raise ValueError("'steps' must be a non-empty list")
+    if len(steps) > MACRO_MAX_STEPS:
+        raise ValueError(f"At most {MACRO_MAX_STEPS} steps")
+    compiled = []
+    for i, step in enumerate(steps):
+        try:
+            compiled.append(_compile_step(step))
+        except ValueError as e:
+            raise ValueError(f"step {i}: {e}")
+    return compiled
+
+
+@macro_bp.route('/run', methods=['POST'])
+def run_macro():
+    """Run a macro server-side. Body: {"steps": [...]} or {"name": "saved-macro"}.
+
+    Returns immediately with the run's status; poll /status, stop with /cancel.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        name = data.get("name")
+        steps = data.get("steps")
+        if steps is None and name is not None:
+            steps = store.get(name)
+            if steps is None:
+                return jsonify({"status": "error", "error": f"No macro named '{name}'"}), 404
+        try:
+            compiled = _compile(steps)
+        except ValueError as e:
+            return jsonify({"status": "error", "error": str(e)}), 400
+
+        run = runner.start(name, compiled)
+        if run is None:
+            return jsonify({"status": "error", "error": "A macro is already running"}), 409
+        logger.info(f"Running macro {name or run.id} ({len(compiled)} steps)")
+        return jsonify({"status": "success", "run": run.snapshot()})
+    except Exception as e:
+        logger.error(f"Error running macro: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+
+@macro_bp.route('/status', methods=['POST'])
+def macro_status():
+    run = runner.current()
+    return jsonify({"status": "success", "run": run.snapshot() if run else None})
+
+
+@macro_bp.route('/cancel', methods=['POST'])
+def cancel_macro():
+    run = runner.cancel()
+    if run is None:
+        return jsonify({"status": "error", "error": "No macro running"}), 404
+    logger.info(f"Macro {run.name or run.id} cancel requested")
+    return jsonify({"status": "success", "run": run.snapshot()})
+
+
+@macro_bp.route('/save', methods=['POST'])
+def save_macro():
+    """Save a named macro for one-call replay. Body: {"name": "open-terminal", "steps": [...]}"""
+    try:
+        data = request.get_json(silent=True) or {}
+        name = data.get("name")
+        steps = data.get("steps")
+        if not isinstance(name, str) or not MACRO_NAME_RE.match(name):
+            return jsonify({"status": "error", "error": "Invalid macro name"}), 400
+        try:
+            _compile(steps)  # validate before storing
+        except ValueError as e:
+            return jsonify({"status": "error", "error": str(e)}), 400
+        store.put(name, steps)
+        logger.info(f"Saved macro {name} ({len(steps)} steps)")
+        return jsonify({"status": "success"})
+    except Exception as e:
+        logger.error(f"Error saving macro: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+
+@macro_bp.route('/list', methods=['POST'])
+def list_macros():
+    """Saved macros with their step counts; {"name": ...} returns that macro's steps."""
+    data = request.get_json(silent=True) or {}
+    name = data.get("name")
+    if name is not None:
+        steps = store.get(name)
+        if steps is None:
+            return jsonify({"status": "error", "error": f"No macro named '{name}'"}), 404
+        return jsonify({"status": "success", "name": name, "steps": steps})
+    return jsonify({"status": "success", "macros": store.names()})
+
+
+@macro_bp.route('/delete', methods=['POST'])
+def delete_macro():
+    data = request.get_json(silent=True) or {}
+    name = data.get("name")
+    if not store.delete(name):
+        return jsonify({"status": "error", "error": f"No macro named '{name}'"}), 404
+    logger.info(f"Deleted macro {name}")
+    return jsonify({"status": "success"})
@@ -1,8 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
 from flask import Blueprint, jsonify
 from pynput.keyboard import Key, Controller
 from ..utils import setup_logger
-import subprocess
+from src.utils import applescript, native_controls
 from src.utils.auth_manager import auth_manager
+from src.utils.cached_probe import CachedProbe
+from src.utils.dispatch import dispatch_command, dispatch_input
+from src.services.slider_setter import SliderSetter
+from config import MEDIA_STATUS_TTL
 
 
 logger = setup_logger()
@@ -13,10 +18,9 @@ keyboard = Controller()
 
 
 def _run_osa(script):
-    """Run an AppleScript and return trimmed stdout (empty string on failure)."""
+    """Run an AppleScript and return its trimmed result (empty string on failure)."""
     try:
-        r = subprocess.run(["osascript", "-e", script], capture_output=True, text=True)
-        return r.stdout.strip()
+        return applescript.run(script)
     except Exception:
         return ""
 
@@ -46,77 +50,76 @@ return ""
 ]
 
 
-def _now_playing():
-    for script in _NOW_PLAYING_SCRIPTS:
-        out = _run_osa(script)
-        if out:
-            parts = out.split("|")
-            if len(parts) >= 3:
-                return {"playing": True, "app": parts[0], "track": parts[1], "artist": parts[2]}
+# Runs the status scripts side by side (bounded further by the AppleScript service)
+_status_pool = ThreadPoolExecutor(max_workers=1 + len(_NOW_PLAYING_SCRIPTS), thread_name_prefix="media-status")
+
+
+def _parse_now_playing(outputs):
+    """First app (in _NOW_PLAYING_SCRIPTS order) that reported a playing track."""
+    for out in outputs:
+        parts = out.split("|") if out else []
+        if len(parts) >= 3:
+            return {"playing": True, "app": parts[0], "track": parts[1], "artist": parts[2]}
     return {"playing": False, "app": None, "track": None, "artist": None}
 
-@media_bp.route('/play-pause', methods=['POST'])
-def play_pause():
+
+def _now_playing():
+    return _parse_now_playing(_status_pool.map(_run_osa, _NOW_PLAYING_SCRIPTS))
+
+
+def _volume_and_mute():
     try:
-        keyboard.press(Key.media_play_pause)
-        keyboard.release(Key.media_play_pause)
-        logger.info("Media play/pause successful")
-        return jsonify({"status": "success"})
+        return native_controls.get_volume_and_mute()
     except Exception as e:
-        logger.error(f"Error in play/pause: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
+        logger.warning(f"Could not read volume: {e}")
+        return None, False
+
+
+def _fetch_media_status():
+    volume = _status_pool.submit(_volume_and_mute)
+    now_playing = _now_playing()
+    vol, muted = volume.result()
+    return {"volume": vol, "muted": muted, "nowPlaying": now_playing}
+
+
+def _tap(key):
+    keyboard.press(key)
+    keyboard.release(key)
+
+
+# Concurrent pollers share one refresh per MEDIA_STATUS_TTL
+media_status_probe = CachedProbe(_fetch_media_status, MEDIA_STATUS_TTL, name="media-status")
+
+# Slider drags send bursts of volume-set; only the latest level is applied
+volume_setter = SliderSetter("volume", native_controls.set_volume, on_applied=media_status_probe.invalidate)
+
+@media_bp.route('/play-pause', methods=['POST'])
+def play_pause():
+    return dispatch_command("media", "play-pause", lambda: _tap(Key.media_play_pause))
 
 @media_bp.route('/previous', methods=['POST'])
 def previous_track():
-    try:
-        keyboard.press(Key.media_previous)
-        keyboard.release(Key.media_previous)
-        logger.info("Media previous successful")
-        return jsonify({"status": "success"})
-    except Exception as e:
-        logger.error(f"Error in previous track: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
-    
+    return dispatch_command("media", "previous track", lambda: _tap(Key.media_previous))
+
 @media_bp.route('/next', methods=['POST'])
 def next_track():
-    try:
-        keyboard.press(Key.media_next)
-        keyboard.release(Key.media_next)
-        logger.info("Media next successful")
-        return jsonify({"status": "success"})
-    except Exception as e:
-        logger.error(f"Error in next track: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
+    return dispatch_command("media", "next track", lambda: _tap(Key.media_next))
 
 @media_bp.route('/volume-up', methods=['POST'])
 def volume_up():
-    try:
-        keyboard.press(Key.media_volume_up)
-        keyboard.release(Key.media_volume_up)
-        logger.info("Volume up successful")
-        return jsonify({"status": "success"})
-    except Exception as e:
-        logger.error(f"Error in volume up: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
+    return dispatch_command("media", "volume up", lambda: _tap(Key.media_volume_up))
 
 @media_bp.route('/volume-down', methods=['POST'])
 def volume_down():
-    try:
-        keyboard.press(Key.media_volume_down)
-        keyboard.release(Key.media_volume_down)
-        logger.info("Volume down successful")
-        return jsonify({"status": "success"})
-    except Exception as e:
-        logger.error(f"Error in volume down: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
+    return dispatch_command("media", "volume down", lambda: _tap(Key.media_volume_down))
 
 @media_bp.route('/volume-set/<int:level>', methods=['POST'])
 def set_volume(level):
     try:
         # Ensure level is between 0 and 100
         level = max(0, min(100, level))
-        subprocess.run(["osascript", "-e", f"set volume output volume {level}"], capture_output=True)
-        logger.info(f"Volume set to {level}% successful")
+        volume_setter.set(level)
+        logger.debug(f"Volume set to {level}% queued")
         return jsonify({"status": "success"})
     except Exception as e:
         logger.error(f"Error setting volume to {level}%: {str(e)}")
@@ -124,72 +127,32 @@ def set_volume(level):
 
 @media_bp.route('/mute', methods=['POST'])
 def toggle_mute():
-    try:
-        subprocess.run(["osascript", "-e", "set volume output muted not (output muted of (get volume settings))"], capture_output=True)
-        logger.info("Mute toggled successfully")
-        return jsonify({"status": "success"})
-    except Exception as e:
-        logger.error(f"Error toggling mute: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
-    
+    def toggle():
+        native_controls.toggle_muted()
+        media_status_probe.invalidate()
+    return dispatch_command("media", "mute toggle", toggle)
+
 @media_bp.route('/up', methods=['POST'])
 def arrow_up():
-    try:
-        keyboard.press(Key.up)
-        keyboard.release(Key.up)
-        logger.info("Arrow up pressed successfully")
-        return jsonify({"status": "success"})
-    except Exception as e:
-        logger.error(f"Error pressing arrow up: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
+    return dispatch_input("arrow up", lambda: _tap(Key.up))
 
 @media_bp.route('/down', methods=['POST'])
 def arrow_down():
-    try:
-        keyboard.press(Key.down)
-        keyboard.release(Key.down)
-        logger.info("Arrow down pressed successfully")
-        return jsonify({"status": "success"})
-    except Exception as e:
-        logger.error(f"Error pressing arrow down: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
+    return dispatch_input("arrow down", lambda: _tap(Key.down))
 
 @media_bp.route('/left', methods=['POST'])
 def arrow_left():
-    try:
-        keyboard.press(Key.left)
-        keyboard.release(Key.left)
-        logger.info("Arrow left pressed successfully")
-        return jsonify({"status": "success"})
-    except Exception as e:
-        logger.error(f"Error pressing arrow left: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
+    return dispatch_input("arrow left", lambda: _tap(Key.left))
 
 @media_bp.route('/right', methods=['POST'])
 def arrow_right():
-    try:
-        keyboard.press(Key.right)
-        keyboard.release(Key.right)
-        logger.info("Arrow right pressed successfully")
-        return jsonify({"status": "success"})
-    except Exception as e:
-        logger.error(f"Error pressing arrow right: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
+    return dispatch_input("arrow right", lambda: _tap(Key.right))
 
 @media_bp.route('/status', methods=['POST'])
 def media_status():
     """Current output volume + mute, plus best-effort now-playing (Spotify/Music)."""
     try:
-        vol_raw = _run_osa("output volume of (get volume settings)")
-        muted_raw = _run_osa("output muted of (get volume settings)")
-        volume = int(vol_raw) if vol_raw.lstrip("-").isdigit() else None
-
-        return jsonify({
-            "status": "success",
-            "volume": volume,
-            "muted": muted_raw == "true",
-            "nowPlaying": _now_playing(),
-        })
+        return jsonify({"status": "success", **media_status_probe.get()})
     except Exception as e:
         logger.error(f"Error in media status: {str(e)}")
         return jsonify({"status": "error", "error": str(e)}), 500    
\ No newline at end of file
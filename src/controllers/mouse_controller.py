@@ -1,13 +1,138 @@
 import json
+import struct
+import time
 from ..utils import setup_logger
 from pynput.mouse import Button, Controller as MouseController
 from flask import request
 from src.utils.auth_manager import auth_manager
+from src.utils.input_metrics import input_metrics, parse_client_ts, wall_ms
+from src.utils.display_geometry import display_geometry
+from src.services.input_recorder import session_recorder
+from config import MOUSE_WS_TICK_MS, MOUSE_WS_MAX_BATCH
 
 logger = setup_logger()
 _mouse = MouseController()
 _BUTTONS = {"left": Button.left, "right": Button.right}
 
+# Binary protocol, opted into with ?proto=bin (the server answers with a
+# {"proto": "bin", "v": 1} text frame; an older server sends nothing, so the
+# client can fall back to JSON). Each binary frame carries one or more fixed
+# 6-byte little-endian records: opcode u8, button u8, dx int16, dy int16.
+# Opcode 6 ("moveto") is an absolute pointer position: dx/dy are the normalized
+# 0..1 point of the primary display scaled to 0..MOVETO_SCALE (JSON: "rx"/"ry").
+# Opcode 16 is an optional client send timestamp for the records after it in
+# the frame: its dx/dy hold the low/high 16 bits of (Date.now() mod 2^32).
+# JSON text frames keep working on either kind of connection (optional "ts",
+# epoch ms, for the same purpose).
+BIN_RECORD = struct.Struct("<BBhh")
+BIN_OPCODES = {1: "move", 2: "click", 3: "scroll", 4: "down", 5: "up", 6: "moveto"}
+BIN_BUTTONS = {0: "left", 1: "right"}
+BIN_OP_TIMESTAMP = 16
+MOVETO_SCALE = 32767
+
+
+class _MouseCoalescer:
+    """Folds a burst of pointer events into as few injections as possible.
+
+    move/scroll deltas are summed until `flush()` (a moveto replaces any pending
+    position and movement: only the last one is injected); click/down/up flush whatever
+    is pending first and are injected right away, so the cursor is where the
+    client expects when the button event lands.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats  # ConnectionStats from input_metrics
+        self.dx = self.dy = 0
+        self.sx = self.sy = 0
+        self.target = None  # pending absolute (x, y) from moveto
+        # Receive info of the oldest event folded into the pending deltas: latency
+        # is measured from it, i.e. for the event that waited longest.
+        self._pending_since = None
+
+    @property
+    def pending(self):
+        return bool(self.dx or self.dy or self.sx or self.sy or self.target is not None)
+
+    def handle(self, t, b=None, dx=0, dy=0, received=None):
+        """`received` is (perf_counter, wall ms, client ts or None) for the message."""
+        self.stats.record_events()
+        if t in ("move", "scroll", "moveto"):
+            if t == "moveto":
+                # Geometry is cached: mapping costs no display API call per event
+                self.target = display_geometry.to_screen(
+                    min(max(dx / MOVETO_SCALE, 0.0), 1.0), min(max(dy / MOVETO_SCALE, 0.0), 1.0))
+                self.dx = self.dy = 0
+            elif t == "move":
+                self.dx += dx
+                self.dy += dy
+            else:
+                self.sx += dx
+                self.sy += dy
+            if self._pending_since is None:
+                self._pending_since = received
+        elif t in ("click", "down", "up"):
+            self.flush()
+            button = _BUTTONS.get(b, Button.left)
+            started = time.perf_counter()
+            if t == "click":
+                _mouse.click(button, 1)
+            elif t == "down":
+                _mouse.press(button)
+            else:
+                _mouse.release(button)
+            self._record(received, started)
+
+    def flush(self):
+        # Clear before injecting so a failing call can't leave deltas pending forever
+        target, self.target = self.target, None
+        move, self.dx, self.dy = (self.dx, self.dy), 0, 0
+        scroll, self.sx, self.sy = (self.sx, self.sy), 0, 0
+        received, self._pending_since = self._pending_since, None
+        started = time.perf_counter()
+        if target is not None:
+            _mouse.position = target
+        if any(move):
+            _mouse.move(*move)
+        if any(scroll):
+            _mouse.scroll(*scroll)
+        if target is not None or any(move) or any(scroll):
+            self._record(received, started)
+
+    def _record(self, received, started):
+        self.stats.injections += 1
+        if received is not None:
+            received_at, received_wall, client_ts = received
+            input_metrics.record("mouse_ws", received_at, started, time.perf_counter(),
+                                 client_ts, received_wall)
+
+
+def _handle_json(coalescer, raw, received_at, received_wall):
+    msg = json.loads(raw)
+    received = (received_at, received_wall, parse_client_ts(msg.get("ts")))
+    t = msg.get("t")
+    if t == "moveto":
+        dx, dy = round(float(msg["rx"]) * MOVETO_SCALE), round(float(msg["ry"]) * MOVETO_SCALE)
+    else:
+        dx, dy = int(msg.get("dx", 0)), int(msg.get("dy", 0))
+    coalescer.handle(t, msg.get("b"), dx, dy, received)
+
+
+def _handle_binary(coalescer, raw, received_at, received_wall):
+    if len(raw) % BIN_RECORD.size:
+        raise ValueError(f"binary frame of {len(raw)} bytes is not a multiple of {BIN_RECORD.size}")
+    received = (received_at, received_wall, None)
+    for op, b, dx, dy in BIN_RECORD.iter_unpack(raw):
+        if op == BIN_OP_TIMESTAMP:
+            # Rebuild the full epoch ms from its low 32 bits against our own clock
+            low32 = (dx & 0xFFFF) | ((dy & 0xFFFF) << 16)
+            client_ts = received_wall - ((int(received_wall) - low32) % 2**32)
+            received = (received_at, received_wall, client_ts)
+            continue
+        t = BIN_OPCODES.get(op)
+        if t is None:
+            raise ValueError(f"unknown opcode {op}")
+        coalescer.handle(t, BIN_BUTTONS.get(b), dx, dy, received)
+
 
 def register_mouse_ws(sock):
     """Register the /system/mouse_ws WebSocket on a flask_sock Sock instance."""
@@ -21,24 +146,56 @@ def register_mouse_ws(sock):
             logger.info(f"mouse_ws rejected: {err}")
             return  # closes the socket
 
-        logger.info("mouse_ws connected")
-        while True:
-            raw = ws.receive()
-            if raw is None:
-                break
-            try:
-                msg = json.loads(raw)
-                t = msg.get("t")
-                if t == "move":
-                    _mouse.move(int(msg.get("dx", 0)), int(msg.get("dy", 0)))
-                elif t == "click":
-                    _mouse.click(_BUTTONS.get(msg.get("b"), Button.left), 1)
-                elif t == "scroll":
-                    _mouse.scroll(int(msg.get("dx", 0)), int(msg.get("dy", 0)))
-                elif t == "down":
-                    _mouse.press(_BUTTONS.get(msg.get("b"), Button.left))
-                elif t == "up":
-                    _mouse.release(_BUTTONS.get(msg.get("b"), Button.left))
-            except Exception as e:
-                logger.error(f"mouse_ws message error: {e}")
-        logger.info("mouse_ws disconnected")
+        binary = request.args.get("proto") == "bin"
+        if binary:
+            ws.send(json.dumps({"proto": "bin", "v": 1}))
+        logger.info(f"mouse_ws connected ({'binary' if binary else 'json'})")
+        tick = MOUSE_WS_TICK_MS / 1000.0
+        stats = input_metrics.open_connection("mouse_ws")
+        coalescer = _MouseCoalescer(stats)
+        last_flush = 0.0
+        try:
+            while True:
+                # Block for the next message; with deltas pending only until the tick is due.
+                timeout = max(0.0, last_flush + tick - time.monotonic()) if coalescer.pending else None
+                raw = ws.receive(timeout=timeout)
+                if raw is None and timeout is None:
+                    break
+
+                # Drain everything already queued on the socket before injecting
+                batch = 0
+                while raw is not None:
+                    received_at, received_wall = time.perf_counter(), wall_ms()
+                    session_recorder.record("mouse_ws", stats.id, raw, received_at,
+                                            proto="bin" if binary else "json")
+                    try:
+                        if isinstance(raw, str):
+                            _handle_json(coalescer, raw, received_at, received_wall)
+                        elif binary:
+                            _handle_binary(coalescer, raw, received_at, received_wall)
+                        else:
+                            raise ValueError("binary frame on a JSON connection (connect with ?proto=bin)")
+                    except Exception as e:
+                        logger.error(f"mouse_ws message error: {e}")
+                    batch += 1
+                    if batch >= MOUSE_WS_MAX_BATCH:
+                        break
+                    raw = ws.receive(timeout=0)
+                if batch:
+                    stats.record_batch(batch)
+
+                if coalescer.pending and time.monotonic() - last_flush >= tick:
+                    try:
+                        coalescer.flush()
+                    except Exception as e:
+                        logger.error(f"mouse_ws inject error: {e}")
+                    last_flush = time.monotonic()
+        finally:
+            # Deltas drained just before the client went away were still received: inject them
+            if coalescer.pending:
+                try:
+                    coalescer.flush()
+                except Exception as e:
+                    logger.error(f"mouse_ws inject error: {e}")
+            input_metrics.close_connection(stats)
+        logger.info(f"mouse_ws disconnected ({stats.events} events, {stats.injections} injections)")
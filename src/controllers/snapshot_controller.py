@@ -0,0 +1,164 @@
+import json
+import os
+import socket
+import time
+from flask import Blueprint, Response, jsonify, request
+from ..utils import setup_logger
+from src.utils.auth_manager import auth_manager
+from src.utils.cached_probe import CachedProbe, ProbeTimeout
+from src.utils.input_metrics import input_metrics
+from src.controllers.media_controller import media_status_probe
+from src.controllers.system_controller import read_battery
+from src.services.state_hub import StateHub
+from src.services.system_stats import system_stats
+from config import (
+    SCREEN_SHARE_PORT, WEBRTC_SHARE_PORT, AUDIO_SHARE_PORT,
+    SNAPSHOT_BATTERY_TTL, SNAPSHOT_DEVICES_TTL, SNAPSHOT_STREAMS_TTL, SNAPSHOT_TIMEOUT,
+    STATE_PUSH_INTERVALS, STATE_PUSH_KEEPALIVE,
+)
+
+logger = setup_logger()
+
+# Attached with url_prefix='/system' (like stream_bp), so this is /system/snapshot
+snapshot_bp = Blueprint('snapshot', __name__)
+snapshot_bp.before_request(auth_manager.auth_middleware())
+
+_STARTED = time.time()
+_STREAM_PORTS = {
+    "screen_share": SCREEN_SHARE_PORT,
+    "webrtc": WEBRTC_SHARE_PORT,
+    "audio": AUDIO_SHARE_PORT,
+}
+
+
+def _port_open(port):
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+            return True
+    except OSError:
+        return False
+
+
+def read_streams():
+    """Which streaming servers (separate processes started from the menu bar) are listening."""
+    return {name: {"port": port, "running": _port_open(port)} for name, port in _STREAM_PORTS.items()}
+
+
+def read_server():
+    return {
+        "pid": os.getpid(),
+        "uptime_s": round(time.time() - _STARTED, 1),
+        "input_connections": len(input_metrics.snapshot()["connections"]),
+        "state_push": state_hub.stats(),
+        "system_stats": system_stats.stats(),
+    }
+
+
+# Field name -> probe; each field has its own TTL
+snapshot_probes = {
+    "battery": CachedProbe(read_battery, SNAPSHOT_BATTERY_TTL, name="battery"),
+    "media": media_status_probe,
+    "devices": CachedProbe(auth_manager.get_device_list, SNAPSHOT_DEVICES_TTL, name="devices"),
+    "streams": CachedProbe(read_streams, SNAPSHOT_STREAMS_TTL, name="streams"),
+}
+
+# Push side: the same probes, sampled at STATE_PUSH_INTERVALS while clients listen
+state_hub = StateHub()
+for _name, _probe in snapshot_probes.items():
+    state_hub.add_source(_name, _probe.get, STATE_PUSH_INTERVALS.get(_name, 10.0))
+
+
+@snapshot_bp.route('/snapshot', methods=['POST'])
+def snapshot():
+    """Battery, volume/mute/now-playing, paired devices, stream and server status in one call.
+
+    All probes refresh concurrently and the response waits at most SNAPSHOT_TIMEOUT
+    for them. A probe that is still running is answered from its previous value
+    (listed in "stale") or as null (listed in "pending"); failed probes are null
+    with the reason in "errors". "age_s" is how old each cached field is.
+    """
+    try:
+        for probe in snapshot_probes.values():
+            probe.prefetch()
+        deadline = time.monotonic() + SNAPSHOT_TIMEOUT
+
+        result = {"status": "success", "server": read_server()}
+        stale, pending, errors, ages = [], [], {}, {}
+        for field, probe in snapshot_probes.items():
+            try:
+                result[field] = probe.get(timeout=max(0.0, deadline - time.monotonic()))
+            except ProbeTimeout:
+                result[field] = None
+                pending.append(field)
+            except Exception as e:
+                result[field] = None
+                errors[field] = str(e)
+            age = probe.age()
+            ages[field] = round(age, 2) if age is not None else None
+            if field not in errors and field not in pending and (age is None or age >= probe.ttl):
+                stale.append(field)
+
+        result.update({"stale": stale, "pending": pending, "errors": errors, "age_s": ages})
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f"Error in snapshot: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+
+@snapshot_bp.route('/stats', methods=['POST'])
+def stats():
+    """CPU/memory/disk percent and 1-minute load from the background sampler.
+
+    Body (optional): {"window": seconds, "points": n} also returns "history", the
+    last `window` seconds (default 300) averaged down to at most `n` points
+    (default 60). Served from memory; "current" is null until the first sample.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        result = {"status": "success", "current": system_stats.current()}
+        if "window" in data or "points" in data:
+            window = float(data.get("window", 300))
+            points = int(data.get("points", 60))
+            if window <= 0 or points <= 0:
+                return jsonify({"status": "error", "error": "'window' and 'points' must be positive"}), 400
+            result["history"] = system_stats.history(window, points)
+        return jsonify(result)
+    except (TypeError, ValueError) as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in system stats: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+
+@snapshot_bp.route('/state/stream', methods=['GET'])
+def state_stream():
+    """Server-Sent Events stream of state changes (use ?token= with EventSource).
+
+    ?sources=battery,media picks sources (default: all snapshot fields except
+    server). Each change arrives as `event: state` with data
+    {"source": ..., "value": ...}; current values are sent on connect, then only
+    values that changed. Comment lines keep idle connections open.
+    """
+    wanted = [s for s in request.args.get("sources", "").split(",") if s] or state_hub.source_names()
+    unknown = [s for s in wanted if s not in state_hub.source_names()]
+    if unknown:
+        return jsonify({"status": "error", "error": f"Unknown source(s): {', '.join(unknown)}"}), 400
+
+    def events():
+        # Subscribed on first iteration, so an unstarted response can't leak a subscription
+        sub = state_hub.subscribe(wanted)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                changes = sub.next(STATE_PUSH_KEEPALIVE)
+                if not changes:
+                    yield ": keepalive\n\n"
+                for source, value in changes.items():
+                    yield f"event: state\ndata: {json.dumps({'source': source, 'value': value})}\n\n"
+        finally:
+            state_hub.unsubscribe(sub)
+            logger.info("State stream client disconnected")
+
+    logger.info(f"State stream client connected ({', '.join(sorted(wanted))})")
+    return Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -5,6 +5,7 @@ import numpy as np
 from flask import Blueprint, Response, request
 from ..utils import setup_logger
 from src.utils.auth_manager import auth_manager
+from src.utils.display_geometry import display_geometry
 
 logger = setup_logger()
 
@@ -62,11 +63,10 @@ def generate_screen_frames(fps):
         frame_interval = 1.0 / fps
         
         with mss.mss() as sct:
-            monitor = sct.monitors[1]
-            
             while True:
                 start_time = time.time()
-                screenshot = sct.grab(monitor)
+                # Cached; follows display reconfiguration without reopening mss
+                screenshot = sct.grab(display_geometry.get())
                 frame = np.array(screenshot)
                 frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
                 
@@ -3,15 +3,26 @@ import os
 import re
 import shutil
 from ..utils import setup_logger
-import cv2
 import subprocess
+import threading
 import time
-from datetime import datetime
 from src.utils.auth_manager import auth_manager
 from src.utils.keyboardMouseController import lock_keyboard, unlock_keyboard, lock_mouse, unlock_mouse
+from src.utils import key_injection, native_controls
+from src.utils.input_metrics import input_metrics, parse_client_ts, wall_ms
+from src.utils.clipboard import get_clipboard, set_clipboard
+from src.utils.display_geometry import display_geometry
+from src.services.input_worker import input_worker
+from src.services.typing_jobs import TypingJobs
+from src.services.input_recorder import session_recorder
+from src.services.slider_setter import SliderSetter, slider_stats
+from src.services.command_dispatcher import command_dispatcher
+from src.services import intruder_capture
+from src.services.intruder_thumbs import thumbnail_cache, SOURCE_IMAGES
+from src.utils.dispatch import dispatch_command
+from config import KEYBOARD_PASTE_RESTORE_DELAY, INTRUDERS_DIR, INTRUDER_THUMB_SIZES, INTRUDER_THUMB_WAIT
 from pynput.keyboard import Key, Controller
 from pynput.mouse import Button, Controller as MouseController
-import mss
 
 logger = setup_logger()
 
@@ -28,21 +39,121 @@ SPECIAL_KEYS = {
     "up": Key.up, "down": Key.down, "left": Key.left, "right": Key.right,
 }
 
-# macOS virtual key codes for non-printable keys + modifiers (for /system/pressKey)
-KEY_CODES = {
-    "esc": 53, "tab": 48, "return": 36, "enter": 36, "delete": 51, "backspace": 51,
-    "forwarddelete": 117, "space": 49, "caps": 57,
-    "left": 123, "right": 124, "down": 125, "up": 126,
-    "f1": 122, "f2": 120, "f3": 99, "f4": 118, "f5": 96, "f6": 97, "f7": 98,
-    "f8": 100, "f9": 101, "f10": 109, "f11": 103, "f12": 111,
-    "cmd": 55, "option": 58, "ctrl": 59, "shift": 56,
-}
+def inject_special_key(key):
+    """Press+release a named key from SPECIAL_KEYS via pynput. ValueError if unknown."""
+    mapped = SPECIAL_KEYS.get(str(key).lower())
+    if mapped is None:
+        raise ValueError(f"Unknown key: {key}")
+    _keyboard.press(mapped)
+    _keyboard.release(mapped)
 
-# Modifier name -> AppleScript phrase
-MODIFIER_PHRASES = {
-    "cmd": "command down", "option": "option down",
-    "ctrl": "control down", "shift": "shift down",
-}
+
+def inject_text(text):
+    """Type a string at the Mac's current keyboard focus via pynput."""
+    _keyboard.type(str(text))
+
+
+def inject_combo(key, modifiers=()):
+    """Press a key (printable char or KEY_CODES name) with optional modifiers through
+    the key injection backend. ValueError if the key is unknown."""
+    key_injection.press_key(key, modifiers)
+
+
+def restore_clipboard_option(data):
+    """The "restore_clipboard" flag of a paste request (HTTP body or input_ws event):
+    on unless explicitly false (false, 0, "false" or "0")."""
+    value = data.get("restore_clipboard", True)
+    return not (value is False or value == 0 or str(value).lower() in ("false", "0"))
+
+
+# Clipboard to put back once a burst of pastes is over: (original text, Timer)
+_paste_restore = None
+_paste_restore_lock = threading.Lock()
+
+
+def _restore_pasted_clipboard():
+    """Timer callback: put the pre-burst clipboard back, unless a later paste
+    rescheduled the restore (then that paste's timer does it)."""
+    global _paste_restore
+    with _paste_restore_lock:
+        if _paste_restore is None or _paste_restore[1] is not threading.current_thread():
+            return
+        original, _ = _paste_restore
+        _paste_restore = None
+        set_clipboard(original)
+
+
+def inject_paste(text, restore_clipboard=True):
+    """Insert text in one step: put it on the clipboard and press cmd+v.
+
+    The previous clipboard is put back KEYBOARD_PASTE_RESTORE_DELAY after the last
+    paste of a burst — the target app reads the clipboard asynchronously, so
+    restoring right away could paste the old contents. Each paste cancels and
+    reschedules the one pending restore, which keeps the clipboard from before the
+    first paste (never an earlier paste's text). A clipboard without text (an
+    image, files, or empty) reads as "" and can't be restored, so it is left as
+    the pasted text rather than wiped; so is one pasted with restore_clipboard off.
+    """
+    global _paste_restore
+    with _paste_restore_lock:
+        if _paste_restore is not None:
+            original, timer = _paste_restore
+            timer.cancel()
+            _paste_restore = None
+        else:
+            original = get_clipboard() if restore_clipboard else None
+        set_clipboard(text)
+        key_injection.press_key("v", ["cmd"])
+        if original and restore_clipboard:
+            timer = threading.Timer(KEYBOARD_PASTE_RESTORE_DELAY, _restore_pasted_clipboard)
+            timer.daemon = True
+            _paste_restore = (original, timer)
+            timer.start()
+
+
+def inject_click(rx, ry, button="left"):
+    """Click at a normalized (0..1) point of the primary monitor. ValueError if out of range.
+    Returns the (x, y) clicked, in logical points."""
+    if not (0.0 <= rx <= 1.0 and 0.0 <= ry <= 1.0):
+        raise ValueError("rx/ry must be between 0 and 1")
+    mapped = {"left": Button.left, "right": Button.right}.get(button)
+    if mapped is None:
+        raise ValueError(f"Unknown button: {button}")
+    x, y = display_geometry.to_screen(rx, ry)
+    _mouse.position = (x, y)
+    _mouse.click(mapped, 1)
+    return x, y
+
+
+# Background chunked typing for /system/keyboardType {"mode": "background"}
+typing_jobs = TypingJobs(input_worker, inject_text)
+
+# Slider endpoints: latest value wins, applied at a bounded rate
+keyboard_light_setter = SliderSetter("keyboard_light", native_controls.set_keyboard_light)
+display_brightness_setter = SliderSetter("display_brightness", native_controls.set_display_brightness)
+
+
+def _inject_in_order(inject):
+    """Run `inject` on the shared input worker and wait for it, so HTTP keystrokes
+    stay ordered with input_ws events and background typing chunks. Returns the
+    perf_counter time the injection started; re-raises whatever it raised."""
+    started = []
+
+    def action():
+        started.append(time.perf_counter())
+        inject()
+
+    error = input_worker.run(action)
+    if error is not None:
+        raise error
+    return started[0]
+
+
+def _record_http_key(data, received_at, received_wall, started):
+    """Feed one HTTP key injection into input_metrics. The optional client send
+    time comes from the body's "ts" or an X-Client-Ts header (epoch ms)."""
+    client_ts = parse_client_ts(data.get("ts", request.headers.get("X-Client-Ts")))
+    input_metrics.record("http_key", received_at, started, time.perf_counter(), client_ts, received_wall)
 
 
 system_bp = Blueprint('system', __name__)
@@ -50,49 +161,43 @@ system_bp.before_request(auth_manager.auth_middleware())
 
 @system_bp.route('/lock', methods=['POST'])
 def lock_screen():
-    try:
-        subprocess.run(["pmset", "displaysleepnow"], capture_output=True)
-        return jsonify({"status": "success"})
-    except Exception as e:
-        return jsonify({"status": "error", "error": str(e)}), 500
+    return dispatch_command("housekeeping", "lock screen",
+                            lambda: subprocess.run(["pmset", "displaysleepnow"], capture_output=True))
 
 @system_bp.route('/brightness-up', methods=['POST'])
 def brightness_up():
-    try:
-        subprocess.run(["osascript", "-e", 'tell application "System Events" to Key Code 144'], capture_output=True)  
-        logger.info("Brightness up successful")
-        return jsonify({"status": "success"})
-    except Exception as e:
-        logger.error(f"Error in brightness up: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
+    return dispatch_command("media", "brightness up", lambda: key_injection.press_key_code(144))
 
 @system_bp.route('/brightness-down', methods=['POST'])
 def brightness_down():
-    try:
-        subprocess.run(["osascript", "-e", 'tell application "System Events" to Key Code 145'], capture_output=True) 
-        logger.info("Brightness down successful")
-        return jsonify({"status": "success"})
-    except Exception as e:
-        logger.error(f"Error in brightness down: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
+    return dispatch_command("media", "brightness down", lambda: key_injection.press_key_code(145))
 
 @system_bp.route('/sleep', methods=['POST'])
 def sleep_mac():
-    try:
-        subprocess.run(["pmset", "sleepnow"], capture_output=True)
-        logger.info("System sleep successful")
-        return jsonify({"status": "success"})
-    except Exception as e:
-        logger.error(f"Error in system sleep: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
+    return dispatch_command("housekeeping", "system sleep",
+                            lambda: subprocess.run(["pmset", "sleepnow"], capture_output=True))
+
+def read_battery():
+    """Battery state from `pmset -g batt`: {"percentage", "charging", "source"}, or None
+    if there is no battery info (e.g. a desktop Mac)."""
+    output = subprocess.check_output(["pmset", "-g", "batt"], text=True)
+    match = re.search(r'(\d+)%', output)
+    if not match:
+        return None
+    state = re.search(r'\d+%;\s*([^;]+);', output)
+    source = re.search(r"drawing from '([^']+)'", output)
+    return {
+        "percentage": int(match.group(1)),
+        "charging": state.group(1).strip() == "charging" if state else None,
+        "source": source.group(1) if source else None,
+    }
 
 @system_bp.route('/battery', methods=['POST'])
 def get_battery():
     try:
-        output = subprocess.check_output(["pmset", "-g", "batt"], text=True)
-        match = re.search(r'(\d+)%', output)
-        if match:
-            return jsonify({"status": "success", "percentage": int(match.group(1))})
+        battery = read_battery()
+        if battery:
+            return jsonify({"status": "success", "percentage": battery["percentage"]})
         else:
             return jsonify({"status": "error", "error": "Battery info not found"}), 500
     except Exception as e:
@@ -102,90 +207,74 @@ def get_battery():
 @system_bp.route('/keyboard-light-set/<int:level>', methods=['POST'])
 def set_keyboard_light(level):
     try:
-        import objc
         # Ensure level is between 0 and 100
         level = max(0, min(100, level))
-        brightness_value = level / 100.0
-
-        # Use CoreBrightness private framework (works on Apple Silicon Macs)
-        CoreBrightness = objc.loadBundle(
-            'CoreBrightness',
-            bundle_path='/System/Library/PrivateFrameworks/CoreBrightness.framework',
-            module_globals={}
-        )
-        KBClient = objc.lookUpClass('KeyboardBrightnessClient')
-        client = KBClient.alloc().init()
-        client.setBrightness_forKeyboard_(brightness_value, 1)
-
-        logger.info(f"Keyboard brightness set to {level}% successful")
+        keyboard_light_setter.set(level)
+        logger.debug(f"Keyboard brightness set to {level}% queued")
         return jsonify({"status": "success"})
     except Exception as e:
         logger.error(f"Error setting keyboard brightness to {level}%: {str(e)}")
         return jsonify({"status": "error", "error": str(e)}), 500
-    
-@system_bp.route('/capture-and-lock', methods=['POST'])
-def capture_and_lock():
-    try:
-         # Generate timestamp once for consistency
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        
-        # Get save path from request or use default
-        base_path = os.path.expanduser("~/Desktop/intruders")
-        session_path = os.path.join(base_path, f"session_{timestamp}")
-
-        # Ensure directory exists
-        os.makedirs(session_path, exist_ok=True)
-        
-        # 1. Capture Screen (macOS native command)
-        screenshot_path = os.path.join(session_path, "screenshot.png")
-        subprocess.run(
-            ["screencapture", "-x", screenshot_path],  # -x = disable sound
-            check=True
-        )
-        
-        # 2. Capture Webcam
-        webcam_path = os.path.join(session_path, "webcam.jpg")
-        cap = cv2.VideoCapture(0)  # 0 = default camera
-
-        if not cap.isOpened():
-            raise RuntimeError("Could not access webcam")
-
-        try:
-            # Set camera properties for better quality
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-            cap.set(cv2.CAP_PROP_BRIGHTNESS, 0.6)  # Adjust brightness (0-1)
-            cap.set(cv2.CAP_PROP_AUTOFOCUS, 1)      # Enable autofocus
-            cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 1)  # Enable auto-exposure
 
-            # Warm-up the camera sensor
-            for _ in range(5):
-                cap.read()
-
-            # Capture frame with retries
-            ret, frame = False, None
-            for _ in range(3):  # Try 3 times to get a good frame
-                ret, frame = cap.read()
-                if ret and frame is not None:
-                    break
-                time.sleep(0.1)
-
-            if not ret or frame is None:
-                raise RuntimeError("Failed to capture webcam frame")
-
-            # Adjust image properties in software
-            frame = cv2.convertScaleAbs(frame, alpha=1.2, beta=20)  # Increase contrast and brightness
+@system_bp.route('/brightness-set/<int:level>', methods=['POST'])
+def set_display_brightness(level):
+    try:
+        level = max(0, min(100, level))
+        display_brightness_setter.set(level)
+        logger.debug(f"Display brightness set to {level}% queued")
+        return jsonify({"status": "success"})
+    except Exception as e:
+        logger.error(f"Error setting display brightness to {level}%: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
 
-        finally:
-            cap.release()  # Always release camera
+@system_bp.route('/controls', methods=['POST'])
+def get_controls():
+    """Current volume, mute, display brightness and keyboard light (0-100; null if unavailable)."""
+    try:
+        return jsonify({"status": "success", **native_controls.read_all()})
+    except Exception as e:
+        logger.error(f"Error reading controls: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
 
-        cv2.imwrite(webcam_path, frame)
+@system_bp.route('/jobs/stats', methods=['POST'])
+def jobs_stats():
+    """Command dispatcher lanes: queue depth, running, counts, wait/run histograms."""
+    try:
+        return jsonify({"status": "success", **command_dispatcher.stats()})
+    except Exception as e:
+        logger.error(f"Error reading dispatcher stats: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
 
-        # 3. Lock MacBook (same as before)
-        subprocess.run(["pmset", "displaysleepnow"], check=True)
+@system_bp.route('/jobs/<int:job_id>', methods=['POST'])
+def job_status(job_id):
+    """State of a dispatched command (e.g. one answered with 202 + job id)."""
+    job = command_dispatcher.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "error": "Job not found (unknown or expired)"}), 404
+    return jsonify({"status": "success", "job": job})
+
+@system_bp.route('/controls/stats', methods=['POST'])
+def get_controls_stats():
+    """Per-slider counters: received, applied, discarded (superseded before applied), errors."""
+    try:
+        return jsonify({"status": "success", "sliders": slider_stats()})
+    except Exception as e:
+        logger.error(f"Error reading slider stats: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+    
+@system_bp.route('/capture-and-lock', methods=['POST'])
+def capture_and_lock():
+    """Screenshot + webcam photo, then display sleep. The display is slept as soon
+    as both frames are in memory; the files land in the returned session shortly
+    after. A failed capture still locks, but answers 500 with the reason."""
+    try:
+        result = intruder_capture.capture_and_lock()
+        if result["errors"]:
+            error = "; ".join(f"{k}: {v}" for k, v in result["errors"].items())
+            return jsonify({"status": "error", "error": error, "locked": True, **result}), 500
 
-        logger.info("Capture and lock successful")
-        return jsonify({"status": "success"})
+        logger.info(f"Capture and lock successful (locked after {result['lock_after_ms']} ms)")
+        return jsonify({"status": "success", **result})
 
     except Exception as e:
         logger.error(f"Error: {str(e)}")
@@ -217,32 +306,83 @@ def keyboard_type():
     """Type text, or press a named special key, at the Mac's current keyboard focus.
 
     Body: {"text": "hello"}  OR  {"key": "enter"|"backspace"|"tab"|...}
-    Typed text lands wherever the Mac's focus is.
+    Typed text lands wherever the Mac's focus is. With text, optional "mode":
+      - "type" (default): typed character by character before the response.
+      - "paste": clipboard + cmd+v, near-instant for long text; the previous
+        clipboard is restored unless "restore_clipboard": false.
+      - "background": typed in rate-limited chunks after the response, which
+        carries a job id for /keyboardType/status and /keyboardType/cancel.
     """
     try:
+        received_at, received_wall = time.perf_counter(), wall_ms()
         data = request.get_json(silent=True) or {}
+        session_recorder.record("http", "http", data, received_at, path=request.path)
         key = data.get("key")
         text = data.get("text")
 
         if key:
-            mapped = SPECIAL_KEYS.get(str(key).lower())
-            if mapped is None:
-                return jsonify({"status": "error", "error": f"Unknown key: {key}"}), 400
-            _keyboard.press(mapped)
-            _keyboard.release(mapped)
+            try:
+                started = _inject_in_order(lambda: inject_special_key(key))
+            except ValueError as e:
+                return jsonify({"status": "error", "error": str(e)}), 400
             logger.info(f"Remote keyboard key pressed: {key}")
         elif text is not None:
-            _keyboard.type(str(text))
-            logger.info(f"Remote keyboard typed {len(str(text))} chars")
+            mode = data.get("mode", "type")
+            if mode == "paste":
+                started = _inject_in_order(lambda: inject_paste(str(text), restore_clipboard_option(data)))
+                logger.info(f"Remote keyboard pasted {len(str(text))} chars")
+            elif mode == "background":
+                job = typing_jobs.start(str(text))
+                if job is None:
+                    return jsonify({"status": "error", "error": "A typing job is already running"}), 409
+                logger.info(f"Remote keyboard typing job {job.id}: {len(str(text))} chars")
+                return jsonify({"status": "success", "job": job.snapshot()})
+            elif mode == "type":
+                started = _inject_in_order(lambda: inject_text(text))
+                logger.info(f"Remote keyboard typed {len(str(text))} chars")
+            else:
+                return jsonify({"status": "error", "error": f"Unknown mode: {mode}"}), 400
         else:
             return jsonify({"status": "error", "error": "Provide 'text' or 'key'"}), 400
+        _record_http_key(data, received_at, received_wall, started)
 
         return jsonify({"status": "success"})
     except Exception as e:
         logger.error(f"Error in keyboardType: {str(e)}")
         return jsonify({"status": "error", "error": str(e)}), 500
 
-_INTRUDERS_BASE = os.path.realpath(os.path.expanduser("~/Desktop/intruders"))
+@system_bp.route('/keyboardType/status', methods=['POST'])
+def keyboard_type_status():
+    """Progress of a background typing job. Body: {"id": 3} (optional; default latest)."""
+    try:
+        data = request.get_json(silent=True) or {}
+        job = typing_jobs.get(data.get("id"))
+        if job is None:
+            return jsonify({"status": "error", "error": "No such typing job"}), 404
+        return jsonify({"status": "success", "job": job.snapshot()})
+    except Exception as e:
+        logger.error(f"Error in keyboardType status: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@system_bp.route('/keyboardType/cancel', methods=['POST'])
+def keyboard_type_cancel():
+    """Stop a background typing job between chunks. Body: {"id": 3} (optional; default running job)."""
+    try:
+        data = request.get_json(silent=True) or {}
+        job_id = data.get("id")
+        job = typing_jobs.cancel(job_id)
+        if job is None:
+            if job_id is not None and typing_jobs.get(job_id) is not None:
+                return jsonify({"status": "error", "error": f"Typing job {job_id} already finished"}), 409
+            error = "No such typing job" if job_id is not None else "No typing job running"
+            return jsonify({"status": "error", "error": error}), 404
+        logger.info(f"Typing job {job.id} cancel requested")
+        return jsonify({"status": "success", "job": job.snapshot()})
+    except Exception as e:
+        logger.error(f"Error in keyboardType cancel: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+_INTRUDERS_BASE = os.path.realpath(INTRUDERS_DIR)
 
 
 def _intruder_path(*parts):
@@ -257,7 +397,7 @@ def _intruder_path(*parts):
 def intruders_list():
     """List capture sessions from ~/Desktop/intruders (newest first)."""
     try:
-        sessions = []
+        sessions, sdirs = [], []
         if os.path.isdir(_INTRUDERS_BASE):
             for name in sorted(os.listdir(_INTRUDERS_BASE), reverse=True):
                 sdir = os.path.join(_INTRUDERS_BASE, name)
@@ -266,11 +406,16 @@ def intruders_list():
                 files = os.listdir(sdir)
                 sessions.append({
                     "id": name,
-                    "timestamp": name.replace("session_", ""),
+                    # second resolution; newer ids carry a sub-second suffix after it
+                    "timestamp": name[len("session_"):][:19],
                     "screenshot": "screenshot.png" if "screenshot.png" in files else None,
                     "webcam": "webcam.jpg" if "webcam.jpg" in files else None,
                 })
-        return jsonify({"status": "success", "sessions": sessions})
+                sdirs.append(sdir)
+        # Sessions from before thumbnails existed get them in the background
+        thumbnail_cache.backfill(sdirs)
+        return jsonify({"status": "success", "sessions": sessions,
+                        "thumb_sizes": INTRUDER_THUMB_SIZES})
     except Exception as e:
         logger.error(f"Error listing intruders: {str(e)}")
         return jsonify({"status": "error", "error": str(e)}), 500
@@ -284,7 +429,47 @@ def intruders_file():
     target = _intruder_path(session, name)
     if not target or not os.path.isfile(target):
         return jsonify({"status": "error", "error": "not found"}), 404
-    return send_file(target)
+    return _send_immutable(target)
+
+
+@system_bp.route('/intruders/thumb', methods=['GET'])
+def intruders_thumb():
+    """Serve a capture thumbnail (JPEG). Query: session, name, size (a key of
+    INTRUDER_THUMB_SIZES, default small), token. Generated on first request if
+    the background worker hasn't got to it yet."""
+    try:
+        session = os.path.basename(request.args.get("session", ""))
+        name = os.path.basename(request.args.get("name", ""))
+        size = request.args.get("size", "small")
+        if size not in INTRUDER_THUMB_SIZES:
+            return jsonify({"status": "error", "error": f"Unknown size: {size}"}), 400
+        sdir = _intruder_path(session)
+        if not sdir or sdir == _INTRUDERS_BASE or name not in SOURCE_IMAGES:
+            return jsonify({"status": "error", "error": "not found"}), 404
+        try:
+            path = thumbnail_cache.get(sdir, name, size, timeout=INTRUDER_THUMB_WAIT)
+        except FileNotFoundError:
+            return jsonify({"status": "error", "error": "not found"}), 404
+        except ValueError as e:
+            return jsonify({"status": "error", "error": str(e)}), 422
+        except TimeoutError:
+            response = jsonify({"status": "error", "error": "thumbnail not ready"})
+            response.headers["Retry-After"] = "1"
+            return response, 503
+        return _send_immutable(path)
+    except Exception as e:
+        logger.error(f"Error serving intruder thumbnail: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+
+def _send_immutable(path):
+    """Captures and their thumbnails never change once written: let the client
+    revalidate by ETag/Last-Modified and otherwise keep them for a year."""
+    response = send_file(path, conditional=True, etag=True, max_age=31536000)
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
 
 
 @system_bp.route('/intruders/delete', methods=['POST'])
@@ -313,16 +498,12 @@ def mouse_click():
         data = request.get_json(silent=True) or {}
         rx = float(data.get("rx", -1))
         ry = float(data.get("ry", -1))
-        if not (0.0 <= rx <= 1.0 and 0.0 <= ry <= 1.0):
-            return jsonify({"status": "error", "error": "rx/ry must be between 0 and 1"}), 400
-
-        with mss.mss() as sct:
-            mon = sct.monitors[1]  # primary monitor (logical size)
-            x = mon["left"] + rx * mon["width"]
-            y = mon["top"] + ry * mon["height"]
-
-        _mouse.position = (x, y)
-        _mouse.click(Button.left, 1)
+        clicked = []
+        try:
+            _inject_in_order(lambda: clicked.append(inject_click(rx, ry)))
+        except ValueError as e:
+            return jsonify({"status": "error", "error": str(e)}), 400
+        x, y = clicked[0]
         logger.info(f"mouse-click at ({x:.0f}, {y:.0f})")
         return jsonify({"status": "success"})
     except Exception as e:
@@ -331,37 +512,68 @@ def mouse_click():
 
 @system_bp.route('/pressKey', methods=['POST'])
 def press_key():
-    """Press a key (optionally with modifiers) on the Mac via macOS System Events.
+    """Press a key (optionally with modifiers) on the Mac.
 
     Body: {"key": "c", "modifiers": ["cmd", "shift"]}
       - key: a single printable char ("c", "1", "/") OR a named key in KEY_CODES.
       - modifiers: any of cmd/option/ctrl/shift (optional).
-    osascript handles ALL modifiers reliably (unlike pynput's option/ctrl on macOS).
+    Goes through src/utils/key_injection: native CGEvent posting (handles ALL
+    modifiers, unlike pynput's option/ctrl on macOS) with osascript as the fallback.
     """
     try:
+        received_at, received_wall = time.perf_counter(), wall_ms()
         data = request.get_json(silent=True) or {}
+        session_recorder.record("http", "http", data, received_at, path=request.path)
         key = data.get("key")
         modifiers = data.get("modifiers") or []
 
-        if not isinstance(key, str) or key == "":
-            return jsonify({"status": "error", "error": "Missing 'key'"}), 400
-
-        phrases = [MODIFIER_PHRASES[m] for m in modifiers if m in MODIFIER_PHRASES]
-        using = f" using {{{', '.join(phrases)}}}" if phrases else ""
-
-        if key.lower() in KEY_CODES:
-            action = f"key code {KEY_CODES[key.lower()]}{using}"
-        elif len(key) == 1:
-            ch = key.replace("\\", "\\\\").replace('"', '\\"')  # escape for the AppleScript string literal
-            action = f'keystroke "{ch}"{using}'
-        else:
-            return jsonify({"status": "error", "error": f"Unknown key: {key}"}), 400
-
-        script = f'tell application "System Events" to {action}'
-        subprocess.run(["osascript", "-e", script], capture_output=True)
+        try:
+            started = _inject_in_order(lambda: inject_combo(key, modifiers))
+        except ValueError as e:
+            return jsonify({"status": "error", "error": str(e)}), 400
+        _record_http_key(data, received_at, received_wall, started)
         logger.info(f"pressKey: {modifiers}+{key}")
         return jsonify({"status": "success"})
     except Exception as e:
         logger.error(f"Error in pressKey: {str(e)}")
         return jsonify({"status": "error", "error": str(e)}), 500
 
+@system_bp.route('/input/stats', methods=['POST'])
+def input_stats():
+    """Input latency histograms per path (mouse_ws, input_ws, http_key) and live
+    connection counters. Body {"reset": true} clears the histograms after reading."""
+    try:
+        data = request.get_json(silent=True) or {}
+        snapshot = input_metrics.snapshot()
+        if data.get("reset"):
+            input_metrics.reset()
+        return jsonify({"status": "success", **snapshot})
+    except Exception as e:
+        logger.error(f"Error in input stats: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@system_bp.route('/input/record/start', methods=['POST'])
+def input_record_start():
+    """Start capturing mouse_ws, input_ws and keyboardType/pressKey traffic to a
+    JSONL session log for replay_input.py. Body: {"name": "..."} (optional)."""
+    try:
+        data = request.get_json(silent=True) or {}
+        name = data.get("name")
+        if name is not None and not (isinstance(name, str) and re.fullmatch(r"[A-Za-z0-9_-]{1,64}", name)):
+            return jsonify({"status": "error", "error": "Invalid session name"}), 400
+        path = session_recorder.start(name)
+        return jsonify({"status": "success", "path": path})
+    except Exception as e:
+        logger.error(f"Error starting input recording: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@system_bp.route('/input/record/stop', methods=['POST'])
+def input_record_stop():
+    summary = session_recorder.stop()
+    if summary is None:
+        return jsonify({"status": "error", "error": "Not recording"}), 404
+    return jsonify({"status": "success", **summary})
+
+@system_bp.route('/input/record/status', methods=['POST'])
+def input_record_status():
+    return jsonify({"status": "success", **session_recorder.status()})
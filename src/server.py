@@ -8,9 +8,12 @@ from src.controllers.alerts import alerts_bp
 from src.controllers.api import api_bp
 from src.controllers.files import files_bp
 from src.controllers.qr_generator import auth_bp
+from src.controllers.macro_controller import macro_bp
+from src.controllers.snapshot_controller import snapshot_bp
 from flask_cors import CORS
 from flask_sock import Sock
 from src.controllers.mouse_controller import register_mouse_ws
+from src.controllers.input_controller import register_input_ws
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -30,13 +33,16 @@ def create_app():
     app.register_blueprint(media_bp, url_prefix='/media')
     app.register_blueprint(system_bp, url_prefix='/system')
     app.register_blueprint(stream_bp, url_prefix='/system')
+    app.register_blueprint(snapshot_bp, url_prefix='/system')
     app.register_blueprint(connections_bp, url_prefix='/connections')
     app.register_blueprint(alerts_bp, url_prefix='/alerts')
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(files_bp, url_prefix='/files')
     app.register_blueprint(auth_bp, url_prefix='/auth')
+    app.register_blueprint(macro_bp, url_prefix='/system/macro')
 
     sock = Sock(app)
     register_mouse_ws(sock)
+    register_input_ws(sock)
 
     return app
\ No newline at end of file
@@ -0,0 +1,252 @@
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from collections import OrderedDict
+import numpy as np
+import pyaudio
+from config import (
+    ALERT_CLIPS_DIR, ALERT_CLIP_CACHE_MB, ALERT_CLIP_SAMPLE_RATE, ALERT_CLIP_FRAMES_PER_BUFFER,
+    ALERT_CLIP_IDLE_STOP,
+)
+from src.utils import setup_logger
+
+logger = setup_logger()
+
+CLIP_NAME_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+# Clips that ship with the repo; a user clip with the same name takes precedence.
+BUILTIN_CLIPS = {
+    "go_away": os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "go_away_audio.wav"),
+}
+CHANNELS = 2  # clips are decoded to the output format up front: stereo Int16
+
+
+def decode_wav(path):
+    """Decode a 16-bit PCM WAV into an (n, 2) int16 array at ALERT_CLIP_SAMPLE_RATE."""
+    with wave.open(path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError("only 16-bit PCM WAV is supported")
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+    pcm = pcm.reshape(-1, channels)
+    if channels == 1:
+        pcm = np.repeat(pcm, 2, axis=1)
+    elif channels > 2:
+        pcm = pcm[:, :2]
+
+    if rate != ALERT_CLIP_SAMPLE_RATE and len(pcm):
+        # Linear resample once at load time so playback is a plain copy
+        n_out = int(round(len(pcm) * ALERT_CLIP_SAMPLE_RATE / rate))
+        src_t = np.arange(len(pcm))
+        dst_t = np.linspace(0, len(pcm) - 1, n_out)
+        pcm = np.stack([np.interp(dst_t, src_t, pcm[:, c]) for c in range(2)], axis=1)
+        pcm = np.round(pcm).astype(np.int16)
+    return np.ascontiguousarray(pcm)
+
+
+class ClipLibrary:
+    """Named alert clips on disk, decoded once and held in an LRU cache capped at
+    ALERT_CLIP_CACHE_MB of PCM."""
+
+    def __init__(self, directory=ALERT_CLIPS_DIR):
+        self.directory = directory
+        self._cache = OrderedDict()  # name -> (n, 2) int16 array
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+
+    def path_for(self, name):
+        user_path = os.path.join(self.directory, f"{name}.wav")
+        if os.path.isfile(user_path):
+            return user_path
+        builtin = BUILTIN_CLIPS.get(name)
+        if builtin and os.path.isfile(builtin):
+            return builtin
+        return None
+
+    def names(self):
+        names = set(n for n, p in BUILTIN_CLIPS.items() if os.path.isfile(p))
+        if os.path.isdir(self.directory):
+            names.update(os.path.splitext(f)[0] for f in os.listdir(self.directory) if f.endswith(".wav"))
+        # Only names the routes accept (stray files like "my clip.wav" can't be played)
+        return sorted(n for n in names if CLIP_NAME_RE.match(n))
+
+    def get(self, name):
+        """Return the decoded clip, loading it on a cache miss. None if it doesn't exist."""
+        with self._lock:
+            pcm = self._cache.get(name)
+            if pcm is not None:
+                self._cache.move_to_end(name)
+                return pcm
+
+        path = self.path_for(name)
+        if path is None:
+            return None
+        pcm = decode_wav(path)
+
+        with self._lock:
+            if name in self._cache:
+                self._cache_bytes -= self._cache.pop(name).nbytes
+            self._cache[name] = pcm
+            self._cache_bytes += pcm.nbytes
+            # Evict least recently used clips, but never the one just loaded
+            while self._cache_bytes > ALERT_CLIP_CACHE_MB * 1024 * 1024 and len(self._cache) > 1:
+                evicted, old = self._cache.popitem(last=False)
+                self._cache_bytes -= old.nbytes
+                logger.info(f"Evicted alert clip '{evicted}' from cache")
+        return pcm
+
+    def is_cached(self, name):
+        with self._lock:
+            return name in self._cache
+
+    def invalidate(self, name):
+        with self._lock:
+            pcm = self._cache.pop(name, None)
+            if pcm is not None:
+                self._cache_bytes -= pcm.nbytes
+
+    def save(self, name, file_storage):
+        """Store an uploaded clip as `<name>.wav`, converting non-WAV audio with afconvert,
+        and load it into the cache. Raises ValueError if it can't be decoded."""
+        os.makedirs(self.directory, exist_ok=True)
+        target = os.path.join(self.directory, f"{name}.wav")
+        fd, upload_path = tempfile.mkstemp(dir=self.directory, suffix=".upload")
+        os.close(fd)
+        try:
+            file_storage.save(upload_path)
+            try:
+                decode_wav(upload_path)
+                os.replace(upload_path, target)
+            except (wave.Error, ValueError, EOFError):
+                # Not a 16-bit WAV (m4a/mp3/caf...): let macOS convert it
+                result = subprocess.run(
+                    ["afconvert", "-f", "WAVE", "-d", f"LEI16@{ALERT_CLIP_SAMPLE_RATE}", upload_path, target],
+                    capture_output=True
+                )
+                if result.returncode != 0:
+                    raise ValueError("unsupported audio format")
+        finally:
+            if os.path.exists(upload_path):
+                os.remove(upload_path)
+
+        self.invalidate(name)
+        return self.get(name)
+
+    def delete(self, name):
+        self.invalidate(name)
+        path = os.path.join(self.directory, f"{name}.wav")
+        if not os.path.isfile(path):
+            return False
+        os.remove(path)
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cached": list(self._cache.keys()),
+                "cache_bytes": self._cache_bytes,
+                "cache_limit_bytes": ALERT_CLIP_CACHE_MB * 1024 * 1024,
+            }
+
+
+class ClipPlayer:
+    """Mixes triggered clips into one long-lived callback-mode output stream.
+
+    The stream is opened once (`start()`, called at preload) and kept open; `play()`
+    only appends a voice under a lock, so a trigger is heard on the next callback —
+    one ALERT_CLIP_FRAMES_PER_BUFFER period (~5ms) plus device latency.
+
+    After ALERT_CLIP_IDLE_STOP seconds of silence the callback completes the stream,
+    so an idle player doesn't wake every period; the next `play()` restarts it
+    (the device stays open, so a restart is much cheaper than the first open).
+    """
+
+    def __init__(self, pyaudio_factory):
+        self._pyaudio_factory = pyaudio_factory
+        self._stream = None
+        self._stream_lock = threading.Lock()  # open/restart; never taken by the callback
+        self._voices = []  # [name, pcm, position]
+        self._lock = threading.Lock()
+        self._last_sound = time.monotonic()
+        self._idle = False  # set by the callback when it completes the stream
+
+    def start(self):
+        """Open the output stream, or restart it if it was paused for being idle."""
+        with self._stream_lock:
+            if self._stream is None:
+                with self._lock:
+                    self._last_sound = time.monotonic()
+                    self._idle = False
+                self._stream = self._pyaudio_factory().open(
+                    format=pyaudio.paInt16,
+                    channels=CHANNELS,
+                    rate=ALERT_CLIP_SAMPLE_RATE,
+                    output=True,
+                    frames_per_buffer=ALERT_CLIP_FRAMES_PER_BUFFER,
+                    stream_callback=self._callback
+                )
+                logger.info("Alert clip output stream started")
+                return
+            with self._lock:
+                if not self._idle:
+                    return
+                self._idle = False
+                self._last_sound = time.monotonic()
+            # A completed stream has to be stopped before it can be started again
+            self._stream.stop_stream()
+            self._stream.start_stream()
+            logger.debug("Alert clip output stream resumed")
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        with self._lock:
+            if not self._voices:
+                if time.monotonic() - self._last_sound > ALERT_CLIP_IDLE_STOP:
+                    self._idle = True
+                    return bytes(frame_count * CHANNELS * 2), pyaudio.paComplete
+                return bytes(frame_count * CHANNELS * 2), pyaudio.paContinue
+            self._last_sound = time.monotonic()
+            mix = np.zeros((frame_count, CHANNELS), dtype=np.int32)
+            alive = []
+            for voice in self._voices:
+                _, pcm, pos = voice
+                part = pcm[pos:pos + frame_count]
+                mix[:len(part)] += part
+                voice[2] = pos + len(part)
+                if voice[2] < len(pcm):
+                    alive.append(voice)
+            self._voices = alive
+        return np.clip(mix, -32768, 32767).astype(np.int16).tobytes(), pyaudio.paContinue
+
+    def play(self, name, pcm):
+        """Start a clip; re-triggering a clip that's already playing restarts it."""
+        # Queue first: if the callback is just completing an idle stream, start()
+        # sees the idle flag and restarts it, so the voice is never stranded
+        with self._lock:
+            self._voices = [v for v in self._voices if v[0] != name]
+            self._voices.append([name, pcm, 0])
+        self.start()
+
+    def stop_all(self):
+        with self._lock:
+            self._voices = []
+
+    def playing(self):
+        with self._lock:
+            return [v[0] for v in self._voices]
+
+    def close(self):
+        with self._stream_lock:
+            stream, self._stream = self._stream, None
+        with self._lock:
+            self._voices = []
+        if stream is not None:
+            try:
+                stream.stop_stream()
+                stream.close()
+            except Exception:
+                logger.warning("Error closing alert clip stream")
@@ -0,0 +1,187 @@
+import threading
+import time
+import pyaudio
+from config import ALERTS_JITTER_TARGET_MS, ALERTS_JITTER_MAX_TARGET_MS, ALERTS_JITTER_MAX_MS
+from src.utils import setup_logger
+
+logger = setup_logger()
+
+# Frames handed to PyAudio per write (~23ms at 44.1kHz) — also the output buffer size.
+BLOCK_FRAMES = 1024
+# A dry buffer that refills within this window was a glitch (underrun), not the end of a talk.
+UNDERRUN_WINDOW = 1.0
+# Step for the adaptive target; it grows on each underrun and decays after a clean stretch.
+TARGET_STEP_MS = 20
+TARGET_DECAY_AFTER = 10.0
+
+
+class AudioPlayer:
+    """Dedicated playback thread fed by an adaptive jitter buffer.
+
+    Request handlers call `enqueue()` and return immediately; the thread owns the
+    PyAudio output stream and is the only caller of the blocking `stream.write()`.
+    Playback starts once `target_ms` of audio is buffered. Each underrun (buffer ran
+    dry mid-stream) raises the target by TARGET_STEP_MS up to
+    ALERTS_JITTER_MAX_TARGET_MS; it decays back towards ALERTS_JITTER_TARGET_MS after
+    TARGET_DECAY_AFTER seconds without one. Audio buffered beyond ALERTS_JITTER_MAX_MS
+    is dropped from the head (an overrun) so latency can't grow without bound.
+    """
+
+    def __init__(self, pyaudio_factory):
+        self._pyaudio_factory = pyaudio_factory
+        self._cond = threading.Condition()
+        self._buffer = bytearray()
+        self._format = None          # (sample_rate, channels) of the buffered audio
+        self._playing = False        # False while pre-buffering
+        self._dry_since = None
+        self._last_put = 0.0
+        self._last_adjust = 0.0      # last underrun or decay step
+        self._target_ms = ALERTS_JITTER_TARGET_MS
+        self._thread = None
+        self._stop = False
+        self._stream = None
+        self._stream_format = None
+        self.stats = {
+            "chunks_in": 0,
+            "blocks_played": 0,
+            "underruns": 0,
+            "overruns": 0,
+            "dropped_ms": 0.0,
+            "format_changes": 0,
+        }
+
+    @staticmethod
+    def _bytes_per_ms(fmt):
+        sample_rate, channels = fmt
+        return sample_rate * channels * 2 / 1000.0
+
+    def _aligned(self, nbytes):
+        frame = 2 * self._format[1]
+        return int(nbytes) - int(nbytes) % frame
+
+    def enqueue(self, audio_data, sample_rate, channels):
+        """Queue one Int16 PCM chunk for playback. Never blocks on the device."""
+        fmt = (sample_rate, channels)
+        now = time.monotonic()
+        with self._cond:
+            if self._format != fmt:
+                if self._format is not None:
+                    self.stats["format_changes"] += 1
+                self._buffer.clear()
+                self._format = fmt
+                self._playing = False
+                self._dry_since = None
+
+            if self._dry_since is not None:
+                if now - self._dry_since < UNDERRUN_WINDOW:
+                    self.stats["underruns"] += 1
+                    self._last_adjust = now
+                    self._target_ms = min(ALERTS_JITTER_MAX_TARGET_MS, self._target_ms + TARGET_STEP_MS)
+                self._dry_since = None
+
+            self._buffer += audio_data
+            self._last_put = now
+            self.stats["chunks_in"] += 1
+
+            bpms = self._bytes_per_ms(fmt)
+            if len(self._buffer) > ALERTS_JITTER_MAX_MS * bpms:
+                drop = self._aligned(len(self._buffer) - self._target_ms * bpms)
+                del self._buffer[:drop]
+                self.stats["overruns"] += 1
+                self.stats["dropped_ms"] += drop / bpms
+
+            self._ensure_thread()
+            self._cond.notify()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name="alerts-playback", daemon=True)
+            self._thread.start()
+
+    def _next_block(self):
+        """Wait for a block that's ready to play. Returns (bytes, format) or None on stop."""
+        with self._cond:
+            while not self._stop:
+                now = time.monotonic()
+                if self._buffer:
+                    bpms = self._bytes_per_ms(self._format)
+                    if not self._playing:
+                        # Start once the target is buffered — or when the sender has gone
+                        # quiet, so the tail of a short clip isn't stuck in the buffer.
+                        idle = (now - self._last_put) * 1000 >= self._target_ms
+                        if len(self._buffer) >= self._target_ms * bpms or idle:
+                            self._playing = True
+                    if self._playing:
+                        block = bytes(self._buffer[:BLOCK_FRAMES * 2 * self._format[1]])
+                        del self._buffer[:len(block)]
+                        if (self._target_ms > ALERTS_JITTER_TARGET_MS and
+                                now - self._last_adjust >= TARGET_DECAY_AFTER):
+                            self._target_ms = max(ALERTS_JITTER_TARGET_MS, self._target_ms - TARGET_STEP_MS)
+                            self._last_adjust = now
+                        return block, self._format
+                elif self._playing:
+                    self._playing = False
+                    self._dry_since = now
+                self._cond.wait(self._target_ms / 1000.0 if self._buffer else 0.5)
+        return None
+
+    def _open(self, fmt):
+        self._close_stream()
+        sample_rate, channels = fmt
+        self._stream = self._pyaudio_factory().open(
+            format=pyaudio.paInt16,
+            channels=channels,
+            rate=sample_rate,
+            output=True,
+            frames_per_buffer=BLOCK_FRAMES
+        )
+        self._stream_format = fmt
+        logger.info(f"New audio stream: {sample_rate}Hz, {channels} channel(s)")
+
+    def _close_stream(self):
+        if self._stream:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except Exception:
+                logger.warning("Error closing previous stream")
+        self._stream = None
+        self._stream_format = None
+
+    def _run(self):
+        while True:
+            item = self._next_block()
+            if item is None:
+                break
+            block, fmt = item
+            try:
+                if self._stream is None or self._stream_format != fmt:
+                    self._open(fmt)
+                self._stream.write(block)
+                with self._cond:  # stats are only ever touched under the lock
+                    self.stats["blocks_played"] += 1
+            except Exception as e:
+                logger.error(f"Playback error: {str(e)}")
+                # Drop the stream; the next block reopens it
+                self._close_stream()
+        self._close_stream()
+
+    def get_stats(self):
+        with self._cond:
+            snapshot = dict(self.stats)
+            snapshot["dropped_ms"] = round(snapshot["dropped_ms"], 1)
+            snapshot["target_ms"] = self._target_ms
+            snapshot["buffered_ms"] = (round(len(self._buffer) / self._bytes_per_ms(self._format), 1)
+                                       if self._format else 0.0)
+            snapshot["playing"] = self._playing
+        return snapshot
+
+    def stop(self):
+        """Stop the playback thread and release the output stream."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
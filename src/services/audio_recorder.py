@@ -0,0 +1,257 @@
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from config import (
+    ALERTS_RECORDING_MAX_SECONDS, ALERTS_RECORDING_MAX_MB, ALERTS_RECORDING_IDLE_SECONDS,
+    ALERTS_RECORDING_COMPRESS, ALERTS_RECORDING_DIR_MAX_MB,
+)
+from src.utils import setup_logger
+
+logger = setup_logger()
+
+# afconvert (ships with macOS) arguments per compression choice -> (args, extension)
+_COMPRESSORS = {
+    "flac": (["-f", "flac", "-d", "flac"], ".flac"),
+    "aac": (["-f", "m4af", "-d", "aac"], ".m4a"),
+}
+# Only files the recorder itself produced are ever pruned (names built in write())
+_SEGMENT_RE = re.compile(r"^\d{8}_\d{6}_\d+Hz_\d+ch(_\d+)?\.(wav|flac|m4a)$")
+_QUEUE_MAX = 2000  # chunks (~40s at typical chunk rates) before new audio is dropped
+# The writer waits a little longer than the enqueue side before closing an idle
+# segment, so it can never close a segment that write() is still adding to.
+_IDLE_GRACE = 5.0
+_STOP = object()
+
+
+class AudioRecorder:
+    """Background WAV recorder for the live alert stream.
+
+    `write()` only decides which segment a chunk belongs to and queues it; the
+    writer thread keeps that segment's file open and appends with
+    `writeframesraw` (no per-chunk header rewrite). A segment is finalized — header
+    patched, file closed — on rotation (format change, ALERTS_RECORDING_MAX_SECONDS,
+    ALERTS_RECORDING_MAX_MB), after ALERTS_RECORDING_IDLE_SECONDS without audio, and
+    on `stop()`. Finished segments are optionally compressed with afconvert, and the
+    oldest recordings are pruned once the directory exceeds ALERTS_RECORDING_DIR_MAX_MB.
+    Compression and pruning run one at a time on a single post-processing thread,
+    and pruning never touches a segment that is still waiting to be compressed.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._queue = queue.Queue(maxsize=_QUEUE_MAX)
+        self._lock = threading.Lock()
+        self._thread = None
+        # Segment bookkeeping on the enqueue side (cheap, in memory)
+        self._segment = None         # path of the segment new chunks go to
+        self._segment_format = None
+        self._segment_bytes = 0
+        self._segment_started = 0.0
+        self._last_write = 0.0
+        # Writer-thread state
+        self._file = None
+        self._wave = None
+        self._open_path = None
+        # Post-processing (compress, prune): one serial worker
+        self._post = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alerts-recorder-post")
+        self._compressing = set()  # finalized WAVs not yet compressed
+        self._compress_lock = threading.Lock()
+        # Counters are bumped from the writer and post-processing threads
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "chunks_written": 0,
+            "chunks_dropped": 0,
+            "segments_finalized": 0,
+            "segments_compressed": 0,
+            "files_pruned": 0,
+        }
+
+    def write(self, audio_data, sample_rate, channels):
+        """Queue one Int16 PCM chunk for recording. Returns the segment path it goes to."""
+        now = time.monotonic()
+        fmt = (sample_rate, channels)
+        with self._lock:
+            if (self._segment is None or
+                    self._segment_format != fmt or
+                    self._segment_bytes >= ALERTS_RECORDING_MAX_MB * 1024 * 1024 or
+                    now - self._segment_started >= ALERTS_RECORDING_MAX_SECONDS or
+                    now - self._last_write >= ALERTS_RECORDING_IDLE_SECONDS):
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                self._segment = self._unique_path(f"{timestamp}_{sample_rate}Hz_{channels}ch")
+                self._segment_format = fmt
+                self._segment_bytes = 0
+                self._segment_started = now
+            self._segment_bytes += len(audio_data)
+            self._last_write = now
+            path = self._segment
+
+            self._ensure_thread()
+            try:
+                self._queue.put_nowait((path, fmt, audio_data))
+            except queue.Full:
+                self._count("chunks_dropped")
+        return path
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _unique_path(self, stem):
+        path = os.path.join(self.directory, f"{stem}.wav")
+        n = 1
+        while path == self._segment or os.path.exists(path):
+            path = os.path.join(self.directory, f"{stem}_{n}.wav")
+            n += 1
+        return path
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="alerts-recorder", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=ALERTS_RECORDING_IDLE_SECONDS + _IDLE_GRACE)
+            except queue.Empty:
+                self._finalize()
+                continue
+            if item is _STOP:
+                break
+
+            # Batch whatever else is already queued for the same segment into one write
+            path, fmt, data = item
+            frames = [data]
+            stop_after = False
+            while True:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop_after = True
+                    break
+                if nxt[0] != path:
+                    self._write(path, fmt, frames)
+                    path, fmt, frames = nxt[0], nxt[1], []
+                frames.append(nxt[2])
+            self._write(path, fmt, frames)
+            if stop_after:
+                break
+        self._finalize()
+
+    def _write(self, path, fmt, frames):
+        try:
+            if self._open_path != path:
+                self._finalize()
+                self._open(path, fmt)
+            self._wave.writeframesraw(b"".join(frames))
+            self._count("chunks_written", len(frames))
+        except Exception as e:
+            logger.error(f"File writing error: {str(e)}")
+
+    def _open(self, path, fmt):
+        sample_rate, channels = fmt
+        os.makedirs(self.directory, exist_ok=True)
+        self._file = open(path, "wb", buffering=256 * 1024)
+        self._wave = wave.open(self._file, "wb")
+        self._wave.setnchannels(channels)
+        self._wave.setsampwidth(2)  # 16-bit = 2 bytes
+        self._wave.setframerate(sample_rate)
+        self._open_path = path
+        logger.info(f"Recording alert stream to {path}")
+
+    def _finalize(self):
+        """Patch the WAV header and close the open segment, if any."""
+        if self._wave is None:
+            return
+        path = self._open_path
+        try:
+            self._wave.close()  # patches the header with the real length
+            self._file.close()  # wave doesn't close a file object it was handed
+            self._count("segments_finalized")
+            logger.info(f"Finalized recording {path}")
+        except Exception as e:
+            logger.error(f"Error finalizing recording {path}: {str(e)}")
+            path = None
+        self._wave = None
+        self._file = None
+        self._open_path = None
+
+        if path and ALERTS_RECORDING_COMPRESS in _COMPRESSORS:
+            with self._compress_lock:
+                self._compressing.add(path)
+            self._post.submit(self._compress, path)
+        else:
+            self._post.submit(self._prune)
+
+    def _compress(self, path):
+        args, ext = _COMPRESSORS[ALERTS_RECORDING_COMPRESS]
+        target = os.path.splitext(path)[0] + ext
+        try:
+            result = subprocess.run(["afconvert", *args, path, target], capture_output=True)
+            if result.returncode == 0 and os.path.exists(target):
+                os.remove(path)
+                self._count("segments_compressed")
+            else:
+                logger.warning(f"afconvert failed for {path}: {result.stderr.decode(errors='replace').strip()}")
+        except Exception as e:
+            logger.error(f"Error compressing recording {path}: {str(e)}")
+        finally:
+            with self._compress_lock:
+                self._compressing.discard(path)
+        self._prune()
+
+    def _prune(self):
+        """Delete the oldest finished recordings while the directory is over its cap.
+
+        Only recorder segments count (by name), never the segment being written
+        or one still queued for compression.
+        """
+        try:
+            with self._compress_lock:
+                skip = {self._open_path, self._segment, *self._compressing}
+            entries = []
+            for name in os.listdir(self.directory):
+                p = os.path.join(self.directory, name)
+                if _SEGMENT_RE.match(name) and os.path.isfile(p) and p not in skip:
+                    st = os.stat(p)
+                    entries.append((st.st_mtime, st.st_size, p))
+            total = sum(size for _, size, _ in entries)
+            limit = ALERTS_RECORDING_DIR_MAX_MB * 1024 * 1024
+            for _, size, p in sorted(entries):
+                if total <= limit:
+                    break
+                os.remove(p)
+                total -= size
+                self._count("files_pruned")
+                logger.info(f"Pruned old recording {p}")
+        except Exception as e:
+            logger.error(f"Error pruning recordings: {str(e)}")
+
+    def get_stats(self):
+        with self._stats_lock:
+            snapshot = dict(self.stats)
+        with self._lock:
+            segment = self._segment
+        snapshot["queued"] = self._queue.qsize()
+        snapshot["current_file"] = os.path.basename(segment) if segment else None
+        return snapshot
+
+    def stop(self):
+        """Flush queued audio, finalize the open segment and stop the writer thread.
+
+        Final (called at exit): pending compression/pruning is abandoned rather
+        than waited for.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout=5.0)
+        self._thread = None
+        self._post.shutdown(wait=False)
@@ -0,0 +1,175 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from src.utils import setup_logger
+from src.utils.input_metrics import LatencyHistogram
+from config import COMMAND_WORKERS, COMMAND_LANE_LIMITS, COMMAND_JOB_HISTORY
+
+logger = setup_logger()
+
+
+class Job:
+    """One dispatched command. `state` goes queued -> running -> done | failed."""
+
+    def __init__(self, job_id, lane, name, action):
+        self.id = job_id
+        self.lane = lane
+        self.name = name
+        self.action = action
+        self.state = "queued"
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.queued_at = time.perf_counter()
+        self.wait_ms = None
+        self.run_ms = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """True once the job finished (either way) within `timeout`."""
+        return self._done.wait(timeout)
+
+    def snapshot(self):
+        return {
+            "id": self.id,
+            "lane": self.lane,
+            "name": self.name,
+            "state": self.state,
+            "error": str(self.error) if self.error else None,
+            "submitted_at": round(self.submitted_at, 3),
+            "wait_ms": round(self.wait_ms, 2) if self.wait_ms is not None else None,
+            "run_ms": round(self.run_ms, 2) if self.run_ms is not None else None,
+        }
+
+
+class _Lane:
+    def __init__(self, name, priority, limit):
+        self.name = name
+        self.priority = priority
+        self.limit = limit
+        self.queue = deque()
+        self.running = 0
+        self.max_depth = 0
+        self.counts = {"submitted": 0, "done": 0, "failed": 0}
+        self.wait = LatencyHistogram()
+        self.run = LatencyHistogram()
+
+    def snapshot(self):
+        return {
+            "priority": self.priority,
+            "limit": self.limit,
+            "depth": len(self.queue),
+            "max_depth": self.max_depth,
+            "running": self.running,
+            **self.counts,
+            "wait": self.wait.snapshot(),
+            "run": self.run.snapshot(),
+        }
+
+
+class CommandDispatcher:
+    """Bounded worker pool with priority lanes.
+
+    A free worker always takes the oldest job of the highest-priority lane that
+    still has room under its limit (COMMAND_LANE_LIMITS, listed in priority
+    order). Keeping the lower lanes' limits below the pool size means a burst of
+    slow actions there leaves workers free for the lanes above. Workers start on
+    first use. Input injections don't come here (see dispatch_input).
+    """
+
+    def __init__(self, workers=COMMAND_WORKERS, lane_limits=COMMAND_LANE_LIMITS, history=COMMAND_JOB_HISTORY):
+        self._cond = threading.Condition()
+        self._lanes = {name: _Lane(name, i, min(limit, workers))
+                       for i, (name, limit) in enumerate(lane_limits.items())}
+        self._workers = workers
+        self._threads = []
+        self._ids = itertools.count(1)
+        self._jobs = OrderedDict()  # id -> Job, newest last
+        self._history = history
+
+    def _ensure_workers(self):
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self._workers:
+            t = threading.Thread(target=self._run, name=f"command-{len(self._threads) + 1}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, lane, name, action):
+        """Queue `action()` on `lane` and return its Job. KeyError on an unknown lane."""
+        with self._cond:
+            lane_obj = self._lanes[lane]
+            job = Job(next(self._ids), lane, name, action)
+            lane_obj.queue.append(job)
+            lane_obj.counts["submitted"] += 1
+            lane_obj.max_depth = max(lane_obj.max_depth, len(lane_obj.queue))
+            self._jobs[job.id] = job
+            self._trim()
+            self._ensure_workers()
+            self._cond.notify()
+            return job
+
+    def run(self, lane, name, action):
+        """Submit and wait; returns the action's result or raises its exception."""
+        job = self.submit(lane, name, action)
+        job.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _trim(self):
+        # Forget the oldest finished jobs beyond the history size
+        excess = len(self._jobs) - self._history
+        for job_id in [j.id for j in self._jobs.values() if j.state in ("done", "failed")][:max(0, excess)]:
+            del self._jobs[job_id]
+
+    def _next_job(self):
+        for lane in sorted(self._lanes.values(), key=lambda l: l.priority):
+            if lane.queue and lane.running < lane.limit:
+                lane.running += 1
+                return lane, lane.queue.popleft()
+        return None, None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                lane, job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    lane, job = self._next_job()
+                job.state = "running"
+            started = time.perf_counter()
+            try:
+                job.result = job.action()
+                state = "done"
+            except Exception as e:
+                job.error = e
+                state = "failed"
+            finished = time.perf_counter()
+            with self._cond:
+                job.wait_ms = (started - job.queued_at) * 1000
+                job.run_ms = (finished - started) * 1000
+                job.state = state
+                job.action = None
+                lane.running -= 1
+                lane.counts[state] += 1
+                lane.wait.record(job.wait_ms)
+                lane.run.record(job.run_ms)
+                # A lane slot freed up: a worker may be waiting for exactly that
+                self._cond.notify_all()
+            job._done.set()
+
+    def get(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job else None
+
+    def stats(self):
+        with self._cond:
+            return {
+                "workers": self._workers,
+                "lanes": {name: lane.snapshot() for name, lane in self._lanes.items()},
+            }
+
+
+command_dispatcher = CommandDispatcher()
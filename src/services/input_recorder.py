@@ -0,0 +1,104 @@
+import base64
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from config import INPUT_SESSIONS_DIR, INPUT_SESSION_MAX_EVENTS
+from src.utils import setup_logger
+
+logger = setup_logger()
+
+
+class InputSessionRecorder:
+    """Captures live input traffic as a timestamped JSONL event log for replay_input.py.
+
+    One line per received message: {"t": seconds since start, "ch": channel,
+    "conn": connection id, ...} with the raw payload as "text", "bin" (base64) or,
+    for HTTP routes, "path" + "body". The first line of each connection also
+    carries its "proto" ("json"/"bin"). Recording is off unless started, and a
+    `record()` call while off is a single attribute check.
+    """
+
+    def __init__(self, directory=INPUT_SESSIONS_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._file = None
+        self._path = None
+        self._started = 0.0
+        self._events = 0
+        self._seen = set()
+        self.active = False
+
+    def start(self, name=None):
+        """Start a new recording (stopping any current one). Returns its path."""
+        self.stop()
+        stem = name or datetime.now().strftime("session_%Y%m%d_%H%M%S")
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            self._path = os.path.join(self.directory, f"{stem}.jsonl")
+            self._file = open(self._path, "w", buffering=64 * 1024)
+            self._started = time.perf_counter()
+            self._events = 0
+            self._seen = set()
+            self.active = True
+        logger.info(f"Recording input session to {self._path}")
+        return self._path
+
+    def stop(self):
+        """Stop recording. Returns {"path", "events", "duration_s"} or None if not recording."""
+        with self._lock:
+            if self._file is None:
+                return None
+            self.active = False
+            self._file.close()
+            self._file = None
+            summary = {
+                "path": self._path,
+                "events": self._events,
+                "duration_s": round(time.perf_counter() - self._started, 3),
+            }
+        logger.info(f"Input session recording stopped: {summary}")
+        return summary
+
+    def record(self, channel, conn_id, raw, received_at=None, proto=None, path=None):
+        """Log one received message. `raw` is the WS frame (str/bytes) or, with
+        `path`, an HTTP JSON body. `received_at` is a time.perf_counter() value."""
+        if not self.active:
+            return
+        entry = {"ch": channel, "conn": conn_id}
+        if path is not None:
+            entry["path"] = path
+            entry["body"] = raw
+        elif isinstance(raw, str):
+            entry["text"] = raw
+        else:
+            entry["bin"] = base64.b64encode(raw).decode("ascii")
+        with self._lock:
+            if self._file is None:
+                return
+            entry["t"] = round((received_at or time.perf_counter()) - self._started, 6)
+            if conn_id not in self._seen:
+                self._seen.add(conn_id)
+                if proto is not None:
+                    entry["proto"] = proto
+            self._file.write(json.dumps(entry) + "\n")
+            self._events += 1
+            full = self._events >= INPUT_SESSION_MAX_EVENTS
+        if full:
+            logger.warning(f"Input session reached {INPUT_SESSION_MAX_EVENTS} events; stopping")
+            self.stop()
+
+    def status(self):
+        with self._lock:
+            if self._file is None:
+                return {"recording": False}
+            return {
+                "recording": True,
+                "path": self._path,
+                "events": self._events,
+                "duration_s": round(time.perf_counter() - self._started, 3),
+            }
+
+
+session_recorder = InputSessionRecorder()
@@ -0,0 +1,76 @@
+import queue
+import threading
+import time
+from src.utils import setup_logger
+
+logger = setup_logger()
+
+
+class InputWorker:
+    """Single thread that performs every queued input injection in arrival order.
+
+    `submit()` returns immediately; `on_done(error, timing)` is called on the worker
+    thread after the action ran, with `error` None on success and `timing` holding
+    queue_ms (waiting behind earlier events), inject_ms (the action itself) and
+    total_ms, all measured from when the event was received.
+    """
+
+    def __init__(self, name="input-worker"):
+        self._name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+
+    def submit(self, action, on_done=None, received_at=None):
+        self._ensure_thread()
+        self._queue.put((action, on_done, received_at or time.perf_counter()))
+
+    def run(self, action):
+        """Submit and wait for completion (for callers off the worker thread).
+        Returns the exception the action raised, or None."""
+        done = threading.Event()
+        result = {}
+
+        def on_done(error, timing):
+            result["error"] = error
+            done.set()
+
+        self.submit(action, on_done)
+        done.wait()
+        return result.get("error")
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            action, on_done, received_at = self._queue.get()
+            started = time.perf_counter()
+            error = None
+            try:
+                action()
+            except Exception as e:
+                error = e
+            finished = time.perf_counter()
+            if on_done is None:
+                if error is not None:
+                    logger.error(f"{self._name} action failed: {error}")
+                continue
+            try:
+                on_done(error, {
+                    "queue_ms": round((started - received_at) * 1000, 2),
+                    "inject_ms": round((finished - started) * 1000, 2),
+                    "total_ms": round((finished - received_at) * 1000, 2),
+                })
+            except Exception as e:
+                logger.error(f"{self._name} completion callback failed: {e}")
+
+
+# Shared by every input_ws connection so keystrokes from all clients stay ordered
+input_worker = InputWorker()
@@ -0,0 +1,116 @@
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import cv2
+import numpy as np
+from src.utils import setup_logger
+from src.utils.display_geometry import display_geometry
+from src.services.intruder_thumbs import thumbnail_cache
+from config import INTRUDERS_DIR
+
+logger = setup_logger()
+
+# Screen grab and webcam read run side by side; encoding/writing happens later on
+# its own single thread, after the display is already asleep
+_capture_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="intruder-capture")
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="intruder-writer")
+
+
+def grab_screen():
+    """Primary display as a BGRA array, grabbed in-process (no screencapture spawn)."""
+    import mss
+    with mss.mss() as sct:
+        shot = sct.grab(display_geometry.get())
+    return np.array(shot)
+
+
+def grab_webcam():
+    """One frame from the default camera, raw (adjustments are applied when saving)."""
+    cap = cv2.VideoCapture(0)  # 0 = default camera
+    if not cap.isOpened():
+        raise RuntimeError("Could not access webcam")
+    try:
+        # Set camera properties for better quality
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+        cap.set(cv2.CAP_PROP_BRIGHTNESS, 0.6)  # Adjust brightness (0-1)
+        cap.set(cv2.CAP_PROP_AUTOFOCUS, 1)      # Enable autofocus
+        cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 1)  # Enable auto-exposure
+
+        # Warm-up the camera sensor
+        for _ in range(5):
+            cap.read()
+
+        # Capture frame with retries
+        for _ in range(3):
+            ret, frame = cap.read()
+            if ret and frame is not None:
+                return frame
+            time.sleep(0.1)
+        raise RuntimeError("Failed to capture webcam frame")
+    finally:
+        cap.release()  # Always release camera
+
+
+def _write_image(path, image, params=()):
+    # Encode to a temp name and rename, so the gallery never lists a half-written file
+    ok, data = cv2.imencode(os.path.splitext(path)[1], image, list(params))
+    if not ok:
+        raise RuntimeError(f"Could not encode {os.path.basename(path)}")
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data.tobytes())
+    os.replace(tmp, path)
+
+
+def _save_session(session_path, screen, webcam):
+    try:
+        os.makedirs(session_path, exist_ok=True)
+        if webcam is not None:
+            webcam = cv2.convertScaleAbs(webcam, alpha=1.2, beta=20)  # Increase contrast and brightness
+            _write_image(os.path.join(session_path, "webcam.jpg"), webcam)
+        if screen is not None:
+            screen = cv2.cvtColor(screen, cv2.COLOR_BGRA2BGR)
+            # Fastest zlib level: the PNG stays lossless, most of its cost is compression
+            _write_image(os.path.join(session_path, "screenshot.png"), screen, (cv2.IMWRITE_PNG_COMPRESSION, 1))
+        logger.info(f"Intruder session saved: {os.path.basename(session_path)}")
+        thumbnail_cache.schedule_session(session_path)
+    except Exception as e:
+        logger.error(f"Error saving intruder session {session_path}: {e}")
+
+
+def lock_display():
+    subprocess.run(["pmset", "displaysleepnow"], check=True)
+
+
+def capture_and_lock():
+    """Grab the screen and a webcam frame concurrently, sleep the display as soon as
+    both are in memory, then encode and write them in the background.
+
+    The display is put to sleep even if a capture failed. Returns
+    {"session", "lock_after_ms", "errors"}; errors maps "screen"/"webcam" to the
+    failure message (empty when both frames were captured).
+    """
+    started = time.perf_counter()
+    # Microseconds keep two captures in the same second apart: files are served as
+    # immutable, so a session id (and its URLs) must never be reused
+    session = f"session_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S_%f')}"
+    futures = {"screen": _capture_pool.submit(grab_screen), "webcam": _capture_pool.submit(grab_webcam)}
+
+    frames, errors = {}, {}
+    for name, future in futures.items():
+        try:
+            frames[name] = future.result()
+        except Exception as e:
+            frames[name] = None
+            errors[name] = str(e)
+            logger.error(f"Intruder {name} capture failed: {e}")
+
+    lock_display()
+    lock_after_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    if frames["screen"] is not None or frames["webcam"] is not None:
+        _writer.submit(_save_session, os.path.join(INTRUDERS_DIR, session), frames["screen"], frames["webcam"])
+    return {"session": session, "lock_after_ms": lock_after_ms, "errors": errors}
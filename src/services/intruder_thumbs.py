@@ -0,0 +1,133 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from src.utils import setup_logger
+from config import INTRUDER_THUMB_SIZES, INTRUDER_THUMB_QUALITY, INTRUDER_THUMB_WORKERS
+
+logger = setup_logger()
+
+# Capture images a session can hold (see intruder_capture)
+SOURCE_IMAGES = ("screenshot.png", "webcam.jpg")
+
+
+def thumb_path(session_path, name, size):
+    stem = os.path.splitext(name)[0]
+    return os.path.join(session_path, "thumbs", f"{stem}_{size}.jpg")
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _is_fresh(path, source):
+    try:
+        return os.path.getmtime(path) >= os.path.getmtime(source)
+    except OSError:
+        return False
+
+
+class ThumbnailCache:
+    """Generates every INTRUDER_THUMB_SIZES thumbnail of a capture image once, on a
+    small worker pool, and keeps them on disk next to the session.
+
+    One decode per source image produces all sizes (largest first, each smaller
+    one downscaled from the previous). Concurrent requests for the same image
+    share one generation job. A source that fails is not retried until the file
+    changes (new mtime).
+    """
+
+    def __init__(self, workers=INTRUDER_THUMB_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="intruder-thumbs")
+        self._lock = threading.RLock()  # a done-callback may run inside ensure()
+        self._inflight = {}  # source path -> Future
+        self._failed = {}  # source path -> mtime of the version that failed
+        self._backfilled = set()  # session paths already checked by backfill()
+
+    def _missing(self, session_path, name):
+        source = os.path.join(session_path, name)
+        return [s for s in INTRUDER_THUMB_SIZES if not _is_fresh(thumb_path(session_path, name, s), source)]
+
+    def ensure(self, session_path, name):
+        """Future for the image's thumbnails, or None when they're already on disk
+        (or there is no such image)."""
+        source = os.path.join(session_path, name)
+        if not os.path.isfile(source) or self.failed(source) or not self._missing(session_path, name):
+            return None
+        with self._lock:
+            future = self._inflight.get(source)
+            if future is None:
+                future = self._pool.submit(self._generate, session_path, name)
+                self._inflight[source] = future
+                future.add_done_callback(lambda f: self._done(source, f))
+            return future
+
+    def failed(self, source):
+        """Whether this version of the source image already failed to generate."""
+        with self._lock:
+            mtime = self._failed.get(source)
+        return mtime is not None and mtime == _mtime(source)
+
+    def _done(self, source, future):
+        with self._lock:
+            self._inflight.pop(source, None)
+            if future.exception() is not None:
+                self._failed[source] = _mtime(source)
+        if future.exception() is not None:
+            logger.warning(f"Thumbnail generation failed for {source}: {future.exception()}")
+
+    def schedule_session(self, session_path):
+        """Queue thumbnail generation for every capture image in a session."""
+        for name in SOURCE_IMAGES:
+            self.ensure(session_path, name)
+
+    def backfill(self, session_paths):
+        """Queue thumbnails for sessions this process hasn't checked yet (sessions
+        from before thumbnails existed). The file checks run on the worker pool, and
+        each session is only checked once, so listing stays cheap."""
+        with self._lock:
+            new = [p for p in session_paths if p not in self._backfilled]
+            self._backfilled.update(new)
+        if new:
+            self._pool.submit(lambda: [self.schedule_session(p) for p in new])
+
+    def get(self, session_path, name, size, timeout):
+        """Path of a thumbnail, generating it first if needed. FileNotFoundError if
+        the source image doesn't exist; TimeoutError if generation takes too long;
+        ValueError if this version of the image can't be thumbnailed."""
+        future = self.ensure(session_path, name)
+        if future is not None:
+            future.result(timeout=timeout)
+        path = thumb_path(session_path, name, size)
+        if not os.path.isfile(path):
+            if self.failed(os.path.join(session_path, name)):
+                raise ValueError(f"Could not generate thumbnails for {name}")
+            raise FileNotFoundError(name)
+        return path
+
+    def _generate(self, session_path, name):
+        source = os.path.join(session_path, name)
+        image = cv2.imread(source, cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError(f"Could not decode {name}")
+        os.makedirs(os.path.join(session_path, "thumbs"), exist_ok=True)
+        for size, edge in sorted(INTRUDER_THUMB_SIZES.items(), key=lambda kv: -kv[1]):
+            height, width = image.shape[:2]
+            scale = edge / max(height, width)
+            if scale < 1:
+                image = cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                                   interpolation=cv2.INTER_AREA)
+            ok, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, INTRUDER_THUMB_QUALITY])
+            if not ok:
+                raise RuntimeError(f"Could not encode {name} thumbnail")
+            path = thumb_path(session_path, name, size)
+            with open(f"{path}.tmp", "wb") as f:
+                f.write(data.tobytes())
+            os.replace(f"{path}.tmp", path)
+        logger.debug(f"Thumbnails generated for {os.path.basename(session_path)}/{name}")
+
+
+thumbnail_cache = ThumbnailCache()
@@ -0,0 +1,136 @@
+import itertools
+import json
+import os
+import threading
+import time
+from config import MACROS_FILE
+from src.utils import setup_logger
+
+logger = setup_logger()
+
+
+class MacroStore:
+    """Named macros (lists of step dicts) persisted to MACROS_FILE."""
+
+    def __init__(self, path=MACROS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._macros = self._load()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r") as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading macros: {e}")
+        return {}
+
+    def _save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._macros, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def names(self):
+        with self._lock:
+            return {name: len(steps) for name, steps in sorted(self._macros.items())}
+
+    def get(self, name):
+        with self._lock:
+            return self._macros.get(name)
+
+    def put(self, name, steps):
+        with self._lock:
+            self._macros[name] = steps
+            self._save()
+
+    def delete(self, name):
+        with self._lock:
+            if self._macros.pop(name, None) is None:
+                return False
+            self._save()
+            return True
+
+
+class MacroRun:
+    def __init__(self, run_id, name, steps):
+        self.id = run_id
+        self.name = name
+        self.steps = steps
+        self.step = 0  # index of the step being run / next to run
+        self.status = "running"  # running | done | cancelled | error
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+
+    def snapshot(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "step": self.step,
+            "total": len(self.steps),
+            "error": self.error,
+            "elapsed_s": round((self.finished_at or time.time()) - self.started_at, 3),
+        }
+
+
+class MacroRunner:
+    """Runs one compiled macro at a time on a background thread.
+
+    A compiled macro is a list of steps, each either ("wait", seconds) or
+    ("do", action) where action is a zero-arg injection. Actions go through the
+    input worker, so they stay ordered with other input; waits are measured from
+    the end of the previous step and are cut short by `cancel()`.
+    """
+
+    def __init__(self, worker):
+        self._worker = worker
+        self._ids = itertools.count(1)
+        self._current = None
+        self._lock = threading.Lock()
+
+    def start(self, name, steps):
+        """Start a macro. Returns the run, or None if one is still running."""
+        with self._lock:
+            if self._current is not None and self._current.status == "running":
+                return None
+            run = MacroRun(next(self._ids), name, steps)
+            self._current = run
+        threading.Thread(target=self._run, args=(run,), name=f"macro-{run.id}", daemon=True).start()
+        return run
+
+    def current(self):
+        return self._current
+
+    def cancel(self):
+        run = self._current
+        if run is not None and run.status == "running":
+            run.cancel_event.set()
+            return run
+        return None
+
+    def _run(self, run):
+        try:
+            for i, (kind, arg) in enumerate(run.steps):
+                if run.cancel_event.is_set():
+                    break
+                run.step = i
+                if kind == "wait":
+                    run.cancel_event.wait(arg)
+                    continue
+                error = self._worker.run(arg)
+                if error is not None:
+                    run.status, run.error = "error", f"step {i}: {error}"
+                    break
+            else:
+                run.step = len(run.steps)
+            if run.status == "running":
+                run.status = "cancelled" if run.cancel_event.is_set() else "done"
+        except Exception as e:
+            run.status, run.error = "error", str(e)
+        finally:
+            run.finished_at = time.time()
+            logger.info(f"Macro {run.name or run.id} {run.status} after {run.step}/{len(run.steps)} steps")
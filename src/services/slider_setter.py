@@ -0,0 +1,84 @@
+import threading
+import time
+from src.utils import setup_logger
+from config import SLIDER_MIN_INTERVAL
+
+logger = setup_logger()
+
+# name -> SliderSetter, for /system/controls/stats
+_registry = {}
+
+
+class SliderSetter:
+    """Latest-value-wins setter for one slider-style control.
+
+    `set()` only writes the value into a one-slot mailbox and returns; a worker
+    thread applies whatever value is in the slot, at most once per `min_interval`.
+    A value replaced before it was applied is counted as discarded, so a burst of
+    slider updates costs one or two real calls instead of one per request.
+    """
+
+    def __init__(self, name, apply, min_interval=SLIDER_MIN_INTERVAL, on_applied=None):
+        self.name = name
+        self._apply = apply
+        self._on_applied = on_applied
+        self.min_interval = min_interval
+        self._cond = threading.Condition()
+        self._pending = None
+        self._has_pending = False
+        self._thread = None
+        self._last_apply = 0.0
+        self.counts = {"received": 0, "applied": 0, "discarded": 0, "errors": 0}
+        self.last_applied = None
+        self.last_error = None
+        _registry[name] = self
+
+    def set(self, value):
+        with self._cond:
+            self.counts["received"] += 1
+            if self._has_pending:
+                self.counts["discarded"] += 1
+            self._pending, self._has_pending = value, True
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"slider-{self.name}", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._has_pending:
+                    self._cond.wait()
+                # Hold off until the rate limit allows another call; later set()s
+                # keep replacing the slot meanwhile
+                wait = self._last_apply + self.min_interval - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                value, self._has_pending = self._pending, False
+            self._last_apply = time.monotonic()
+            try:
+                self._apply(value)
+                self.counts["applied"] += 1
+                self.last_applied = value
+                if self._on_applied:
+                    self._on_applied()
+            except Exception as e:
+                self.counts["errors"] += 1
+                self.last_error = str(e)
+                logger.error(f"Error applying {self.name} = {value}: {e}")
+
+    def stats(self):
+        with self._cond:
+            return {
+                **self.counts,
+                "pending": self._pending if self._has_pending else None,
+                "last_applied": self.last_applied,
+                "last_error": self.last_error,
+                "min_interval_s": self.min_interval,
+            }
+
+
+def slider_stats():
+    """Counters for every registered slider setter, by name."""
+    return {name: setter.stats() for name, setter in _registry.items()}
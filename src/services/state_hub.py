@@ -0,0 +1,112 @@
+import threading
+from src.utils import setup_logger
+
+logger = setup_logger()
+
+
+class Subscription:
+    """One client's view of the hub: the latest unsent value per source."""
+
+    def __init__(self, sources):
+        self.sources = frozenset(sources)
+        self._pending = {}
+        self._cond = threading.Condition()
+
+    def _offer(self, source, value):
+        with self._cond:
+            # A slow client only ever gets the newest value, never a backlog
+            self._pending[source] = value
+            self._cond.notify()
+
+    def next(self, timeout):
+        """Wait up to `timeout` for changes; returns {source: value} (empty on timeout)."""
+        with self._cond:
+            if not self._pending:
+                self._cond.wait(timeout)
+            changes, self._pending = self._pending, {}
+            return changes
+
+
+class StateHub:
+    """Runs one sampler thread per data source, only while someone subscribes to it.
+
+    Each sampler calls its source's `fetch()` every `interval` seconds and pushes
+    the value to every subscriber of that source only when it differs from the
+    last one. The last value is kept, so a new subscriber gets it immediately.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources = {}      # name -> (fetch, interval)
+        self._last = {}         # name -> last pushed value
+        self._subs = set()
+        self._wake = {}         # name -> Event that ends the sampler's wait early
+        self._running = set()   # names with a live sampler thread
+
+    def add_source(self, name, fetch, interval):
+        self._sources[name] = (fetch, interval)
+
+    def source_names(self):
+        return list(self._sources)
+
+    def subscribe(self, sources=None):
+        """Subscribe to some (default: all) sources. ValueError on an unknown one."""
+        sources = list(sources or self._sources)
+        unknown = [s for s in sources if s not in self._sources]
+        if unknown:
+            raise ValueError(f"Unknown source(s): {', '.join(unknown)}")
+        sub = Subscription(sources)
+        with self._lock:
+            self._subs.add(sub)
+            for name in sub.sources:
+                if name in self._last:
+                    sub._offer(name, self._last[name])
+                if name not in self._running:
+                    self._running.add(name)
+                    self._wake[name] = threading.Event()
+                    threading.Thread(target=self._sample, args=(name,), name=f"state-{name}", daemon=True).start()
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subs.discard(sub)
+            for name in sub.sources:
+                if not self._has_subscribers(name):
+                    self._wake[name].set()  # let the sampler notice and stop
+
+    def _has_subscribers(self, name):
+        return any(name in s.sources for s in self._subs)
+
+    def _sample(self, name):
+        fetch, interval = self._sources[name]
+        wake = self._wake[name]
+        logger.info(f"State sampler '{name}' started")
+        while True:
+            with self._lock:
+                if not self._has_subscribers(name):
+                    self._running.discard(name)
+                    # Forget the value: it goes stale while nobody samples it
+                    self._last.pop(name, None)
+                    break
+            try:
+                value = fetch()
+            except Exception as e:
+                logger.warning(f"State source '{name}' failed: {e}")
+            else:
+                with self._lock:
+                    if name not in self._last or self._last[name] != value:
+                        self._last[name] = value
+                        for sub in self._subs:
+                            if name in sub.sources:
+                                sub._offer(name, value)
+            wake.wait(interval)
+            wake.clear()
+        logger.info(f"State sampler '{name}' paused (no subscribers)")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subs),
+                "sampling": sorted(self._running),
+                "intervals": {n: i for n, (_, i) in self._sources.items()},
+            }
@@ -0,0 +1,278 @@
+import ctypes
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+import numpy as np
+from src.utils import setup_logger
+from config import STATS_SAMPLE_INTERVAL, STATS_HISTORY_SECONDS, STATS_PROVIDER
+
+logger = setup_logger()
+
+# Columns of every sample, in ring-buffer order
+METRICS = ("cpu", "memory", "disk", "load")
+
+
+class PsutilProvider:
+    """psutil, when it happens to be installed (not a hard dependency)."""
+
+    name = "psutil"
+
+    def __init__(self):
+        import psutil
+        self._psutil = psutil
+        psutil.cpu_percent(None)  # prime: the first call always returns 0.0
+
+    def sample(self):
+        p = self._psutil
+        return {
+            "cpu": p.cpu_percent(None),
+            "memory": p.virtual_memory().percent,
+            "disk": p.disk_usage("/").percent,
+            "load": os.getloadavg()[0],
+        }
+
+
+class ProcProvider:
+    """Linux /proc: CPU from /proc/stat deltas, memory from /proc/meminfo."""
+
+    name = "proc"
+
+    def __init__(self, root="/proc"):
+        self._root = root
+        self._last_cpu = self._read_cpu()
+
+    def _read_cpu(self):
+        with open(os.path.join(self._root, "stat")) as f:
+            fields = [int(v) for v in f.readline().split()[1:]]
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)  # idle + iowait
+        return sum(fields), idle
+
+    def _cpu_percent(self):
+        total, idle = self._read_cpu()
+        last_total, last_idle = self._last_cpu
+        self._last_cpu = (total, idle)
+        busy = (total - last_total) - (idle - last_idle)
+        return 100.0 * busy / (total - last_total) if total > last_total else 0.0
+
+    def _memory_percent(self):
+        info = {}
+        with open(os.path.join(self._root, "meminfo")) as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                info[key] = int(rest.split()[0])
+        available = info.get("MemAvailable", info.get("MemFree", 0))
+        return 100.0 * (1 - available / info["MemTotal"])
+
+    def sample(self):
+        return {
+            "cpu": self._cpu_percent(),
+            "memory": self._memory_percent(),
+            "disk": _disk_percent(),
+            "load": os.getloadavg()[0],
+        }
+
+
+class MacProvider:
+    """macOS without psutil: CPU utilisation from per-core tick counters
+    (host_processor_info, the same source as top/Activity Monitor) and memory from
+    `vm_stat`. Spawns one process per sample, never per request."""
+
+    name = "macos"
+
+    _PROCESSOR_CPU_LOAD_INFO = 2
+    _CPU_STATE_MAX = 4  # user, system, idle, nice
+    _CPU_STATE_IDLE = 2
+
+    def __init__(self):
+        self._mem_total = int(subprocess.run(["sysctl", "-n", "hw.memsize"],
+                                             capture_output=True, text=True, check=True).stdout)
+        libc = ctypes.CDLL("/usr/lib/libSystem.dylib")
+        libc.mach_host_self.restype = ctypes.c_uint32
+        libc.host_processor_info.argtypes = [
+            ctypes.c_uint32, ctypes.c_int, ctypes.POINTER(ctypes.c_uint32),
+            ctypes.POINTER(ctypes.POINTER(ctypes.c_int)), ctypes.POINTER(ctypes.c_uint32),
+        ]
+        libc.host_processor_info.restype = ctypes.c_int
+        libc.vm_deallocate.argtypes = [ctypes.c_uint32, ctypes.c_void_p, ctypes.c_size_t]
+        self._libc = libc
+        self._host = libc.mach_host_self()
+        self._task = ctypes.c_uint32.in_dll(libc, "mach_task_self_").value
+        self._last_cpu = self._read_cpu()
+
+    def _read_cpu(self):
+        """(total ticks, idle ticks) summed over all cores."""
+        cpus, count = ctypes.c_uint32(), ctypes.c_uint32()
+        info = ctypes.POINTER(ctypes.c_int)()
+        err = self._libc.host_processor_info(self._host, self._PROCESSOR_CPU_LOAD_INFO, ctypes.byref(cpus),
+                                             ctypes.byref(info), ctypes.byref(count))
+        if err:
+            raise OSError(f"host_processor_info failed ({err})")
+        try:
+            # Tick counters are unsigned 32-bit; read them as such
+            ticks = np.ctypeslib.as_array(info, shape=(cpus.value, self._CPU_STATE_MAX)).astype(np.uint32)
+            return int(ticks.sum(dtype=np.uint64)), int(ticks[:, self._CPU_STATE_IDLE].sum(dtype=np.uint64))
+        finally:
+            self._libc.vm_deallocate(self._task, ctypes.cast(info, ctypes.c_void_p),
+                                     count.value * ctypes.sizeof(ctypes.c_int))
+
+    def _cpu_percent(self):
+        total, idle = self._read_cpu()
+        last_total, last_idle = self._last_cpu
+        self._last_cpu = (total, idle)
+        busy = (total - last_total) - (idle - last_idle)
+        if total <= last_total:  # no ticks yet, or a 32-bit counter wrapped
+            return 0.0
+        return min(100.0, max(0.0, 100.0 * busy / (total - last_total)))
+
+    def _memory_percent(self):
+        out = subprocess.run(["vm_stat"], capture_output=True, text=True, timeout=2).stdout
+        page = int(re.search(r"page size of (\d+)", out).group(1))
+        pages = {k.strip(): int(v.strip().rstrip(".")) for k, v in re.findall(r"^(Pages [^:]+):\s+(\d+\.?)", out, re.M)}
+        # Activity Monitor's "memory used": app (active + wired) plus compressed
+        used = pages.get("Pages active", 0) + pages.get("Pages wired down", 0) \
+            + pages.get("Pages occupied by compressor", 0)
+        return 100.0 * used * page / self._mem_total
+
+    def sample(self):
+        return {
+            "cpu": self._cpu_percent(),
+            "memory": self._memory_percent(),
+            "disk": _disk_percent(),
+            "load": os.getloadavg()[0],
+        }
+
+
+def _disk_percent(path="/"):
+    usage = shutil.disk_usage(path)
+    return 100.0 * usage.used / usage.total
+
+
+def create_provider(choice=STATS_PROVIDER):
+    """auto = psutil if installed, else /proc if present, else the macOS commands."""
+    if choice == "psutil":
+        return PsutilProvider()
+    if choice == "proc":
+        return ProcProvider()
+    if choice == "macos":
+        return MacProvider()
+    try:
+        return PsutilProvider()
+    except ImportError:
+        pass
+    if os.path.exists("/proc/stat"):
+        return ProcProvider()
+    return MacProvider()
+
+
+class RingBuffer:
+    """Fixed-capacity float buffer of the last `capacity` rows (one column per metric)."""
+
+    def __init__(self, capacity, columns):
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.full((capacity, columns), np.nan, dtype=np.float32)
+        self._next = 0
+        self.count = 0
+
+    def append(self, t, row):
+        self.times[self._next] = t
+        self.values[self._next] = row
+        self._next = (self._next + 1) % len(self.times)
+        self.count = min(self.count + 1, len(self.times))
+
+    def last(self, n):
+        """The newest `n` rows in time order, as (times, values) copies."""
+        n = min(n, self.count)
+        idx = (np.arange(self._next - n, self._next)) % len(self.times)
+        return self.times[idx], self.values[idx]
+
+
+class SystemStatsSampler:
+    """Samples the provider every STATS_SAMPLE_INTERVAL on one thread and keeps
+    STATS_HISTORY_SECONDS of history in a ring buffer.
+
+    Requests only read memory, so polling cost doesn't grow with the number of
+    clients; the sampler starts on first use and then runs for the process lifetime.
+    """
+
+    def __init__(self, provider_factory=create_provider, interval=STATS_SAMPLE_INTERVAL,
+                 history_seconds=STATS_HISTORY_SECONDS):
+        self.interval = interval
+        self._provider_factory = provider_factory
+        self._provider = None
+        self._buffer = RingBuffer(max(1, int(history_seconds / interval)), len(METRICS))
+        self._lock = threading.Lock()
+        self._thread = None
+        self._current = None
+        self.errors = 0
+
+    def ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="system-stats", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        try:
+            self._provider = self._provider_factory()
+            logger.info(f"System stats provider: {self._provider.name}")
+        except Exception as e:
+            logger.error(f"No system stats provider available: {e}")
+            return
+        while True:
+            started = time.monotonic()
+            try:
+                values = self._provider.sample()
+                now = time.time()
+                row = [values.get(m, np.nan) for m in METRICS]
+                with self._lock:
+                    self._buffer.append(now, row)
+                    self._current = {"time": round(now, 3),
+                                     **{m: round(float(v), 2) for m, v in values.items()}}
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"System stats sample failed: {e}")
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def current(self):
+        """Latest sample, or None before the first one lands."""
+        self.ensure_started()
+        with self._lock:
+            return dict(self._current) if self._current else None
+
+    def history(self, window, points):
+        """The last `window` seconds averaged into at most `points` buckets.
+
+        Returns {"time": [...], "<metric>": [...]} with bucket-mean values
+        (null for a bucket whose samples were all missing).
+        """
+        self.ensure_started()
+        with self._lock:
+            times, values = self._buffer.last(int(np.ceil(window / self.interval)))
+        points = max(1, min(points, len(times)))
+        if not len(times):
+            return {"time": [], **{m: [] for m in METRICS}}
+        # Split into `points` near-equal runs of consecutive samples and average each
+        bounds = np.linspace(0, len(times), points + 1).astype(int)
+        out = {"time": np.round(np.add.reduceat(times, bounds[:-1]) / np.diff(bounds), 3).tolist()}
+        with np.errstate(invalid="ignore"):
+            sums = np.add.reduceat(np.nan_to_num(values), bounds[:-1], axis=0)
+            counts = np.add.reduceat(~np.isnan(values), bounds[:-1], axis=0)
+            means = sums / counts
+        for i, m in enumerate(METRICS):
+            out[m] = [None if np.isnan(v) else round(float(v), 2) for v in means[:, i]]
+        return out
+
+    def stats(self):
+        return {
+            "provider": self._provider.name if self._provider else None,
+            "interval_s": self.interval,
+            "samples": self._buffer.count,
+            "capacity": len(self._buffer.times),
+            "errors": self.errors,
+        }
+
+
+system_stats = SystemStatsSampler()
@@ -0,0 +1,105 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from config import KEYBOARD_TYPE_CHUNK_CHARS, KEYBOARD_TYPE_CHARS_PER_SEC
+from src.utils import setup_logger
+
+logger = setup_logger()
+
+_KEEP_FINISHED = 16  # finished jobs kept around for status polling
+
+
+class TypingJob:
+    def __init__(self, job_id, text):
+        self.id = job_id
+        self.text = text
+        self.typed = 0
+        self.status = "running"  # running | done | cancelled | error
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+
+    def snapshot(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "typed": self.typed,
+            "total": len(self.text),
+            "progress": round(self.typed / len(self.text), 3) if self.text else 1.0,
+            "error": self.error,
+            "elapsed_s": round((self.finished_at or time.time()) - self.started_at, 2),
+        }
+
+
+class TypingJobs:
+    """Types long text in the background: KEYBOARD_TYPE_CHUNK_CHARS at a time, at no
+    more than KEYBOARD_TYPE_CHARS_PER_SEC, each chunk queued on the input worker so
+    it stays ordered with streamed input. One job runs at a time; `cancel()` stops
+    it between chunks.
+    """
+
+    def __init__(self, worker, inject):
+        self._worker = worker
+        self._inject = inject  # inject(text) -> types one chunk
+        self._ids = itertools.count(1)
+        self._jobs = OrderedDict()
+        self._active = None
+        self._lock = threading.Lock()
+
+    def start(self, text):
+        """Start typing `text`. Returns the job, or None if another job is still running."""
+        with self._lock:
+            if self._active is not None:
+                return None
+            job = TypingJob(next(self._ids), text)
+            self._active = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > _KEEP_FINISHED + 1:
+                self._jobs.popitem(last=False)
+        threading.Thread(target=self._run, args=(job,), name=f"typing-job-{job.id}", daemon=True).start()
+        return job
+
+    def get(self, job_id=None):
+        """A job by id, or the most recent one."""
+        with self._lock:
+            if job_id is None:
+                return next(reversed(self._jobs.values()), None)
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id=None):
+        """Cancel a running job (the active one if no id). Returns the job, or None if
+        there is no such job or it has already finished."""
+        with self._lock:
+            job = self._jobs.get(job_id) if job_id is not None else self._active
+            if job is None or job is not self._active:
+                return None
+            job.cancel_event.set()
+            return job
+
+    def _run(self, job):
+        started = time.monotonic()
+        try:
+            for i in range(0, len(job.text), KEYBOARD_TYPE_CHUNK_CHARS):
+                if job.cancel_event.is_set():
+                    break
+                chunk = job.text[i:i + KEYBOARD_TYPE_CHUNK_CHARS]
+                error = self._worker.run(lambda: self._inject(chunk))
+                if error is not None:
+                    job.status, job.error = "error", str(error)
+                    break
+                job.typed += len(chunk)
+                # Rate limit; waiting on the cancel event makes cancel take effect at once
+                delay = started + job.typed / KEYBOARD_TYPE_CHARS_PER_SEC - time.monotonic()
+                if delay > 0 and job.typed < len(job.text):
+                    job.cancel_event.wait(delay)
+            if job.status == "running":
+                job.status = "cancelled" if job.typed < len(job.text) else "done"
+        except Exception as e:
+            job.status, job.error = "error", str(e)
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._active = None
+            logger.info(f"Typing job {job.id} {job.status}: {job.typed}/{len(job.text)} chars")
@@ -1,14 +1,21 @@
 import logging
 import os
 import sys
+import threading
+import time
+import numpy as np
 import pyaudio
-from flask import Flask
+from flask import Flask, jsonify
 from flask_sock import Sock
 from flask_cors import CORS
 
-# Import config
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import AUDIO_SHARE_PORT, AUDIO_SAMPLE_RATE, AUDIO_CHANNELS, AUDIO_CHUNK_SIZE
+# Import config (repository root on sys.path, so config and src.* resolve)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import (
+    AUDIO_SHARE_PORT, AUDIO_SAMPLE_RATE, AUDIO_CHANNELS, AUDIO_CHUNK_SIZE,
+    AUDIO_SILENCE_GATE, AUDIO_SILENCE_RMS_DBFS, AUDIO_SILENCE_PEAK_DBFS,
+    AUDIO_SILENCE_HANG_MS, AUDIO_KEEPALIVE_INTERVAL,
+)
 
 logger = logging.getLogger('audio_server')
 
@@ -87,6 +94,91 @@ def index():
     """Standalone audio-only player page."""
     return AUDIO_ONLY_PAGE
 
+# Global gate stats for the /stats endpoint (summed over all connected listeners)
+gate_stats = {
+    'chunks_sent': 0,
+    'chunks_suppressed': 0,
+    'keepalives_sent': 0,
+    'bytes_sent': 0,
+    'bytes_suppressed': 0,
+    'sent_seconds': 0.0,
+    'suppressed_seconds': 0.0,
+}
+_stats_lock = threading.Lock()
+
+
+def _dbfs_to_int16(dbfs):
+    return 32768.0 * (10.0 ** (dbfs / 20.0))
+
+
+class SilenceGate:
+    """Per-listener RMS/peak gate over Int16 PCM chunks.
+
+    `process()` returns the bytes to send for a captured chunk: the chunk itself
+    while there is sound (plus AUDIO_SILENCE_HANG_MS of tail), a short block of
+    zeros every AUDIO_KEEPALIVE_INTERVAL while suppressed so the socket and the
+    player stay warm, or None to send nothing. The first loud chunk after
+    silence is passed straight through — there is no attack delay.
+    """
+
+    def __init__(self):
+        self.rms_threshold = _dbfs_to_int16(AUDIO_SILENCE_RMS_DBFS)
+        self.peak_threshold = _dbfs_to_int16(AUDIO_SILENCE_PEAK_DBFS)
+        self.hang = AUDIO_SILENCE_HANG_MS / 1000.0
+        self.last_sound = 0.0
+        self.last_send = time.monotonic()
+        # 64 frames of silence: tiny on the wire, still a valid chunk for both players
+        self.keepalive = bytes(64 * AUDIO_CHANNELS * 2)
+
+    def is_loud(self, data):
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        if samples.size == 0:
+            return False
+        peak = np.max(np.abs(samples))
+        rms = np.sqrt(np.mean(samples * samples))
+        return bool(peak >= self.peak_threshold or rms >= self.rms_threshold)
+
+    def process(self, data):
+        now = time.monotonic()
+        if self.is_loud(data):
+            self.last_sound = now
+        if now - self.last_sound <= self.hang:
+            self.last_send = now
+            return data
+        if now - self.last_send >= AUDIO_KEEPALIVE_INTERVAL:
+            self.last_send = now
+            return self.keepalive
+        return None
+
+
+def _record_chunk(data, out):
+    """Account one captured chunk as sent or suppressed in gate_stats."""
+    duration = len(data) / (2 * AUDIO_CHANNELS * AUDIO_SAMPLE_RATE)
+    with _stats_lock:
+        if out is data:
+            gate_stats['chunks_sent'] += 1
+            gate_stats['bytes_sent'] += len(data)
+            gate_stats['sent_seconds'] += duration
+        else:
+            gate_stats['chunks_suppressed'] += 1
+            gate_stats['bytes_suppressed'] += len(data)
+            gate_stats['suppressed_seconds'] += duration
+            if out is not None:
+                gate_stats['keepalives_sent'] += 1
+                gate_stats['bytes_sent'] += len(out)
+
+
+@app.route('/stats')
+def stats():
+    """Silence-gate counters: how much audio was sent vs. suppressed."""
+    with _stats_lock:
+        snapshot = dict(gate_stats)
+    total = snapshot['sent_seconds'] + snapshot['suppressed_seconds']
+    snapshot['suppressed_ratio'] = round(snapshot['suppressed_seconds'] / total, 3) if total else 0.0
+    snapshot['gate_enabled'] = AUDIO_SILENCE_GATE
+    return jsonify(snapshot)
+
+
 def get_blackhole_device_index(p):
     """Finds the PyAudio device index for BlackHole."""
     for i in range(p.get_device_count()):
@@ -116,11 +208,15 @@ def audio_stream(ws):
         )
         logger.info(f"Audio WS Client Connected. Streaming Int16 from device index {device_index}...")
 
+        gate = SilenceGate() if AUDIO_SILENCE_GATE else None
         while True:
             # Read raw bytes of Int16 PCM buffer
             # exception_on_overflow=False guarantees it drops chunks if CPU gets behind rather than crashing
             data = stream.read(AUDIO_CHUNK_SIZE, exception_on_overflow=False)
-            ws.send(data)
+            out = gate.process(data) if gate else data
+            _record_chunk(data, out)
+            if out is not None:
+                ws.send(out)
             
     except Exception as e:
         logger.info(f"Audio WS client disconnected or errored: {e}")
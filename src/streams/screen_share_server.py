@@ -23,9 +23,10 @@ import cv2
 from flask import Flask, render_template, Response, jsonify
 from flask_cors import CORS
 
-# Import config
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Import config (repository root on sys.path, so config and src.* resolve)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from config import SCREEN_SHARE_PORT, SCREEN_SHARE_FPS, SCREEN_SHARE_QUALITY
+from src.utils.display_geometry import display_geometry
 
 logger = logging.getLogger('screen_share_server')
 
@@ -43,10 +44,6 @@ def generate_mjpeg_stream():
     """Generator that captures screen constantly and yields JPEG frames."""
     try:
         with mss.mss() as sct:
-            monitor = sct.monitors[1]  # Primary monitor
-            logical_w = monitor['width']
-            logical_h = monitor['height']
-
             frame_interval = 1.0 / SCREEN_SHARE_FPS
 
             logger.info(f"Starting optimized MJPEG capture sequence. Target FPS is {SCREEN_SHARE_FPS}")
@@ -55,6 +52,10 @@ def generate_mjpeg_stream():
                 start_time = time.time()
 
                 # --- Capture ---
+                # Primary monitor from the shared geometry cache, so a resolution
+                # change mid-stream is picked up without restarting the capture
+                monitor = display_geometry.get()
+                logical_w = monitor['width']
                 screenshot = sct.grab(monitor)
                 raw = np.array(screenshot)
 
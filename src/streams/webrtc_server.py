@@ -11,9 +11,10 @@ from aiohttp import web
 from aiortc import RTCPeerConnection, RTCSessionDescription, VideoStreamTrack
 from aiortc.contrib.media import MediaRelay
 
-# Add the parent directory to sys.path so we can import config
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add the repository root to sys.path so we can import config and src.*
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from config import WEBRTC_SHARE_PORT, WEBRTC_FPS
+from src.utils.display_geometry import display_geometry
 
 logger = logging.getLogger('webrtc_server')
 
@@ -32,20 +33,19 @@ class ScreenStreamTrack(VideoStreamTrack):
         super().__init__()
         self.fps = fps
         self.sct = mss.mss()
-        self.monitor = self.sct.monitors[1]
-        self.logical_w = self.monitor['width']
         self.frame_duration = 1.0 / self.fps
 
     async def recv(self):
         # next_timestamp() perfectly paces the frame delivery according to RTP clock
         pts, time_base = await self.next_timestamp()
 
-        # Capture using mss (very fast)
-        screenshot = self.sct.grab(self.monitor)
+        # Capture using mss (very fast); primary monitor from the shared geometry cache
+        monitor = display_geometry.get()
+        screenshot = self.sct.grab(monitor)
         raw = np.array(screenshot)
 
         # Downscale logic for Retina displays (matches MJPEG downscaler exactly)
-        if raw.shape[1] > self.logical_w:
+        if raw.shape[1] > monitor['width']:
             frame_bgr = raw[::2, ::2, :3]
         else:
             frame_bgr = raw[:, :, :3]
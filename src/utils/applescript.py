@@ -0,0 +1,253 @@
+import itertools
+import json
+import logging
+import queue
+import subprocess
+import threading
+import time
+from config import APPLESCRIPT_BACKEND, APPLESCRIPT_WORKERS, APPLESCRIPT_TIMEOUT
+
+logger = logging.getLogger('applescript')
+
+
+class AppleScriptError(Exception):
+    """The script failed to compile/run, or didn't finish within its timeout."""
+
+
+# JXA program run by each persistent worker: reads one JSON request per line on
+# stdin ({"id", "source"}), runs it through an NSAppleScript compiled once per
+# distinct source, and answers one JSON line ({"id", "result"} or {"id", "error"}).
+# Requests are sent ASCII-only (json.dumps escapes), so stdin chunks never split
+# a multi-byte character.
+_WORKER_JXA = r'''
+ObjC.import('Foundation');
+var stdin = $.NSFileHandle.fileHandleWithStandardInput;
+var stdout = $.NSFileHandle.fileHandleWithStandardOutput;
+var compiled = {};
+var buf = '';
+function readLine() {
+    while (true) {
+        var i = buf.indexOf('\n');
+        if (i >= 0) { var line = buf.slice(0, i); buf = buf.slice(i + 1); return line; }
+        var data = stdin.availableData;
+        if (data.length === 0) return null;
+        buf += $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js;
+    }
+}
+function reply(obj) {
+    var s = $.NSString.alloc.initWithUTF8String(JSON.stringify(obj) + '\n');
+    stdout.writeData(s.dataUsingEncoding($.NSUTF8StringEncoding));
+}
+function text(desc) {
+    var t = desc.descriptorType;
+    if (t === 0x626f6f6c) return desc.booleanValue ? 'true' : 'false';  // 'bool'
+    if (t === 0x74727565) return 'true';                                  // 'true'
+    if (t === 0x66616c73) return 'false';                                 // 'fals'
+    var s = ObjC.unwrap(desc.stringValue);
+    return s === undefined ? '' : s;
+}
+var line;
+while ((line = readLine()) !== null) {
+    if (!line) continue;
+    var req = JSON.parse(line);
+    var script = compiled[req.source];
+    if (!script) {
+        script = $.NSAppleScript.alloc.initWithSource(req.source);
+        compiled[req.source] = script;
+    }
+    var err = Ref();
+    var desc = script.executeAndReturnError(err);
+    if (desc.isNil()) {
+        var msg = err[0] ? ObjC.unwrap(err[0].objectForKey('NSAppleScriptErrorMessage')) : null;
+        reply({id: req.id, error: msg || 'AppleScript error'});
+    } else {
+        reply({id: req.id, result: text(desc)});
+    }
+}
+'''
+
+
+def _remaining(deadline):
+    return max(0.0, deadline - time.monotonic())
+
+
+class _NotSent(Exception):
+    """The script never reached a worker, so running it elsewhere can't run it twice."""
+
+
+class _Worker:
+    """One warm `osascript -l JavaScript` process running _WORKER_JXA."""
+
+    def __init__(self):
+        self._proc = subprocess.Popen(
+            ["osascript", "-l", "JavaScript", "-e", _WORKER_JXA],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        self._replies = queue.Queue()
+        self._ids = itertools.count(1)
+        threading.Thread(target=self._read, name="applescript-reader", daemon=True).start()
+
+    def _read(self):
+        for line in self._proc.stdout:
+            try:
+                self._replies.put(json.loads(line))
+            except ValueError:
+                logger.warning(f"applescript worker sent garbage: {line[:200]!r}")
+        self._replies.put(None)  # process exited
+
+    @property
+    def alive(self):
+        return self._proc.poll() is None
+
+    def call(self, source, deadline):
+        """Run `source` and return its result; queue.Empty if no reply by `deadline`
+        (a time.monotonic() value)."""
+        req_id = next(self._ids)
+        try:
+            self._proc.stdin.write((json.dumps({"id": req_id, "source": source}) + "\n").encode("ascii"))
+            self._proc.stdin.flush()
+        except (OSError, ValueError) as e:  # worker gone before it got the request
+            raise _NotSent(e)
+        while True:
+            msg = self._replies.get(timeout=_remaining(deadline))  # queue.Empty on timeout
+            if msg is None:
+                raise BrokenPipeError("applescript worker exited")
+            if msg.get("id") == req_id:
+                if "error" in msg:
+                    raise AppleScriptError(msg["error"])
+                return msg.get("result", "")
+
+    def kill(self):
+        try:
+            self._proc.kill()
+        except Exception:
+            pass
+
+
+class PersistentBackend:
+    """A pool of APPLESCRIPT_WORKERS warm worker processes; each compiles a script
+    once and reuses it, so a call costs a pipe round trip instead of an osascript
+    spawn + compile. Workers start on first use. A worker that overruns its timeout
+    is killed and replaced. If the script couldn't be handed to a worker at all it
+    runs as a one-shot osascript instead; if the worker dies after receiving it, the
+    call fails (the script may already have run) and the worker is respawned on the
+    next call.
+    """
+
+    name = "persistent"
+
+    def __init__(self, workers=APPLESCRIPT_WORKERS):
+        self._idle = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(None)  # slot without a started worker yet
+        self._fallback = OsascriptBackend()
+
+    def run(self, source, timeout):
+        # One budget for the whole call: waiting for a free worker, the reply and
+        # any one-shot fallback all come out of the same `timeout`
+        deadline = time.monotonic() + timeout
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise AppleScriptError(f"no AppleScript worker free within {timeout}s")
+        try:
+            if worker is None or not worker.alive:
+                try:
+                    worker = _Worker()
+                except OSError as e:
+                    raise _NotSent(e)
+            return worker.call(source, deadline)
+        except queue.Empty:
+            worker.kill()
+            worker = None
+            raise AppleScriptError(f"AppleScript timed out after {timeout}s")
+        except _NotSent as e:
+            logger.warning(f"applescript worker unavailable ({e}); running one-shot")
+            if worker is not None:
+                worker.kill()
+            worker = None
+            return self._fallback.run(source, _remaining(deadline))
+        except (OSError, ValueError) as e:
+            # Sent, so it may have run already: report instead of running it twice
+            logger.warning(f"applescript worker failed ({e}); respawning it")
+            worker.kill()
+            worker = None
+            raise AppleScriptError(f"AppleScript worker failed: {e}")
+        finally:
+            self._idle.put(worker)
+
+
+class OsascriptBackend:
+    """A fresh `osascript` per call (process spawn + compile every time), at most
+    APPLESCRIPT_WORKERS at once."""
+
+    name = "osascript"
+
+    def __init__(self, workers=APPLESCRIPT_WORKERS):
+        self._slots = threading.BoundedSemaphore(workers)
+
+    def run(self, source, timeout):
+        if not self._slots.acquire(timeout=timeout):
+            raise AppleScriptError(f"no AppleScript slot free within {timeout}s")
+        try:
+            r = subprocess.run(["osascript", "-e", source], capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise AppleScriptError(f"AppleScript timed out after {timeout}s")
+        finally:
+            self._slots.release()
+        if r.returncode != 0:
+            raise AppleScriptError(r.stderr.strip() or f"osascript exited with {r.returncode}")
+        return r.stdout.strip()
+
+
+class FakeBackend:
+    """Records scripts instead of running them (tests/benchmarks on Linux).
+    `responses` maps a script (exact source) to the text it returns; default ""."""
+
+    name = "fake"
+
+    def __init__(self, responses=None):
+        self.responses = dict(responses or {})
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def run(self, source, timeout):
+        with self._lock:
+            self.calls.append(source)
+        return self.responses.get(source, "")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _create_backend(choice):
+    if choice == "fake":
+        return FakeBackend()
+    if choice == "osascript":
+        return OsascriptBackend()
+    return PersistentBackend()
+
+
+def get_backend():
+    """The process-wide backend chosen by APPLESCRIPT_BACKEND (auto = persistent)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _create_backend(APPLESCRIPT_BACKEND)
+            logger.info(f"AppleScript backend: {_backend.name}")
+        return _backend
+
+
+def set_backend(backend):
+    """Swap the backend (e.g. a FakeBackend in tests). Returns the previous one."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
+
+
+def run(source, timeout=APPLESCRIPT_TIMEOUT):
+    """Run an AppleScript and return its result as trimmed text.
+    Raises AppleScriptError on failure or timeout."""
+    return get_backend().run(source, timeout).strip()
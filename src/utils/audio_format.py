@@ -0,0 +1,26 @@
+import json
+
+DEFAULT_SAMPLE_RATE = 44100
+DEFAULT_CHANNELS = 1
+
+
+def parse_format_header(text):
+    """Live-audio format header, e.g. '{"sampleRate": 48000, "channels": 2}'.
+
+    Missing fields default to 44100Hz mono. Returns (sample_rate, channels);
+    ValueError if the header isn't a JSON object or the format is unsupported.
+    """
+    try:
+        header = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"not JSON: {e}") from None
+    if not isinstance(header, dict):
+        raise ValueError("expected a JSON object")
+    try:
+        sample_rate = int(header.get("sampleRate", DEFAULT_SAMPLE_RATE))
+        channels = int(header.get("channels", DEFAULT_CHANNELS))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"bad number: {e}") from None
+    if sample_rate <= 0 or channels not in (1, 2):
+        raise ValueError(f"unsupported format ({sample_rate}Hz, {channels} channel(s))")
+    return sample_rate, channels
@@ -0,0 +1,85 @@
+import threading
+import time
+
+
+class ProbeTimeout(Exception):
+    """The probe's refresh didn't finish in time and there is no earlier value."""
+
+
+class CachedProbe:
+    """A value fetched by `fetch()` and cached for `ttl` seconds, refreshed single-flight.
+
+    Concurrent callers of `get()` during a refresh all wait for that one fetch
+    instead of each starting their own. The fetch runs on its own thread, so a
+    caller can bound its wait with `timeout`: on expiry it gets the previous
+    (stale) value if there is one, else ProbeTimeout — the refresh keeps going
+    and lands in the cache for the next caller. An exception from `fetch()` is
+    re-raised to the callers waiting on that refresh.
+    """
+
+    def __init__(self, fetch, ttl, name=None):
+        self._fetch = fetch
+        self.ttl = ttl
+        self.name = name or getattr(fetch, "__name__", "probe")
+        self._lock = threading.Lock()
+        self._value = None
+        self._has_value = False
+        self._error = None
+        self._fetched_at = None  # monotonic time of the last completed fetch
+        self._done = None        # Event of the in-flight refresh, if any
+
+    def _fresh(self):
+        return self._fetched_at is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    def _refresh(self, done):
+        try:
+            value, error = self._fetch(), None
+        except Exception as e:
+            value, error = None, e
+        with self._lock:
+            if error is None:
+                self._value = value
+                self._has_value = True
+            self._error = error
+            self._fetched_at = time.monotonic()
+            self._done = None
+        done.set()
+
+    def _start_refresh(self):
+        """The in-flight refresh's Event, starting one if needed. Caller holds the lock."""
+        if self._done is None:
+            self._done = threading.Event()
+            threading.Thread(target=self._refresh, args=(self._done,), name=f"probe-{self.name}", daemon=True).start()
+        return self._done
+
+    def prefetch(self):
+        """Start a refresh if the value is stale, without waiting for it."""
+        with self._lock:
+            if not (self._fresh() and self._error is None):
+                self._start_refresh()
+
+    def get(self, timeout=None):
+        with self._lock:
+            if self._fresh() and self._error is None:
+                return self._value
+            done = self._start_refresh()
+            stale = self._value
+            have_stale = self._has_value
+        if not done.wait(timeout):
+            if have_stale:
+                return stale
+            raise ProbeTimeout(f"{self.name} did not answer within {timeout}s")
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            return self._value
+
+    def age(self):
+        """Seconds since the last completed fetch (None if never fetched)."""
+        with self._lock:
+            return None if self._fetched_at is None else time.monotonic() - self._fetched_at
+
+    def invalidate(self):
+        """Force the next `get()` to refresh (e.g. after the caller changed the value)."""
+        with self._lock:
+            self._fetched_at = None
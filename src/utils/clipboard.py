@@ -0,0 +1,16 @@
+import os
+import subprocess
+
+# pbcopy/pbpaste pick the text encoding from the locale; force UTF-8 so non-ASCII
+# text survives when the app is started without a LANG (e.g. from launchd).
+_ENV = {**os.environ, "LANG": "en_US.UTF-8", "LC_ALL": "en_US.UTF-8"}
+
+
+def get_clipboard():
+    """Current plain-text clipboard contents ("" if empty or not text)."""
+    result = subprocess.run(["pbpaste"], capture_output=True, env=_ENV)
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+def set_clipboard(text):
+    subprocess.run(["pbcopy"], input=str(text).encode("utf-8"), env=_ENV, check=True)
@@ -0,0 +1,49 @@
+from flask import request, jsonify
+from src.utils import setup_logger
+from src.services.command_dispatcher import command_dispatcher
+from src.services.input_worker import input_worker
+from config import COMMAND_SYNC_TIMEOUT
+
+logger = setup_logger()
+
+
+def wants_async():
+    """`?async=1` or {"async": true} in the body: answer 202 right away."""
+    if request.args.get("async", "").lower() in ("1", "true"):
+        return True
+    return (request.get_json(silent=True) or {}).get("async") is True
+
+
+def dispatch_input(name, action):
+    """Run an input injection on the shared input_worker and answer the route.
+
+    Injections never go to the command dispatcher: on the one input thread they
+    stay ordered with input_ws events, HTTP keystrokes and background typing.
+    Waits for the injection (no 202), then returns success or the error (500).
+    """
+    error = input_worker.run(action)
+    if error is not None:
+        logger.error(f"Error in {name}: {str(error)}")
+        return jsonify({"status": "error", "error": str(error)}), 500
+    logger.info(f"{name} successful")
+    return jsonify({"status": "success"})
+
+
+def dispatch_command(lane, name, action):
+    """Run `action` on the command dispatcher and answer the route.
+
+    Synchronous by default: waits up to COMMAND_SYNC_TIMEOUT and returns success
+    (or the error, 500). Asynchronous requests — and synchronous ones that run
+    out of time — get 202 with a job id to look up at /system/jobs/<id>.
+    """
+    try:
+        job = command_dispatcher.submit(lane, name, action)
+        if not wants_async() and job.wait(COMMAND_SYNC_TIMEOUT):
+            if job.error is not None:
+                raise job.error
+            logger.info(f"{name} successful")
+            return jsonify({"status": "success"})
+        return jsonify({"status": "accepted", "job": job.id}), 202
+    except Exception as e:
+        logger.error(f"Error in {name}: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
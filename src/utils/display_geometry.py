@@ -0,0 +1,74 @@
+import logging
+import threading
+import time
+from config import DISPLAY_GEOMETRY_TTL
+
+logger = logging.getLogger('display_geometry')
+
+
+class DisplayGeometry:
+    """Cached bounds of the primary display in logical points: {left, top, width, height},
+    the same rectangle as mss `monitors[1]`.
+
+    Read from Quartz (CGDisplayBounds, no capture session) or, without PyObjC, from
+    mss. Re-read after DISPLAY_GEOMETRY_TTL seconds or as soon as CoreGraphics
+    reports a display reconfiguration (resolution change, monitor plugged in...),
+    so hot paths can call `get()`/`to_screen()` on every event.
+    """
+
+    def __init__(self, ttl=DISPLAY_GEOMETRY_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._monitor = None
+        self._read_at = 0.0
+        self._quartz = None
+        self._callback = None  # keep a reference: Quartz only holds a weak one
+        try:
+            import Quartz
+            self._quartz = Quartz
+            self._callback = self._on_reconfigure
+            Quartz.CGDisplayRegisterReconfigurationCallback(self._callback, None)
+        except Exception as e:
+            logger.info(f"Display reconfiguration callback unavailable ({e}); using TTL only")
+
+    def _on_reconfigure(self, display, flags, user_info):
+        self.invalidate()
+
+    def invalidate(self):
+        with self._lock:
+            self._read_at = 0.0
+
+    def _read(self):
+        if self._quartz is not None:
+            try:
+                bounds = self._quartz.CGDisplayBounds(self._quartz.CGMainDisplayID())
+                return {
+                    "left": int(bounds.origin.x), "top": int(bounds.origin.y),
+                    "width": int(bounds.size.width), "height": int(bounds.size.height),
+                }
+            except Exception as e:
+                logger.warning(f"CGDisplayBounds failed ({e}); falling back to mss")
+                self._quartz = None
+        import mss
+        with mss.mss() as sct:
+            mon = sct.monitors[1]  # primary monitor (logical size)
+            return {k: mon[k] for k in ("left", "top", "width", "height")}
+
+    def get(self):
+        """Primary display bounds (a fresh dict, safe to pass to `sct.grab`)."""
+        with self._lock:
+            if self._monitor is None or time.monotonic() - self._read_at >= self.ttl:
+                monitor = self._read()
+                if monitor != self._monitor:
+                    logger.info(f"Primary display geometry: {monitor}")
+                self._monitor = monitor
+                self._read_at = time.monotonic()
+            return dict(self._monitor)
+
+    def to_screen(self, rx, ry):
+        """Map a normalized (0..1) point to screen coordinates in logical points."""
+        mon = self.get()
+        return mon["left"] + rx * mon["width"], mon["top"] + ry * mon["height"]
+
+
+display_geometry = DisplayGeometry()
@@ -0,0 +1,170 @@
+import bisect
+import itertools
+import threading
+import time
+
+# Histogram bucket upper bounds in milliseconds (last bucket is "above 5s")
+BUCKET_BOUNDS_MS = [0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; percentiles are reported as bucket upper bounds."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def _percentile(self, q):
+        target = q * self.count
+        running = 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if running >= target:
+                return BUCKET_BOUNDS_MS[i] if i < len(BUCKET_BOUNDS_MS) else round(self.max, 2)
+        return None
+
+    def snapshot(self):
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3),
+            "max_ms": round(self.max, 3),
+            "p50_ms": self._percentile(0.50),
+            "p90_ms": self._percentile(0.90),
+            "p99_ms": self._percentile(0.99),
+            "buckets": {
+                (f"<={b}" if i < len(BUCKET_BOUNDS_MS) else f">{BUCKET_BOUNDS_MS[-1]}"): c
+                for i, (b, c) in enumerate(zip(BUCKET_BOUNDS_MS + [None], self.counts)) if c
+            },
+        }
+
+
+class ConnectionStats:
+    """Event counters for one live input connection."""
+
+    def __init__(self, conn_id, kind):
+        self.id = conn_id
+        self.kind = kind
+        self.connected_at = time.time()
+        self.events = 0
+        self.injections = 0
+        self.last_batch = 0
+        self.max_batch = 0
+        self.queue_depth = 0
+        self._window_start = time.monotonic()
+        self._window_events = 0
+        self.events_per_sec = 0.0
+
+    def record_events(self, n=1):
+        self.events += n
+        self._window_events += n
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self.events_per_sec = round(self._window_events / (now - self._window_start), 1)
+            self._window_start = now
+            self._window_events = 0
+
+    def record_batch(self, n):
+        """Messages drained from the socket in one read (what was queued behind the first)."""
+        self.last_batch = n
+        self.max_batch = max(self.max_batch, n)
+
+    def _current_rate(self):
+        """events_per_sec, recomputed if no event has closed the window since it
+        ran out (an idle connection decays to 0 instead of keeping its last rate)."""
+        window_start, window_events = self._window_start, self._window_events
+        elapsed = time.monotonic() - window_start
+        if elapsed >= 1.0:
+            return round(window_events / elapsed, 1)
+        return self.events_per_sec
+
+    def snapshot(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "connected_for_s": round(time.time() - self.connected_at, 1),
+            "events": self.events,
+            "injections": self.injections,
+            "events_per_sec": self._current_rate(),
+            "queue_depth": self.queue_depth,
+            "last_batch": self.last_batch,
+            "max_batch": self.max_batch,
+        }
+
+
+class InputMetrics:
+    """Process-wide input latency histograms, keyed by input path ("mouse_ws",
+    "input_ws", "http_key", ...), plus per-connection counters.
+
+    receive_to_inject: from the server receiving an event to its injection returning.
+    inject: how long the injection call itself took.
+    client_to_server: server receive time minus the client's optional `ts` (epoch ms) —
+    only meaningful when both clocks are NTP-synced, so it's reported separately.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._hists = {}
+        self._connections = {}
+        self._started = time.time()
+
+    def _hist(self, kind, name):
+        return self._hists.setdefault(kind, {}).setdefault(name, LatencyHistogram())
+
+    def record(self, kind, received_at, inject_started, inject_finished, client_ts=None, received_wall=None):
+        """Record one injection. Times are time.perf_counter() values; client_ts and
+        received_wall are epoch milliseconds."""
+        with self._lock:
+            self._hist(kind, "receive_to_inject").record((inject_finished - received_at) * 1000)
+            self._hist(kind, "inject").record((inject_finished - inject_started) * 1000)
+            if client_ts is not None and received_wall is not None:
+                self._hist(kind, "client_to_server").record(max(0.0, received_wall - client_ts))
+
+    def open_connection(self, kind):
+        with self._lock:
+            conn = ConnectionStats(next(self._ids), kind)
+            self._connections[conn.id] = conn
+            return conn
+
+    def close_connection(self, conn):
+        with self._lock:
+            self._connections.pop(conn.id, None)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "since": round(self._started, 3),
+                "latency": {kind: {name: h.snapshot() for name, h in hists.items()}
+                            for kind, hists in self._hists.items()},
+                "connections": [c.snapshot() for c in self._connections.values()],
+            }
+
+    def reset(self):
+        with self._lock:
+            self._hists = {}
+            self._started = time.time()
+
+
+def parse_client_ts(value):
+    """Client send timestamp (epoch ms) from a message/header, or None if absent/invalid."""
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def wall_ms():
+    return time.time() * 1000
+
+
+input_metrics = InputMetrics()
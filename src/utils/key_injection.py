@@ -0,0 +1,334 @@
+import ctypes
+import logging
+import threading
+from config import KEY_INJECTION_BACKEND
+from src.utils import applescript
+
+logger = logging.getLogger('key_injection')
+
+# macOS virtual key codes for non-printable keys + modifiers (for /system/pressKey)
+KEY_CODES = {
+    "esc": 53, "tab": 48, "return": 36, "enter": 36, "delete": 51, "backspace": 51,
+    "forwarddelete": 117, "space": 49, "caps": 57,
+    "left": 123, "right": 124, "down": 125, "up": 126,
+    "f1": 122, "f2": 120, "f3": 99, "f4": 118, "f5": 96, "f6": 97, "f7": 98,
+    "f8": 100, "f9": 101, "f10": 109, "f11": 103, "f12": 111,
+    "cmd": 55, "option": 58, "ctrl": 59, "shift": 56,
+}
+
+# Modifier name -> AppleScript phrase
+MODIFIER_PHRASES = {
+    "cmd": "command down", "option": "option down",
+    "ctrl": "control down", "shift": "shift down",
+}
+
+# Modifier name -> CGEventFlags mask
+MODIFIER_FLAGS = {
+    "cmd": 0x100000, "option": 0x80000, "ctrl": 0x40000, "shift": 0x20000,
+}
+
+
+_CARBON = '/System/Library/Frameworks/Carbon.framework/Carbon'
+_CORE_FOUNDATION = '/System/Library/Frameworks/CoreFoundation.framework/CoreFoundation'
+
+# Numeric keypad key codes: shortcuts expect the main-keyboard key, so the keypad
+# only supplies characters the main keys can't type
+_KEYPAD_CODES = frozenset({65, 67, 69, 71, 75, 76, 78, 81, 82, 83, 84, 85, 86, 87, 88, 89, 91, 92})
+_UC_SHIFT = 0x02               # shiftKey >> 8, the modifier state UCKeyTranslate takes
+_UC_NO_DEAD_KEYS = 0x01        # kUCKeyTranslateNoDeadKeysMask
+_CF_UTF8 = 0x08000100          # kCFStringEncodingUTF8
+
+
+class BackendUnsupported(Exception):
+    """The backend can't perform this press faithfully; use the osascript fallback."""
+
+
+def _check_key(key):
+    if not isinstance(key, str) or key == "":
+        raise ValueError("Missing 'key'")
+    if key.lower() not in KEY_CODES and len(key) != 1:
+        raise ValueError(f"Unknown key: {key}")
+
+
+def _build_char_map(translate):
+    """Character -> (key code, shifted) from `translate(code, shifted) -> str`.
+
+    Each character keeps the first key that types it: unshifted main keys, then
+    shifted main keys, then the keypad.
+    """
+    chars = {}
+    main = [code for code in range(128) if code not in _KEYPAD_CODES]
+    for codes, shifted in ((main, False), (main, True), (sorted(_KEYPAD_CODES), False)):
+        for code in codes:
+            ch = translate(code, shifted)
+            if len(ch) == 1 and ch.isprintable() and ch not in chars:
+                chars[ch] = (code, shifted)
+    return chars
+
+
+class TISLayoutSource:
+    """The active keyboard layout via Text Input Sources and UCKeyTranslate (ctypes)."""
+
+    def __init__(self):
+        carbon = ctypes.CDLL(_CARBON)
+        cf = ctypes.CDLL(_CORE_FOUNDATION)
+        carbon.TISCopyCurrentKeyboardLayoutInputSource.restype = ctypes.c_void_p
+        carbon.TISGetInputSourceProperty.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        carbon.TISGetInputSourceProperty.restype = ctypes.c_void_p
+        carbon.LMGetKbdType.restype = ctypes.c_uint8
+        carbon.UCKeyTranslate.argtypes = [
+            ctypes.c_void_p, ctypes.c_uint16, ctypes.c_uint16, ctypes.c_uint32, ctypes.c_uint32,
+            ctypes.c_uint32, ctypes.POINTER(ctypes.c_uint32), ctypes.c_ulong,
+            ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_uint16),
+        ]
+        carbon.UCKeyTranslate.restype = ctypes.c_int32
+        cf.CFDataGetBytePtr.argtypes = [ctypes.c_void_p]
+        cf.CFDataGetBytePtr.restype = ctypes.c_void_p
+        cf.CFDataGetLength.argtypes = [ctypes.c_void_p]
+        cf.CFDataGetLength.restype = ctypes.c_long
+        cf.CFStringGetCString.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_long, ctypes.c_uint32]
+        cf.CFStringGetCString.restype = ctypes.c_bool
+        cf.CFRelease.argtypes = [ctypes.c_void_p]
+        self._carbon = carbon
+        self._cf = cf
+        self._id_key = ctypes.c_void_p.in_dll(carbon, "kTISPropertyInputSourceID").value
+        self._data_key = ctypes.c_void_p.in_dll(carbon, "kTISPropertyUnicodeKeyLayoutData").value
+
+    def _with_current(self, fn):
+        source = self._carbon.TISCopyCurrentKeyboardLayoutInputSource()
+        if not source:
+            raise OSError("no current keyboard layout")
+        try:
+            return fn(source)
+        finally:
+            self._cf.CFRelease(source)
+
+    def current_id(self):
+        """Input source id of the active layout, e.g. com.apple.keylayout.French."""
+        def read(source):
+            buf = ctypes.create_string_buffer(256)
+            ref = self._carbon.TISGetInputSourceProperty(source, self._id_key)
+            if not ref or not self._cf.CFStringGetCString(ref, buf, len(buf), _CF_UTF8):
+                raise OSError("keyboard layout has no id")
+            return buf.value.decode()
+        return self._with_current(read)
+
+    def translator(self):
+        """translate(code, shifted) -> the text that key types on the active layout."""
+        def copy_layout(source):
+            data = self._carbon.TISGetInputSourceProperty(source, self._data_key)
+            if not data:
+                raise OSError("keyboard layout has no Unicode key layout data")
+            size = self._cf.CFDataGetLength(data)
+            return ctypes.string_at(self._cf.CFDataGetBytePtr(data), size)
+
+        layout = ctypes.create_string_buffer(self._with_current(copy_layout))
+        kbd_type = self._carbon.LMGetKbdType()
+
+        def translate(code, shifted):
+            dead = ctypes.c_uint32(0)
+            length = ctypes.c_ulong(0)
+            chars = (ctypes.c_uint16 * 4)()
+            err = self._carbon.UCKeyTranslate(
+                layout, code, 0, _UC_SHIFT if shifted else 0, kbd_type, _UC_NO_DEAD_KEYS,
+                ctypes.byref(dead), len(chars), ctypes.byref(length), chars,
+            )
+            if err:
+                return ""
+            return bytes(chars)[:2 * length.value].decode("utf-16-le", errors="ignore")
+        return translate
+
+
+class KeyboardLayout:
+    """Which key types a character on the active layout, cached per layout.
+
+    The map is built once from the layout's key translations and rebuilt when the
+    active input source changes (checked on each lookup: one cheap TIS call).
+    """
+
+    def __init__(self, source):
+        self._source = source
+        self._lock = threading.Lock()
+        self._id = None
+        self._chars = {}
+
+    def lookup(self, ch):
+        """(key code, shifted) that types `ch`, or None if this layout can't."""
+        with self._lock:
+            layout_id = self._source.current_id()
+            if layout_id != self._id:
+                self._chars = _build_char_map(self._source.translator())
+                self._id = layout_id
+                logger.info(f"Keyboard layout {layout_id}: {len(self._chars)} characters mapped")
+            return self._chars.get(ch)
+
+
+class OsascriptBackend:
+    """System Events keystrokes through the shared AppleScript service — slower than
+    posting events natively, but handles any character on any keyboard layout."""
+
+    name = "osascript"
+
+    def _run(self, action, modifiers):
+        phrases = [MODIFIER_PHRASES[m] for m in modifiers if m in MODIFIER_PHRASES]
+        using = f" using {{{', '.join(phrases)}}}" if phrases else ""
+        script = f'tell application "System Events" to {action}{using}'
+        applescript.run(script)
+
+    def press(self, key, modifiers=()):
+        _check_key(key)
+        if key.lower() in KEY_CODES:
+            self._run(f"key code {KEY_CODES[key.lower()]}", modifiers)
+        else:
+            ch = key.replace("\\", "\\\\").replace('"', '\\"')  # escape for the AppleScript string literal
+            self._run(f'keystroke "{ch}"', modifiers)
+
+    def press_code(self, code, modifiers=()):
+        self._run(f"key code {int(code)}", modifiers)
+
+
+class QuartzBackend:
+    """Posts key events in-process with CGEventPost — no process spawn per key.
+
+    Named keys (KEY_CODES) are posted by virtual key code, with modifiers pressed
+    as real key events around the key (and the matching flags set on every event),
+    which is what apps see from a hardware keyboard.
+
+    A virtual key code is a physical key position, so which character it types
+    depends on the active keyboard layout (keycode 0 is A on US but Q on AZERTY).
+    Printable characters without modifiers are posted with the character attached
+    (CGEventKeyboardSetUnicodeString), which is layout independent. Shortcuts on
+    printable characters (cmd+a, cmd+v) use the key that types the character on
+    the active layout (KeyboardLayout), plus shift if the layout needs it; only a
+    character the layout can't type raises BackendUnsupported, so the caller
+    sends it as an AppleScript keystroke.
+    """
+
+    name = "quartz"
+
+    def __init__(self, layout=None):
+        import Quartz
+        self._q = Quartz
+        self._source = Quartz.CGEventSourceCreate(Quartz.kCGEventSourceStateHIDSystemState)
+        if layout is None:
+            try:
+                layout = KeyboardLayout(TISLayoutSource())
+            except Exception as e:
+                logger.warning(f"Keyboard layout lookup unavailable ({e}); shortcuts use osascript")
+        self._layout = layout
+
+    def _post(self, code, down, flags, text=None):
+        event = self._q.CGEventCreateKeyboardEvent(self._source, code, down)
+        if text is not None:
+            self._q.CGEventKeyboardSetUnicodeString(event, len(text.encode("utf-16-le")) // 2, text)
+        self._q.CGEventSetFlags(event, flags)
+        self._q.CGEventPost(self._q.kCGHIDEventTap, event)
+
+    def press_code(self, code, modifiers=()):
+        mods = [m for m in MODIFIER_FLAGS if m in modifiers]
+        flags = 0
+        for m in mods:
+            flags |= MODIFIER_FLAGS[m]
+            self._post(KEY_CODES[m], True, flags)
+        self._post(int(code), True, flags)
+        self._post(int(code), False, flags)
+        for m in reversed(mods):
+            flags &= ~MODIFIER_FLAGS[m]
+            self._post(KEY_CODES[m], False, flags)
+
+    def _shortcut_key(self, key, modifiers):
+        """(key code, modifiers) for a printable character on the active layout."""
+        try:
+            found = self._layout.lookup(key) if self._layout is not None else None
+        except Exception as e:
+            logger.warning(f"Keyboard layout lookup failed: {e}")
+            found = None
+        if found is None:
+            raise BackendUnsupported(f"{key!r} isn't on the active keyboard layout")
+        code, shifted = found
+        mods = list(modifiers)
+        if shifted and "shift" not in mods:
+            mods.append("shift")
+        return code, mods
+
+    def press(self, key, modifiers=()):
+        _check_key(key)
+        if key.lower() in KEY_CODES:
+            self.press_code(KEY_CODES[key.lower()], modifiers)
+            return
+        if modifiers:
+            self.press_code(*self._shortcut_key(key, modifiers))
+            return
+        self._post(0, True, 0, text=key)
+        self._post(0, False, 0, text=key)
+
+
+class FakeBackend:
+    """Records presses in memory instead of touching the OS (tests/benchmarks on Linux)."""
+
+    name = "fake"
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def press(self, key, modifiers=()):
+        _check_key(key)
+        with self._lock:
+            self.events.append(("press", key, tuple(modifiers)))
+
+    def press_code(self, code, modifiers=()):
+        with self._lock:
+            self.events.append(("code", int(code), tuple(modifiers)))
+
+
+_backend = None
+_fallback = OsascriptBackend()
+_backend_lock = threading.Lock()
+
+
+def _create_backend(choice):
+    if choice == "fake":
+        return FakeBackend()
+    if choice == "osascript":
+        return OsascriptBackend()
+    try:
+        return QuartzBackend()
+    except Exception as e:
+        if choice == "quartz":
+            raise
+        logger.warning(f"Quartz key injection unavailable ({e}); using osascript")
+        return OsascriptBackend()
+
+
+def get_backend():
+    """The process-wide backend chosen by KEY_INJECTION_BACKEND (auto = quartz, else osascript)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _create_backend(KEY_INJECTION_BACKEND)
+            logger.info(f"Key injection backend: {_backend.name}")
+        return _backend
+
+
+def set_backend(backend):
+    """Swap the backend (e.g. a FakeBackend in tests). Returns the previous one."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
+
+
+def press_key(key, modifiers=()):
+    """Press a key (printable char or KEY_CODES name) with optional modifiers.
+    ValueError if the key is unknown."""
+    backend = get_backend()
+    try:
+        backend.press(key, modifiers)
+    except BackendUnsupported:
+        _fallback.press(key, modifiers)
+
+
+def press_key_code(code, modifiers=()):
+    """Press a raw macOS virtual key code (e.g. 144/145 for brightness)."""
+    get_backend().press_code(code, modifiers)
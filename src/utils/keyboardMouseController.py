@@ -1,8 +1,6 @@
 import logging
 from pynput import keyboard,mouse
-import pyttsx3
-from threading import Thread
-import time
+from src.utils import speech
 
 logger = logging.getLogger('keyboardMouseController')
 
@@ -13,32 +11,11 @@ lock_keys = False
 mouse_listener = None
 
 
-# Initialize the pyttsx3 engine once
-engine = pyttsx3.init() 
-engine.setProperty('voice', 'com.apple.voice.compact.en-AU.Karen')  # Set to "Karen" voice
-engine.setProperty('rate', 100)  # Set speech rate (words per minute)
-
-def speak_text(text):
-    """Function to perform text-to-speech in a separate thread."""
-
-    engine.say(text)
-    engine.runAndWait()
-    # while True:
-    #     print("Waiting for engine to be free...",engine.isBusy())
-    #     if not engine.isBusy():  # Check if the engine is busy
-    #         try:
-    #             engine.runAndWait()
-    #         except Exception as e:
-    #             print(f"Error in text-to-speech: {e}")
-    #         break
-    #     else:
-    #         time.sleep(2)  # Wait a bit before checking again
-
-def text_to_speech(text):
+def text_to_speech(text, key=None):
+    """Announce `text` via the shared speech worker. A `key` lets a newer phrase
+    replace a pending one about the same thing (e.g. rapid lock/unlock toggles)."""
     try:
-        # Create and start a new thread for the speech task
-        speech_thread = Thread(target=speak_text, args=(text,))
-        speech_thread.start()
+        speech.say(text, key)
     except Exception as e:
         logger.error(f"Error in text-to-speech conversion: {e}")
 
@@ -51,15 +28,14 @@ def lock_keyboard():
     if keyboard_listener is None:
         keyboard_listener = keyboard.Listener(on_press=on_press, suppress=True)
         keyboard_listener.start()
-        # text_to_speech("Keyboard is disabled.")
-        text_to_speech("Keyboard is disabled.")
+        text_to_speech("Keyboard is disabled.", key="keyboard")
 
 def unlock_keyboard():
     global keyboard_listener
 
     if keyboard_listener is not None:
         logger.info("keyboard_listener stopped.")
-        text_to_speech("Keyboard is enabled.")
+        text_to_speech("Keyboard is enabled.", key="keyboard")
         keyboard_listener.stop()
         keyboard_listener = None
 
@@ -79,14 +55,14 @@ def lock_mouse():
     if mouse_listener is None:
         mouse_listener = mouse.Listener(on_move=on_move, on_click=on_click, on_scroll=on_scroll, suppress=True)
         mouse_listener.start()
-        text_to_speech("Mouse is disabled.")
+        text_to_speech("Mouse is disabled.", key="mouse")
 
 def unlock_mouse():
     global mouse_listener
 
     if mouse_listener is not None:
         logger.info("mouse_listener stopped.")
-        text_to_speech("Mouse is enabled.")
+        text_to_speech("Mouse is enabled.", key="mouse")
         mouse_listener.stop()
         mouse_listener = None
 
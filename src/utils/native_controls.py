@@ -0,0 +1,383 @@
+import ctypes
+import logging
+import threading
+from config import NATIVE_CONTROLS_BACKEND
+from src.utils import applescript
+
+logger = logging.getLogger('native_controls')
+
+# Levels are 0-100 everywhere in this module; backends convert to their own scale.
+
+_CORE_BRIGHTNESS = '/System/Library/PrivateFrameworks/CoreBrightness.framework'
+_DISPLAY_SERVICES = '/System/Library/PrivateFrameworks/DisplayServices.framework/DisplayServices'
+_CORE_GRAPHICS = '/System/Library/Frameworks/CoreGraphics.framework/CoreGraphics'
+_CORE_AUDIO = '/System/Library/Frameworks/CoreAudio.framework/CoreAudio'
+_AUDIO_TOOLBOX = '/System/Library/Frameworks/AudioToolbox.framework/AudioToolbox'
+
+
+class ControlUnavailable(Exception):
+    """The backend can't reach this control (framework missing, not scriptable, ...)."""
+
+
+def _fourcc(code):
+    return int.from_bytes(code.encode(), 'big')
+
+
+class _PropertyAddress(ctypes.Structure):
+    _fields_ = [("selector", ctypes.c_uint32), ("scope", ctypes.c_uint32), ("element", ctypes.c_uint32)]
+
+
+_SYSTEM_OBJECT = 1
+_DEFAULT_OUTPUT = _PropertyAddress(_fourcc('dOut'), _fourcc('glob'), 0)
+_MAIN_VOLUME = (_fourcc('vmvc'), _fourcc('outp'), 0)  # VirtualMainVolume, Float32 0-1
+_MUTE = (_fourcc('mute'), _fourcc('outp'), 0)          # UInt32
+
+
+def _clamp(level):
+    return max(0, min(100, int(level)))
+
+
+class NativeBackend:
+    """Talks to the frameworks directly. Each framework is loaded (and the keyboard
+    brightness client created) the first time its control is used, then reused for
+    the life of the process; one that fails to load is remembered as unavailable and
+    its controls raise ControlUnavailable so the caller can fall back."""
+
+    name = "native"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._handles = {}  # name -> handle, or the Exception it failed with
+        self._toggle_lock = threading.Lock()
+
+    def _handle(self, name, loader):
+        with self._lock:
+            if name not in self._handles:
+                try:
+                    self._handles[name] = loader()
+                    logger.info(f"Loaded native handle: {name}")
+                except Exception as e:
+                    logger.warning(f"Native {name} unavailable: {e}")
+                    self._handles[name] = e
+            handle = self._handles[name]
+        if isinstance(handle, Exception):
+            raise ControlUnavailable(f"{name} unavailable: {handle}")
+        return handle
+
+    # Keyboard backlight: CoreBrightness KeyboardBrightnessClient (keyboard id 1 = built-in)
+
+    @staticmethod
+    def _load_keyboard_client():
+        import objc
+        objc.loadBundle('CoreBrightness', bundle_path=_CORE_BRIGHTNESS, module_globals={})
+        return objc.lookUpClass('KeyboardBrightnessClient').alloc().init()
+
+    def get_keyboard_light(self):
+        client = self._handle("keyboard_light", self._load_keyboard_client)
+        return round(client.brightnessForKeyboard_(1) * 100)
+
+    def set_keyboard_light(self, level):
+        client = self._handle("keyboard_light", self._load_keyboard_client)
+        client.setBrightness_forKeyboard_(_clamp(level) / 100.0, 1)
+
+    # Display brightness: DisplayServices on the main display
+
+    @staticmethod
+    def _load_display_services():
+        ds = ctypes.CDLL(_DISPLAY_SERVICES)
+        ds.DisplayServicesGetBrightness.argtypes = [ctypes.c_uint32, ctypes.POINTER(ctypes.c_float)]
+        ds.DisplayServicesGetBrightness.restype = ctypes.c_int
+        ds.DisplayServicesSetBrightness.argtypes = [ctypes.c_uint32, ctypes.c_float]
+        ds.DisplayServicesSetBrightness.restype = ctypes.c_int
+        cg = ctypes.CDLL(_CORE_GRAPHICS)
+        cg.CGMainDisplayID.restype = ctypes.c_uint32
+        return ds, cg
+
+    def get_display_brightness(self):
+        ds, cg = self._handle("display_brightness", self._load_display_services)
+        value = ctypes.c_float()
+        err = ds.DisplayServicesGetBrightness(cg.CGMainDisplayID(), ctypes.byref(value))
+        if err:
+            raise ControlUnavailable(f"DisplayServicesGetBrightness failed ({err})")
+        return round(value.value * 100)
+
+    def set_display_brightness(self, level):
+        ds, cg = self._handle("display_brightness", self._load_display_services)
+        err = ds.DisplayServicesSetBrightness(cg.CGMainDisplayID(), _clamp(level) / 100.0)
+        if err:
+            raise ControlUnavailable(f"DisplayServicesSetBrightness failed ({err})")
+
+    # Output volume / mute: CoreAudio on the current default output device (looked
+    # up per call — cheap, and it follows headphones being plugged in)
+
+    @staticmethod
+    def _load_audio():
+        ca = ctypes.CDLL(_CORE_AUDIO)
+        at = ctypes.CDLL(_AUDIO_TOOLBOX)
+        addr = ctypes.POINTER(_PropertyAddress)
+        u32p = ctypes.POINTER(ctypes.c_uint32)
+        for fn in (ca.AudioObjectGetPropertyData, at.AudioHardwareServiceGetPropertyData):
+            fn.argtypes = [ctypes.c_uint32, addr, ctypes.c_uint32, ctypes.c_void_p, u32p, ctypes.c_void_p]
+            fn.restype = ctypes.c_int32
+        for fn in (ca.AudioObjectSetPropertyData, at.AudioHardwareServiceSetPropertyData):
+            fn.argtypes = [ctypes.c_uint32, addr, ctypes.c_uint32, ctypes.c_void_p, ctypes.c_uint32, ctypes.c_void_p]
+            fn.restype = ctypes.c_int32
+        return ca, at
+
+    @staticmethod
+    def _get(fn, obj, address, value):
+        size = ctypes.c_uint32(ctypes.sizeof(value))
+        err = fn(obj, ctypes.byref(address), 0, None, ctypes.byref(size), ctypes.byref(value))
+        if err:
+            raise ControlUnavailable(f"CoreAudio get failed ({err})")
+        return value.value
+
+    @staticmethod
+    def _set(fn, obj, address, value):
+        err = fn(obj, ctypes.byref(address), 0, None, ctypes.sizeof(value), ctypes.byref(value))
+        if err:
+            raise ControlUnavailable(f"CoreAudio set failed ({err})")
+
+    def _output_device(self, ca):
+        return self._get(ca.AudioObjectGetPropertyData, _SYSTEM_OBJECT, _DEFAULT_OUTPUT, ctypes.c_uint32())
+
+    def get_volume(self):
+        ca, at = self._handle("audio", self._load_audio)
+        value = self._get(at.AudioHardwareServiceGetPropertyData, self._output_device(ca),
+                          _PropertyAddress(*_MAIN_VOLUME), ctypes.c_float())
+        return round(value * 100)
+
+    def set_volume(self, level):
+        ca, at = self._handle("audio", self._load_audio)
+        self._set(at.AudioHardwareServiceSetPropertyData, self._output_device(ca),
+                  _PropertyAddress(*_MAIN_VOLUME), ctypes.c_float(_clamp(level) / 100.0))
+
+    def get_muted(self):
+        ca, _ = self._handle("audio", self._load_audio)
+        return self._read_muted(ca, self._output_device(ca))
+
+    def _read_muted(self, ca, device):
+        return bool(self._get(ca.AudioObjectGetPropertyData, device,
+                              _PropertyAddress(*_MUTE), ctypes.c_uint32()))
+
+    def set_muted(self, muted):
+        ca, _ = self._handle("audio", self._load_audio)
+        self._set(ca.AudioObjectSetPropertyData, self._output_device(ca),
+                  _PropertyAddress(*_MUTE), ctypes.c_uint32(1 if muted else 0))
+
+    def get_volume_and_mute(self):
+        ca, at = self._handle("audio", self._load_audio)
+        device = self._output_device(ca)
+        value = self._get(at.AudioHardwareServiceGetPropertyData, device,
+                          _PropertyAddress(*_MAIN_VOLUME), ctypes.c_float())
+        return round(value * 100), self._read_muted(ca, device)
+
+    def toggle_muted(self):
+        ca, _ = self._handle("audio", self._load_audio)
+        # Read-modify-write: serialized so two concurrent toggles can't both read the same state
+        with self._toggle_lock:
+            device = self._output_device(ca)
+            muted = not self._read_muted(ca, device)
+            self._set(ca.AudioObjectSetPropertyData, device, _PropertyAddress(*_MUTE), ctypes.c_uint32(int(muted)))
+        return muted
+
+
+class OsascriptBackend:
+    """Volume and mute through the shared AppleScript service. AppleScript has no
+    brightness or keyboard backlight commands, so those raise ControlUnavailable."""
+
+    name = "osascript"
+
+    def get_volume(self):
+        return int(applescript.run("output volume of (get volume settings)"))
+
+    def set_volume(self, level):
+        applescript.run(f"set volume output volume {_clamp(level)}")
+
+    def get_muted(self):
+        return applescript.run("output muted of (get volume settings)") == "true"
+
+    def set_muted(self, muted):
+        applescript.run(f"set volume output muted {'true' if muted else 'false'}")
+
+    def get_volume_and_mute(self):
+        # One script for both, from a single `get volume settings`
+        vol_raw, _, muted_raw = applescript.run(
+            'set s to get volume settings\n'
+            'return ((output volume of s) as text) & "|" & ((output muted of s) as text)'
+        ).partition("|")
+        volume = int(vol_raw) if vol_raw.lstrip("-").isdigit() else None
+        return volume, muted_raw == "true"
+
+    def toggle_muted(self):
+        # Read and write inside one script, so the toggle is atomic from our side
+        return applescript.run(
+            'set volume output muted not (output muted of (get volume settings))\n'
+            'return output muted of (get volume settings)'
+        ) == "true"
+
+    def get_display_brightness(self):
+        raise ControlUnavailable("display brightness is not scriptable")
+
+    def set_display_brightness(self, level):
+        raise ControlUnavailable("display brightness is not scriptable")
+
+    def get_keyboard_light(self):
+        raise ControlUnavailable("keyboard backlight is not scriptable")
+
+    def set_keyboard_light(self, level):
+        raise ControlUnavailable("keyboard backlight is not scriptable")
+
+
+class FakeBackend:
+    """Keeps levels in memory and records every set (tests/benchmarks on Linux)."""
+
+    name = "fake"
+
+    def __init__(self, **levels):
+        self.levels = {"volume": 50, "muted": False, "display_brightness": 50, "keyboard_light": 0, **levels}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _set(self, control, value):
+        with self._lock:
+            self.levels[control] = value
+            self.calls.append((control, value))
+
+    def get_volume(self):
+        return self.levels["volume"]
+
+    def set_volume(self, level):
+        self._set("volume", _clamp(level))
+
+    def get_muted(self):
+        return self.levels["muted"]
+
+    def set_muted(self, muted):
+        self._set("muted", bool(muted))
+
+    def get_volume_and_mute(self):
+        with self._lock:
+            return self.levels["volume"], self.levels["muted"]
+
+    def toggle_muted(self):
+        with self._lock:
+            muted = self.levels["muted"] = not self.levels["muted"]
+            self.calls.append(("muted", muted))
+            return muted
+
+    def get_display_brightness(self):
+        return self.levels["display_brightness"]
+
+    def set_display_brightness(self, level):
+        self._set("display_brightness", _clamp(level))
+
+    def get_keyboard_light(self):
+        return self.levels["keyboard_light"]
+
+    def set_keyboard_light(self, level):
+        self._set("keyboard_light", _clamp(level))
+
+
+_backend = None
+_fallback = OsascriptBackend()
+_backend_lock = threading.Lock()
+
+
+def _create_backend(choice):
+    if choice == "fake":
+        return FakeBackend()
+    if choice == "osascript":
+        return OsascriptBackend()
+    return NativeBackend()
+
+
+def get_backend():
+    """The process-wide backend chosen by NATIVE_CONTROLS_BACKEND."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _create_backend(NATIVE_CONTROLS_BACKEND)
+            logger.info(f"Native controls backend: {_backend.name}")
+        return _backend
+
+
+def set_backend(backend):
+    """Swap the backend (e.g. a FakeBackend in tests). Returns the previous one."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
+
+
+def _call(method, *args):
+    backend = get_backend()
+    try:
+        return getattr(backend, method)(*args)
+    except ControlUnavailable as native_error:
+        # In auto mode an unavailable framework falls back to osascript where it can
+        if backend.name != "native" or NATIVE_CONTROLS_BACKEND == "native":
+            raise
+        try:
+            return getattr(_fallback, method)(*args)
+        except ControlUnavailable:
+            raise native_error from None
+
+
+def get_volume():
+    return _call("get_volume")
+
+
+def set_volume(level):
+    _call("set_volume", _clamp(level))
+
+
+def get_muted():
+    return _call("get_muted")
+
+
+def set_muted(muted):
+    _call("set_muted", bool(muted))
+
+
+def get_volume_and_mute():
+    """(volume 0-100 or None, muted) from one query."""
+    return _call("get_volume_and_mute")
+
+
+def toggle_muted():
+    """Flip output mute in one backend operation; returns the new state."""
+    return _call("toggle_muted")
+
+
+def get_display_brightness():
+    return _call("get_display_brightness")
+
+
+def set_display_brightness(level):
+    _call("set_display_brightness", _clamp(level))
+
+
+def get_keyboard_light():
+    return _call("get_keyboard_light")
+
+
+def set_keyboard_light(level):
+    _call("set_keyboard_light", _clamp(level))
+
+
+def read_all():
+    """Every control's current level ({control: value}); an unavailable one is None."""
+    result = {}
+    try:
+        result["volume"], result["muted"] = _call("get_volume_and_mute")
+    except Exception as e:
+        logger.debug(f"Could not read volume/mute: {e}")
+        result["volume"] = result["muted"] = None
+    for control in ("display_brightness", "keyboard_light"):
+        try:
+            result[control] = _call(f"get_{control}")
+        except Exception as e:
+            logger.debug(f"Could not read {control}: {e}")
+            result[control] = None
+    return result
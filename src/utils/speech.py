@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+import wave
+from collections import deque
+from config import SPEECH_VOICE, SPEECH_RATE, SPEECH_QUEUE_MAX, SPEECH_CACHE_DIR
+
+logger = logging.getLogger('speech')
+
+# Fixed announcements, synthesized to audio once (cached on disk across restarts)
+# and then played straight from memory — no synthesis CPU or latency on a toggle.
+ANNOUNCEMENTS = [
+    "Keyboard is disabled.",
+    "Keyboard is enabled.",
+    "Mouse is disabled.",
+    "Mouse is enabled.",
+]
+
+
+class SpeechWorker:
+    """The only owner of the pyttsx3 engine: one thread, one phrase queue.
+
+    `say()` never blocks. A phrase with a `key` supersedes any pending phrase with
+    the same key (a quick lock/unlock toggle only announces the final state), an
+    identical pending phrase is coalesced, and the queue holds at most
+    SPEECH_QUEUE_MAX phrases (the oldest is dropped).
+
+    The thread starts with the worker and pre-synthesizes ANNOUNCEMENTS right
+    away, so even the first toggle is played from memory. pyttsx3 and PyAudio are
+    imported on that thread, not by importers of this module.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = deque()  # (key, text)
+        self._thread = None
+        self._engine = None
+        self._pyaudio = None
+        self._stream = None
+        self._stream_format = None
+        self._clips = {}  # text -> (pcm bytes, sample_rate, channels)
+        self.stats = {"spoken": 0, "from_cache": 0, "superseded": 0, "dropped": 0}
+        with self._cond:
+            self._ensure_thread()
+
+    def say(self, text, key=None):
+        with self._cond:
+            before = len(self._pending)
+            self._pending = deque(
+                (k, t) for k, t in self._pending
+                if t != text and (key is None or k != key)
+            )
+            self.stats["superseded"] += before - len(self._pending)
+            self._pending.append((key, text))
+            while len(self._pending) > SPEECH_QUEUE_MAX:
+                self._pending.popleft()
+                self.stats["dropped"] += 1
+            self._ensure_thread()
+            self._cond.notify()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="speech", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        try:
+            import pyttsx3
+            self._engine = pyttsx3.init()
+            self._engine.setProperty('voice', SPEECH_VOICE)
+            self._engine.setProperty('rate', SPEECH_RATE)
+        except Exception as e:
+            logger.error(f"Error initializing text-to-speech engine: {e}")
+            return
+
+        to_warm = list(ANNOUNCEMENTS)
+        while True:
+            with self._cond:
+                # Pre-synthesize announcements only while nothing is waiting to be spoken
+                while not self._pending and not to_warm:
+                    self._cond.wait()
+                item = self._pending.popleft() if self._pending else None
+
+            if item is None:
+                self._load_clip(to_warm.pop(0))
+                continue
+            try:
+                self._speak(item[1])
+            except Exception as e:
+                logger.error(f"Error in text-to-speech: {e}")
+
+    def _speak(self, text):
+        clip = self._clips.get(text)
+        if clip is not None:
+            self._play(*clip)
+            self.stats["from_cache"] += 1
+        else:
+            self._engine.say(text)
+            self._engine.runAndWait()
+        self.stats["spoken"] += 1
+
+    def _cache_path(self, text):
+        digest = hashlib.sha1(f"{SPEECH_VOICE}|{SPEECH_RATE}|{text}".encode()).hexdigest()[:16]
+        return os.path.join(SPEECH_CACHE_DIR, f"{digest}.wav")
+
+    def _load_clip(self, text):
+        """Load an announcement's audio into memory, synthesizing it first if needed."""
+        path = self._cache_path(text)
+        try:
+            if not os.path.isfile(path):
+                self._synthesize(text, path)
+            with wave.open(path, 'rb') as wf:
+                self._clips[text] = (wf.readframes(wf.getnframes()), wf.getframerate(), wf.getnchannels())
+        except Exception as e:
+            # Not fatal: the phrase is just spoken live
+            logger.warning(f"Could not pre-synthesize '{text}': {e}")
+
+    def _synthesize(self, text, path):
+        os.makedirs(SPEECH_CACHE_DIR, exist_ok=True)
+        fd, raw_path = tempfile.mkstemp(dir=SPEECH_CACHE_DIR, suffix=".aiff")
+        os.close(fd)
+        try:
+            # NSSpeechSynthesizer writes AIFF; convert to 16-bit WAV so it reads back with `wave`
+            self._engine.save_to_file(text, raw_path)
+            self._engine.runAndWait()
+            subprocess.run(["afconvert", "-f", "WAVE", "-d", "LEI16", raw_path, path],
+                           capture_output=True, check=True)
+        finally:
+            if os.path.exists(raw_path):
+                os.remove(raw_path)
+
+    def _play(self, pcm, sample_rate, channels):
+        import pyaudio
+        if self._stream is None or self._stream_format != (sample_rate, channels):
+            if self._stream is not None:
+                self._stream.close()
+            if self._pyaudio is None:
+                self._pyaudio = pyaudio.PyAudio()
+            self._stream = self._pyaudio.open(
+                format=pyaudio.paInt16, channels=channels, rate=sample_rate, output=True
+            )
+            self._stream_format = (sample_rate, channels)
+        self._stream.write(pcm)
+
+
+_worker = SpeechWorker()
+
+
+def say(text, key=None):
+    """Queue a phrase on the shared speech worker (see SpeechWorker)."""
+    _worker.say(text, key)
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+# Repository root, so `config` and `src.*` import the same way they do for run.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import replay_input  # noqa: E402
+
+# Every pynput controller the server creates is one of replay_input's recording
+# fakes: tests never touch the real keyboard or pointer (and run on Linux).
+replay_input.install_fake_pynput()
+
+
+@pytest.fixture
+def injections():
+    """Fake pynput injections made during the test: call it for the (op, arg) list."""
+    replay_input.reset_injections()
+    return replay_input.injected_ops
+
+
+@pytest.fixture
+def auth_headers(monkeypatch):
+    """Authorization header for a device paired for this test only (nothing is saved to disk)."""
+    from src.utils.auth_manager import auth_manager
+    monkeypatch.setattr(auth_manager, "save_data", lambda: None)
+    monkeypatch.setattr(auth_manager, "permanent_tokens", {})
+    monkeypatch.setattr(auth_manager, "connected_devices", {})
+    token = auth_manager.generate_permanent_token("pytest-device", "pytest")
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def system_client():
+    """Test client for a bare app with only the /system blueprint registered."""
+    from flask import Flask
+    from src.controllers.system_controller import system_bp
+    app = Flask(__name__)
+    app.register_blueprint(system_bp, url_prefix="/system")
+    return app.test_client()
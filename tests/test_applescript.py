@@ -0,0 +1,142 @@
+import queue
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from src.utils import applescript
+from src.utils.applescript import AppleScriptError, FakeBackend, PersistentBackend
+
+
+@pytest.fixture
+def fake_osa():
+    backend = FakeBackend()
+    previous = applescript.set_backend(backend)
+    yield backend
+    applescript.set_backend(previous)
+
+
+@pytest.fixture
+def media_client():
+    from src.controllers.media_controller import media_bp
+    app = Flask(__name__)
+    app.register_blueprint(media_bp, url_prefix="/media")
+    return app.test_client()
+
+
+def test_run_returns_trimmed_result(fake_osa):
+    fake_osa.responses["return 1"] = " 1\n"
+    assert applescript.run("return 1") == "1"
+    assert fake_osa.calls == ["return 1"]
+
+
+def test_media_status_reports_now_playing(media_client, auth_headers, fake_osa):
+    from src.controllers import media_controller
+    spotify = media_controller._NOW_PLAYING_SCRIPTS[0]
+    fake_osa.responses[spotify] = "Spotify|Song|Artist"
+    media_controller.media_status_probe.invalidate()
+    r = media_client.post("/media/status", headers=auth_headers)
+    assert r.status_code == 200
+    assert r.get_json()["nowPlaying"] == {"playing": True, "app": "Spotify", "track": "Song", "artist": "Artist"}
+    assert spotify in fake_osa.calls
+
+
+def test_media_status_requires_auth(media_client, fake_osa):
+    assert media_client.post("/media/status").status_code == 401
+    assert fake_osa.calls == []
+
+
+class FakeWorker:
+    """Stands in for an osascript worker process."""
+
+    started = []
+
+    def __init__(self):
+        self.alive = True
+        self.killed = False
+        self.calls = []
+        self.hang = False
+        self.fail = None
+        self.busy_for = 0.0
+        self.deadlines = []
+        FakeWorker.started.append(self)
+
+    def call(self, source, deadline):
+        self.deadlines.append(deadline)
+        if self.hang:
+            raise queue.Empty
+        if self.fail is not None:
+            raise self.fail
+        time.sleep(self.busy_for)
+        self.calls.append(source)
+        return "ok"
+
+    def kill(self):
+        self.killed = True
+        self.alive = False
+
+
+@pytest.fixture
+def fake_workers(monkeypatch):
+    FakeWorker.started = []
+    monkeypatch.setattr(applescript, "_Worker", FakeWorker)
+    return FakeWorker.started
+
+
+def test_persistent_backend_reuses_warm_worker(fake_workers):
+    backend = PersistentBackend(workers=1)
+    assert backend.run("a", 1) == "ok"
+    assert backend.run("b", 1) == "ok"
+    assert len(fake_workers) == 1
+    assert fake_workers[0].calls == ["a", "b"]
+
+
+def test_persistent_backend_replaces_worker_after_timeout(fake_workers):
+    backend = PersistentBackend(workers=1)
+    backend.run("a", 1)
+    fake_workers[0].hang = True
+    with pytest.raises(AppleScriptError):
+        backend.run("slow", 1)
+    assert fake_workers[0].killed
+    assert backend.run("b", 1) == "ok"
+    assert len(fake_workers) == 2
+    assert fake_workers[1].calls == ["b"]
+
+
+def test_persistent_backend_runs_unsent_script_one_shot(fake_workers):
+    backend = PersistentBackend(workers=1)
+    backend._fallback = FakeBackend({"a": "one-shot"})
+    backend.run("warm", 1)
+    fake_workers[0].fail = applescript._NotSent(BrokenPipeError())
+    assert backend.run("a", 1) == "one-shot"
+    assert backend._fallback.calls == ["a"]
+    assert fake_workers[0].killed
+
+
+def test_persistent_backend_does_not_rerun_a_sent_script(fake_workers):
+    backend = PersistentBackend(workers=1)
+    backend._fallback = FakeBackend()
+    backend.run("warm", 1)
+    fake_workers[0].fail = BrokenPipeError("applescript worker exited")
+    with pytest.raises(AppleScriptError):
+        backend.run("a", 1)
+    assert backend._fallback.calls == []
+    assert fake_workers[0].killed
+    assert backend.run("b", 1) == "ok"
+    assert len(fake_workers) == 2
+
+
+def test_persistent_backend_waits_at_most_one_timeout_in_total(fake_workers):
+    backend = PersistentBackend(workers=1)
+    backend.run("warm", 1)
+    fake_workers[0].busy_for = 0.2
+    busy = threading.Thread(target=backend.run, args=("slow", 1))
+    busy.start()
+    time.sleep(0.05)  # "slow" now holds the only worker
+
+    started = time.monotonic()
+    backend.run("queued", 0.5)
+    busy.join()
+    # The reply wait got what was left after waiting ~0.15s for the worker
+    assert fake_workers[0].deadlines[-1] == pytest.approx(started + 0.5, abs=0.02)
@@ -0,0 +1,32 @@
+import pytest
+
+from src.utils.audio_format import parse_format_header
+
+
+def test_full_header():
+    assert parse_format_header('{"sampleRate": 48000, "channels": 2}') == (48000, 2)
+
+
+def test_missing_fields_default_to_44100_mono():
+    assert parse_format_header("{}") == (44100, 1)
+    assert parse_format_header('{"channels": 2}') == (44100, 2)
+
+
+def test_numeric_strings_are_accepted():
+    assert parse_format_header('{"sampleRate": "16000", "channels": "1"}') == (16000, 1)
+
+
+@pytest.mark.parametrize("header", [
+    "not json",
+    "[48000, 2]",
+    '"48000"',
+    '{"sampleRate": "fast"}',
+    '{"channels": null}',
+    '{"sampleRate": 0}',
+    '{"sampleRate": -44100}',
+    '{"channels": 0}',
+    '{"channels": 6}',
+])
+def test_invalid_headers_raise_value_error(header):
+    with pytest.raises(ValueError):
+        parse_format_header(header)
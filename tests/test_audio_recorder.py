@@ -0,0 +1,36 @@
+import wave
+
+import pytest
+
+from src.services.audio_recorder import AudioRecorder
+
+
+def test_chunks_are_batched_into_one_finalized_wav(tmp_path):
+    recorder = AudioRecorder(str(tmp_path))
+    path = recorder.write(b"\x01\x00" * 100, 16000, 1)
+    assert recorder.write(b"\x02\x00" * 100, 16000, 1) == path
+    recorder.stop()
+
+    with wave.open(path, "rb") as w:
+        assert (w.getframerate(), w.getnchannels(), w.getnframes()) == (16000, 1, 200)
+    stats = recorder.get_stats()
+    assert stats["chunks_written"] == 2
+    assert stats["segments_finalized"] == 1
+    assert stats["queued"] == 0
+
+
+def test_format_change_starts_a_new_segment(tmp_path):
+    recorder = AudioRecorder(str(tmp_path))
+    first = recorder.write(b"\x00\x00" * 10, 16000, 1)
+    second = recorder.write(b"\x00\x00" * 10, 44100, 2)
+    recorder.stop()
+    assert first != second
+    assert recorder.get_stats()["segments_finalized"] == 2
+
+
+def test_stop_shuts_down_post_processing(tmp_path):
+    recorder = AudioRecorder(str(tmp_path))
+    recorder.write(b"\x00\x00", 16000, 1)
+    recorder.stop()
+    with pytest.raises(RuntimeError):
+        recorder._post.submit(lambda: None)
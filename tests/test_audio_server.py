@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pyaudio")
+
+from config import AUDIO_SILENCE_HANG_MS, AUDIO_KEEPALIVE_INTERVAL
+from src.streams import audio_server
+from src.streams.audio_server import SilenceGate
+
+LOUD = (np.ones(512, dtype=np.int16) * 10000).tobytes()
+QUIET = bytes(1024)
+HANG = AUDIO_SILENCE_HANG_MS / 1000.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(audio_server, "time", clock)
+    return clock
+
+
+def test_first_loud_chunk_passes_straight_through(clock):
+    gate = SilenceGate()
+    assert gate.process(LOUD) is LOUD
+
+
+def test_quiet_tail_is_sent_for_the_hang_time(clock):
+    gate = SilenceGate()
+    gate.process(LOUD)
+    clock.now += HANG - 0.01
+    assert gate.process(QUIET) is QUIET
+    clock.now += 0.02
+    assert gate.process(QUIET) is None
+
+
+def test_sound_during_the_tail_restarts_the_hang(clock):
+    gate = SilenceGate()
+    gate.process(LOUD)
+    clock.now += HANG * 0.8
+    assert gate.process(LOUD) is LOUD
+    clock.now += HANG * 0.8  # past the first chunk's hang, inside the second's
+    assert gate.process(QUIET) is QUIET
+    clock.now += HANG
+    assert gate.process(QUIET) is None
+
+
+def test_keepalive_while_suppressed(clock):
+    gate = SilenceGate()
+    clock.now += AUDIO_KEEPALIVE_INTERVAL / 2
+    assert gate.process(QUIET) is None
+    clock.now += AUDIO_KEEPALIVE_INTERVAL / 2
+    assert gate.process(QUIET) == gate.keepalive
+    clock.now += AUDIO_KEEPALIVE_INTERVAL / 2
+    assert gate.process(QUIET) is None
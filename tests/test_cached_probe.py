@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from src.utils.cached_probe import CachedProbe, ProbeTimeout
+
+
+class SlowFetch:
+    """fetch() that blocks until released and counts its calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+        self.release.wait(5)
+        return n
+
+
+def test_concurrent_gets_share_one_fetch():
+    fetch = SlowFetch()
+    probe = CachedProbe(fetch, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(probe.get(timeout=5))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)  # every caller is now waiting on the same refresh
+    fetch.release.set()
+    for t in threads:
+        t.join(5)
+    assert fetch.calls == 1
+    assert results == [1] * 8
+
+
+def test_value_is_cached_for_the_ttl():
+    fetch = SlowFetch()
+    fetch.release.set()
+    probe = CachedProbe(fetch, ttl=0.1)
+    assert probe.get() == 1
+    assert probe.get() == 1
+    time.sleep(0.15)
+    assert probe.get() == 2
+    assert fetch.calls == 2
+
+
+def test_invalidate_forces_a_refresh():
+    fetch = SlowFetch()
+    fetch.release.set()
+    probe = CachedProbe(fetch, ttl=60)
+    probe.get()
+    probe.invalidate()
+    assert probe.get() == 2
+
+
+def test_timeout_returns_stale_value_and_refresh_lands_later():
+    fetch = SlowFetch()
+    fetch.release.set()
+    probe = CachedProbe(fetch, ttl=0.05)
+    assert probe.get() == 1
+    time.sleep(0.1)
+    fetch.release.clear()
+    assert probe.get(timeout=0.05) == 1  # stale while the refresh is still running
+    fetch.release.set()
+    time.sleep(0.05)
+    assert probe.get(timeout=0) == 2
+
+
+def test_timeout_without_a_value_raises():
+    fetch = SlowFetch()
+    probe = CachedProbe(fetch, ttl=60)
+    with pytest.raises(ProbeTimeout):
+        probe.get(timeout=0.05)
+    fetch.release.set()
+
+
+def test_fetch_error_reaches_waiters_and_is_not_cached():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("device busy")
+        return "ok"
+
+    probe = CachedProbe(fetch, ttl=60)
+    with pytest.raises(OSError):
+        probe.get(timeout=5)
+    assert probe.get(timeout=5) == "ok"
+
+
+def test_prefetch_starts_a_refresh_without_waiting():
+    fetch = SlowFetch()
+    probe = CachedProbe(fetch, ttl=60)
+    probe.prefetch()
+    probe.prefetch()  # joins the refresh already in flight
+    fetch.release.set()
+    assert probe.get(timeout=5) == 1
+    assert fetch.calls == 1
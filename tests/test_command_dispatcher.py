@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from src.services.command_dispatcher import CommandDispatcher
+
+
+class Gate:
+    """Blocking action that tracks how many copies run at once."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            self.release.wait(5)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def test_lane_never_exceeds_its_limit():
+    dispatcher = CommandDispatcher(workers=4, lane_limits={"input": 4, "slow": 2}, history=50)
+    gate = Gate()
+    jobs = [dispatcher.submit("slow", f"slow-{i}", gate) for i in range(6)]
+    time.sleep(0.1)
+    lane = dispatcher.stats()["lanes"]["slow"]
+    assert lane["running"] == 2
+    assert lane["depth"] == 4
+    gate.release.set()
+    assert all(job.wait(5) for job in jobs)
+    assert gate.max_running == 2
+
+
+def test_capped_lane_leaves_workers_free_for_input():
+    dispatcher = CommandDispatcher(workers=3, lane_limits={"input": 3, "housekeeping": 1}, history=50)
+    gate = Gate()
+    slow = [dispatcher.submit("housekeeping", f"sleep-{i}", gate) for i in range(3)]
+    time.sleep(0.05)
+    assert dispatcher.run("input", "key", lambda: "typed") == "typed"
+    gate.release.set()
+    assert all(job.wait(5) for job in slow)
+
+
+def test_higher_priority_lane_is_served_first():
+    dispatcher = CommandDispatcher(workers=1, lane_limits={"input": 1, "media": 1}, history=50)
+    order = []
+    gate = Gate()
+    blocker = dispatcher.submit("media", "blocker", gate)
+    time.sleep(0.05)  # the only worker is busy
+    media = dispatcher.submit("media", "media", lambda: order.append("media"))
+    key = dispatcher.submit("input", "key", lambda: order.append("input"))
+    gate.release.set()
+    assert blocker.wait(5) and media.wait(5) and key.wait(5)
+    assert order == ["input", "media"]
+
+
+def test_lane_limit_is_capped_at_the_pool_size():
+    dispatcher = CommandDispatcher(workers=2, lane_limits={"input": 8}, history=50)
+    assert dispatcher.stats()["lanes"]["input"]["limit"] == 2
+
+
+def test_run_reraises_the_action_error_and_unknown_lanes_fail():
+    dispatcher = CommandDispatcher(workers=1, lane_limits={"input": 1}, history=50)
+
+    def fail():
+        raise ValueError("Unknown key: x")
+
+    with pytest.raises(ValueError):
+        dispatcher.run("input", "bad key", fail)
+    assert dispatcher.stats()["lanes"]["input"]["failed"] == 1
+    with pytest.raises(KeyError):
+        dispatcher.submit("nope", "x", lambda: None)
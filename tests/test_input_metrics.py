@@ -0,0 +1,62 @@
+import pytest
+
+from src.utils import input_metrics
+from src.utils.input_metrics import ConnectionStats, LatencyHistogram
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(input_metrics, "time", clock)
+    return clock
+
+
+def test_events_per_sec_is_measured_over_one_second_windows(clock):
+    stats = ConnectionStats(1, "mouse_ws")
+    stats.record_events(30)
+    clock.now += 1.0
+    stats.record_events(10)
+    assert stats.snapshot()["events_per_sec"] == 40.0
+
+
+def test_events_per_sec_is_recomputed_once_the_window_runs_out(clock):
+    stats = ConnectionStats(1, "mouse_ws")
+    stats.record_events(30)
+    clock.now += 1.0
+    stats.record_events(10)
+    clock.now += 0.5
+    assert stats.snapshot()["events_per_sec"] == 40.0  # current window still open
+    stats.record_events(6)
+    clock.now += 2.5
+    assert stats.snapshot()["events_per_sec"] == 2.0   # 6 events in the 3s since
+
+
+def test_events_per_sec_drops_to_zero_without_events(clock):
+    stats = ConnectionStats(1, "mouse_ws")
+    stats.record_events(30)
+    clock.now += 1.0
+    stats.record_events(10)
+    clock.now += 3.0
+    assert stats.snapshot()["events_per_sec"] == 0.0
+
+
+def test_histogram_percentiles_are_bucket_bounds():
+    hist = LatencyHistogram()
+    for ms in (0.05, 0.3, 0.3, 4, 7000):
+        hist.record(ms)
+    snap = hist.snapshot()
+    assert snap["count"] == 5
+    assert snap["p50_ms"] == 0.5
+    assert snap["p99_ms"] == 7000
+    assert snap["buckets"] == {"<=0.1": 1, "<=0.5": 2, "<=5": 1, ">5000": 1}
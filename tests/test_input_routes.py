@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+from flask import Flask
+
+from src.controllers import system_controller
+from src.services.input_worker import input_worker
+
+
+class FakeGeometry:
+    """Primary display of 1000x500 points at the origin."""
+
+    def to_screen(self, rx, ry):
+        return rx * 1000, ry * 500
+
+
+@pytest.fixture
+def worker_runs(monkeypatch):
+    """Names of the threads input injections ran on, via the shared input_worker."""
+    threads = []
+    run = input_worker.run
+
+    def spy(action):
+        def traced():
+            threads.append(threading.current_thread().name)
+            action()
+        return run(traced)
+
+    monkeypatch.setattr(input_worker, "run", spy)
+    return threads
+
+
+@pytest.fixture
+def media_client():
+    from src.controllers.media_controller import media_bp
+    app = Flask(__name__)
+    app.register_blueprint(media_bp, url_prefix="/media")
+    return app.test_client()
+
+
+@pytest.mark.parametrize("direction", ["up", "down", "left", "right"])
+def test_arrow_routes_tap_on_the_input_worker(media_client, auth_headers, injections, worker_runs, direction):
+    r = media_client.post(f"/media/{direction}", headers=auth_headers)
+    assert r.status_code == 200
+    assert injections() == [("key_down", direction), ("key_up", direction)]
+    assert worker_runs == ["input-worker"]
+
+
+def test_mouse_click_clicks_on_the_input_worker(monkeypatch, system_client, auth_headers, injections, worker_runs):
+    monkeypatch.setattr(system_controller, "display_geometry", FakeGeometry())
+    r = system_client.post("/system/mouse-click", json={"rx": 0.5, "ry": 0.25}, headers=auth_headers)
+    assert r.status_code == 200
+    assert injections() == [("moveto", (500.0, 125.0)), ("click", "left")]
+    assert worker_runs == ["input-worker"]
+
+
+@pytest.mark.parametrize("body", [{}, {"rx": 1.5, "ry": 0.5}])
+def test_mouse_click_rejects_points_off_screen(system_client, auth_headers, injections, body):
+    r = system_client.post("/system/mouse-click", json=body, headers=auth_headers)
+    assert r.status_code == 400
+    assert injections() == []
+
+
+def test_input_routes_do_not_use_the_command_dispatcher(media_client, system_client, auth_headers, monkeypatch):
+    from src.services.command_dispatcher import command_dispatcher
+    monkeypatch.setattr(system_controller, "display_geometry", FakeGeometry())
+    before = command_dispatcher.stats()
+    media_client.post("/media/up", headers=auth_headers)
+    system_client.post("/system/mouse-click", json={"rx": 0.1, "ry": 0.1}, headers=auth_headers)
+    assert command_dispatcher.stats()["lanes"] == before["lanes"]
+    assert "input" not in before["lanes"]
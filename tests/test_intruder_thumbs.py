@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from config import INTRUDER_THUMB_SIZES  # noqa: E402
+from src.services import intruder_thumbs  # noqa: E402
+from src.services.intruder_thumbs import ThumbnailCache, thumb_path  # noqa: E402
+
+
+class FakeCodec:
+    """cv2 stand-in: counts decodes, can hold them until released, fails on b"bad"."""
+
+    def __init__(self):
+        self.decodes = 0
+        self.release = threading.Event()
+        self.release.set()
+        self._lock = threading.Lock()
+
+    def imread(self, path, flags):
+        with self._lock:
+            self.decodes += 1
+        self.release.wait(5)
+        with open(path, "rb") as f:
+            if f.read() == b"bad":
+                return None
+        return np.zeros((1800, 2880, 3), np.uint8)
+
+    @staticmethod
+    def resize(image, size, interpolation=None):
+        return np.zeros((size[1], size[0], 3), np.uint8)
+
+    @staticmethod
+    def imencode(ext, image, params):
+        return True, np.frombuffer(repr(image.shape).encode(), np.uint8)
+
+
+@pytest.fixture
+def codec(monkeypatch):
+    codec = FakeCodec()
+    for name in ("imread", "resize", "imencode"):
+        monkeypatch.setattr(intruder_thumbs.cv2, name, getattr(codec, name))
+    return codec
+
+
+@pytest.fixture
+def session(tmp_path):
+    path = tmp_path / "session_2026-01-01_10-00-00_000001"
+    path.mkdir()
+    (path / "screenshot.png").write_bytes(b"png")
+    return str(path)
+
+
+def test_one_decode_produces_every_size(codec, session):
+    cache = ThumbnailCache(workers=2)
+    path = cache.get(session, "screenshot.png", "small", timeout=5)
+    assert path == thumb_path(session, "screenshot.png", "small")
+    for size in INTRUDER_THUMB_SIZES:
+        assert os.path.isfile(thumb_path(session, "screenshot.png", size))
+    assert codec.decodes == 1
+
+
+def test_concurrent_requests_share_one_generation(codec, session):
+    codec.release.clear()
+    cache = ThumbnailCache(workers=4)
+    futures = [cache.ensure(session, "screenshot.png") for _ in range(5)]
+    assert all(f is futures[0] for f in futures)
+
+    results = []
+    readers = [threading.Thread(target=lambda s=s: results.append(cache.get(session, "screenshot.png", s, 5)))
+               for s in INTRUDER_THUMB_SIZES]
+    for t in readers:
+        t.start()
+    time.sleep(0.05)
+    codec.release.set()
+    for t in readers:
+        t.join(5)
+    assert len(results) == len(INTRUDER_THUMB_SIZES)
+    assert codec.decodes == 1
+
+
+def test_existing_thumbnails_are_not_regenerated(codec, session):
+    cache = ThumbnailCache(workers=1)
+    cache.get(session, "screenshot.png", "large", timeout=5)
+    assert cache.ensure(session, "screenshot.png") is None
+    cache.get(session, "screenshot.png", "medium", timeout=5)
+    assert codec.decodes == 1
+
+
+def test_failed_source_is_not_retried_until_it_changes(codec, session):
+    source = os.path.join(session, "webcam.jpg")
+    with open(source, "wb") as f:
+        f.write(b"bad")
+    cache = ThumbnailCache(workers=1)
+    with pytest.raises(ValueError):
+        cache.get(session, "webcam.jpg", "small", timeout=5)
+    time.sleep(0.05)  # let the done-callback record the failure
+    with pytest.raises(ValueError):
+        cache.get(session, "webcam.jpg", "small", timeout=5)
+    assert codec.decodes == 1
+
+    with open(source, "wb") as f:
+        f.write(b"jpg")
+    later = time.time() + 5
+    os.utime(source, (later, later))
+    assert os.path.isfile(cache.get(session, "webcam.jpg", "small", timeout=5))
+    assert codec.decodes == 2
+
+
+def test_backfill_checks_each_session_once(codec, session, monkeypatch):
+    cache = ThumbnailCache(workers=1)
+    scheduled = []
+    monkeypatch.setattr(cache, "schedule_session", scheduled.append)
+    for _ in range(3):
+        cache.backfill([session])
+    time.sleep(0.1)
+    assert scheduled == [session]
+
+
+def test_missing_source_is_not_found(codec, session):
+    cache = ThumbnailCache(workers=1)
+    with pytest.raises(FileNotFoundError):
+        cache.get(session, "webcam.jpg", "small", timeout=5)
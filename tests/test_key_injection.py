@@ -0,0 +1,170 @@
+import sys
+
+import pytest
+
+from src.utils import key_injection
+from src.utils.key_injection import BackendUnsupported, FakeBackend
+
+
+@pytest.fixture
+def fake_keys():
+    backend = FakeBackend()
+    previous = key_injection.set_backend(backend)
+    yield backend
+    key_injection.set_backend(previous)
+
+
+def test_press_key_route_injects_combo(system_client, auth_headers, fake_keys):
+    r = system_client.post("/system/pressKey", json={"key": "c", "modifiers": ["cmd", "shift"]},
+                           headers=auth_headers)
+    assert r.status_code == 200
+    assert fake_keys.events == [("press", "c", ("cmd", "shift"))]
+
+
+def test_press_key_route_named_key_without_modifiers(system_client, auth_headers, fake_keys):
+    r = system_client.post("/system/pressKey", json={"key": "tab"}, headers=auth_headers)
+    assert r.status_code == 200
+    assert fake_keys.events == [("press", "tab", ())]
+
+
+@pytest.mark.parametrize("key", [None, "", "notakey"])
+def test_press_key_route_rejects_unknown_keys(system_client, auth_headers, fake_keys, key):
+    r = system_client.post("/system/pressKey", json={"key": key}, headers=auth_headers)
+    assert r.status_code == 400
+    assert fake_keys.events == []
+
+
+def test_press_key_route_requires_auth(system_client, fake_keys):
+    r = system_client.post("/system/pressKey", json={"key": "c"})
+    assert r.status_code == 401
+    assert fake_keys.events == []
+
+
+def test_brightness_keys_post_raw_key_codes(system_client, auth_headers, fake_keys):
+    assert system_client.post("/system/brightness-up", headers=auth_headers).status_code == 200
+    assert system_client.post("/system/brightness-down", headers=auth_headers).status_code == 200
+    assert fake_keys.events == [("code", 144, ()), ("code", 145, ())]
+
+
+def test_unsupported_keys_fall_back_to_osascript(monkeypatch, fake_keys):
+    class NativeWithoutChar(FakeBackend):
+        def press(self, key, modifiers=()):
+            raise BackendUnsupported(key)
+
+    fallback = FakeBackend()
+    monkeypatch.setattr(key_injection, "_fallback", fallback)
+    key_injection.set_backend(NativeWithoutChar())
+    key_injection.press_key("é", ["option"])
+    assert fallback.events == [("press", "é", ("option",))]
+
+
+class FakeQuartz:
+    """Quartz module stand-in recording posted key events as (code, down, flags)."""
+
+    kCGEventSourceStateHIDSystemState = 1
+    kCGHIDEventTap = 0
+
+    def __init__(self):
+        self.posted = []
+
+    def CGEventSourceCreate(self, state):
+        return "source"
+
+    def CGEventCreateKeyboardEvent(self, source, code, down):
+        return {"code": code, "down": down}
+
+    def CGEventKeyboardSetUnicodeString(self, event, length, text):
+        event["text"] = text
+
+    def CGEventSetFlags(self, event, flags):
+        event["flags"] = flags
+
+    def CGEventPost(self, tap, event):
+        self.posted.append((event["code"], event["down"], event["flags"]))
+
+
+# Key code -> (unshifted, shifted) text for the few keys the tests use
+US = {0: ("a", "A"), 9: ("v", "V"), 12: ("q", "Q"), 18: ("1", "!"), 24: ("=", "+")}
+AZERTY = {0: ("q", "Q"), 9: ("v", "V"), 12: ("a", "A"), 18: ("&", "1"), 24: ("-", "_")}
+
+
+class FakeLayoutSource:
+    def __init__(self, layout_id, keys):
+        self.layout_id = layout_id
+        self.keys = keys
+        self.builds = 0
+
+    def current_id(self):
+        return self.layout_id
+
+    def translator(self):
+        self.builds += 1
+        keys = self.keys
+        return lambda code, shifted: keys.get(code, ("", ""))[shifted]
+
+
+@pytest.fixture
+def quartz(monkeypatch):
+    fake = FakeQuartz()
+    monkeypatch.setitem(sys.modules, "Quartz", fake)
+    return fake
+
+
+CMD = key_injection.MODIFIER_FLAGS["cmd"]
+SHIFT = key_injection.MODIFIER_FLAGS["shift"]
+CMD_KEY = key_injection.KEY_CODES["cmd"]
+
+
+def test_shortcut_uses_the_layout_key_for_the_character(quartz):
+    source = FakeLayoutSource("com.apple.keylayout.French", AZERTY)
+    backend = key_injection.QuartzBackend(layout=key_injection.KeyboardLayout(source))
+    backend.press("a", ["cmd"])
+    assert quartz.posted == [(CMD_KEY, True, CMD), (12, True, CMD), (12, False, CMD), (CMD_KEY, False, 0)]
+
+
+def test_shifted_character_adds_shift(quartz):
+    source = FakeLayoutSource("com.apple.keylayout.French", AZERTY)
+    backend = key_injection.QuartzBackend(layout=key_injection.KeyboardLayout(source))
+    backend.press("1", ["cmd"])
+    assert (18, True, CMD | SHIFT) in quartz.posted
+
+
+def test_layout_map_is_cached_and_rebuilt_on_layout_change(quartz):
+    source = FakeLayoutSource("com.apple.keylayout.US", US)
+    backend = key_injection.QuartzBackend(layout=key_injection.KeyboardLayout(source))
+    backend.press("a", ["cmd"])
+    backend.press("v", ["cmd"])
+    assert source.builds == 1
+    assert [code for code, _, _ in quartz.posted if code != CMD_KEY] == [0, 0, 9, 9]
+
+    quartz.posted.clear()
+    source.layout_id, source.keys = "com.apple.keylayout.French", AZERTY
+    backend.press("a", ["cmd"])
+    assert source.builds == 2
+    assert (12, True, CMD) in quartz.posted
+
+
+def test_keypad_only_fills_gaps_in_the_main_keys():
+    keys = {24: ("=", "+"), 69: ("+", "+"), 75: ("/", "/")}
+    chars = key_injection._build_char_map(lambda code, shifted: keys.get(code, ("", ""))[shifted])
+    assert chars == {"=": (24, False), "+": (24, True), "/": (75, False)}
+
+
+def test_character_missing_from_the_layout_falls_back_to_osascript(monkeypatch, quartz):
+    source = FakeLayoutSource("com.apple.keylayout.US", US)
+    fallback = FakeBackend()
+    monkeypatch.setattr(key_injection, "_fallback", fallback)
+    previous = key_injection.set_backend(key_injection.QuartzBackend(layout=key_injection.KeyboardLayout(source)))
+    try:
+        key_injection.press_key("é", ["option"])
+        key_injection.press_key("v", ["cmd"])
+    finally:
+        key_injection.set_backend(previous)
+    assert fallback.events == [("press", "é", ("option",))]
+    assert (9, True, CMD) in quartz.posted
+
+
+def test_printable_key_without_modifiers_is_posted_as_text(quartz):
+    backend = key_injection.QuartzBackend(layout=key_injection.KeyboardLayout(FakeLayoutSource("us", US)))
+    backend.press("é")
+    assert quartz.posted == [(0, True, 0), (0, False, 0)]
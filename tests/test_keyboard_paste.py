@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from src.controllers import system_controller
+from src.utils import key_injection
+from src.utils.key_injection import FakeBackend
+
+DELAY = 0.2
+
+
+class FakeClipboard:
+    def __init__(self, text):
+        self.text = text
+        self.writes = []
+
+    def get(self):
+        return self.text
+
+    def set(self, text):
+        self.text = text
+        self.writes.append(text)
+
+
+@pytest.fixture
+def clipboard(monkeypatch):
+    clipboard = FakeClipboard("original")
+    monkeypatch.setattr(system_controller, "get_clipboard", clipboard.get)
+    monkeypatch.setattr(system_controller, "set_clipboard", clipboard.set)
+    monkeypatch.setattr(system_controller, "KEYBOARD_PASTE_RESTORE_DELAY", DELAY)
+    monkeypatch.setattr(system_controller, "_paste_restore", None)
+    return clipboard
+
+
+@pytest.fixture
+def fake_keys():
+    backend = FakeBackend()
+    previous = key_injection.set_backend(backend)
+    yield backend
+    key_injection.set_backend(previous)
+
+
+def test_clipboard_is_restored_after_the_paste(clipboard, fake_keys):
+    system_controller.inject_paste("hello")
+    assert clipboard.text == "hello"
+    assert fake_keys.events == [("press", "v", ("cmd",))]
+    time.sleep(DELAY * 2)
+    assert clipboard.writes == ["hello", "original"]
+
+
+def test_overlapping_pastes_restore_the_original_once(clipboard, fake_keys):
+    system_controller.inject_paste("one")
+    time.sleep(DELAY / 2)
+    system_controller.inject_paste("two")
+    time.sleep(DELAY / 2)
+    system_controller.inject_paste("three")
+    time.sleep(DELAY * 0.6)
+    assert clipboard.text == "three"  # the first timer would have fired by now
+    time.sleep(DELAY * 2)
+    assert clipboard.writes == ["one", "two", "three", "original"]
+    assert len(fake_keys.events) == 3
+
+
+def test_paste_without_restore_cancels_the_pending_restore(clipboard, fake_keys):
+    system_controller.inject_paste("one")
+    system_controller.inject_paste("keep me", restore_clipboard=False)
+    time.sleep(DELAY * 2)
+    assert clipboard.writes == ["one", "keep me"]
+
+
+def test_non_text_clipboard_is_left_as_the_pasted_text(clipboard, fake_keys):
+    clipboard.text = ""
+    system_controller.inject_paste("hello")
+    time.sleep(DELAY * 2)
+    assert clipboard.writes == ["hello"]
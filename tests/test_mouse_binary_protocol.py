@@ -0,0 +1,74 @@
+import pytest
+
+from src.controllers.mouse_controller import _handle_binary, BIN_RECORD, BIN_OP_TIMESTAMP
+
+RECEIVED_AT = 12.5
+RECEIVED_WALL = 1_760_000_000_123.0  # epoch ms
+
+
+class RecordingCoalescer:
+    def __init__(self):
+        self.events = []
+
+    def handle(self, t, b=None, dx=0, dy=0, received=None):
+        self.events.append((t, b, dx, dy, received))
+
+
+def frame(*records):
+    return b"".join(BIN_RECORD.pack(*r) for r in records)
+
+
+def _int16(v):
+    return v - 0x10000 if v >= 0x8000 else v
+
+
+def timestamp_record(epoch_ms):
+    """Opcode 16: low/high 16 bits of (epoch ms mod 2^32) in dx/dy."""
+    low32 = int(epoch_ms) % 2**32
+    return BIN_OP_TIMESTAMP, 0, _int16(low32 & 0xFFFF), _int16(low32 >> 16)
+
+
+def decode(*records, wall=RECEIVED_WALL):
+    coalescer = RecordingCoalescer()
+    _handle_binary(coalescer, frame(*records), RECEIVED_AT, wall)
+    return coalescer.events
+
+
+def test_records_decode_to_events_in_order():
+    received = (RECEIVED_AT, RECEIVED_WALL, None)
+    assert decode((1, 0, -5, 7), (3, 0, 0, -120), (2, 1, 0, 0), (4, 0, 0, 0), (5, 0, 0, 0),
+                  (6, 0, 100, 32767)) == [
+        ("move", "left", -5, 7, received),
+        ("scroll", "left", 0, -120, received),
+        ("click", "right", 0, 0, received),
+        ("down", "left", 0, 0, received),
+        ("up", "left", 0, 0, received),
+        ("moveto", "left", 100, 32767, received),
+    ]
+
+
+def test_deltas_are_signed_16_bit():
+    assert [e[2:4] for e in decode((1, 0, -32768, 32767))] == [(-32768, 32767)]
+
+
+def test_timestamp_record_applies_to_the_records_after_it():
+    sent = RECEIVED_WALL - 42
+    events = decode((1, 0, 1, 1), timestamp_record(sent), (4, 0, 0, 0), (5, 0, 0, 0))
+    assert [e[4][2] for e in events] == [None, sent, sent]
+
+
+def test_timestamp_survives_the_32_bit_wrap():
+    wall = float(2**32 * 400 + 10)  # just after the low 32 bits wrapped
+    sent = wall - 30                # sent just before
+    events = decode(timestamp_record(sent), (1, 0, 1, 0), wall=wall)
+    assert events[0][4][2] == sent
+
+
+def test_frame_length_must_be_a_multiple_of_the_record_size():
+    with pytest.raises(ValueError):
+        _handle_binary(RecordingCoalescer(), frame((1, 0, 1, 1)) + b"\x01", RECEIVED_AT, RECEIVED_WALL)
+
+
+def test_unknown_opcode_is_rejected():
+    with pytest.raises(ValueError):
+        decode((99, 0, 0, 0))
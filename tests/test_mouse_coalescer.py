@@ -0,0 +1,101 @@
+import pytest
+
+from src.controllers import mouse_controller
+from src.controllers.mouse_controller import _MouseCoalescer, MOVETO_SCALE
+from src.utils.input_metrics import ConnectionStats
+
+
+class RecordingMouse:
+    """Stands in for pynput's mouse Controller: records injections in order."""
+
+    def __init__(self):
+        self.ops = []
+
+    @property
+    def position(self):
+        return None
+
+    @position.setter
+    def position(self, value):
+        self.ops.append(("moveto", value))
+
+    def move(self, dx, dy):
+        self.ops.append(("move", (dx, dy)))
+
+    def scroll(self, dx, dy):
+        self.ops.append(("scroll", (dx, dy)))
+
+    def click(self, button, count=1):
+        self.ops.append(("click", button))
+
+    def press(self, button):
+        self.ops.append(("down", button))
+
+    def release(self, button):
+        self.ops.append(("up", button))
+
+
+class FakeGeometry:
+    """Primary display of 1000x500 points at the origin."""
+
+    def to_screen(self, rx, ry):
+        return rx * 1000, ry * 500
+
+
+@pytest.fixture
+def mouse(monkeypatch):
+    mouse = RecordingMouse()
+    monkeypatch.setattr(mouse_controller, "_mouse", mouse)
+    monkeypatch.setattr(mouse_controller, "_BUTTONS", {"left": "left", "right": "right"})
+    monkeypatch.setattr(mouse_controller, "display_geometry", FakeGeometry())
+    return mouse
+
+
+def test_moves_and_scrolls_are_summed_until_flush(mouse):
+    coalescer = _MouseCoalescer(ConnectionStats(1, "mouse_ws"))
+    coalescer.handle("move", dx=3, dy=4)
+    coalescer.handle("move", dx=1, dy=-1)
+    coalescer.handle("scroll", dx=0, dy=-2)
+    coalescer.handle("scroll", dx=0, dy=-3)
+    assert mouse.ops == []
+    assert coalescer.pending
+
+    coalescer.flush()
+    assert mouse.ops == [("move", (4, 3)), ("scroll", (0, -5))]
+    assert not coalescer.pending
+
+
+def test_button_events_flush_pending_motion_first(mouse):
+    coalescer = _MouseCoalescer(ConnectionStats(1, "mouse_ws"))
+    coalescer.handle("move", dx=10, dy=0)
+    coalescer.handle("click", b="right")
+    coalescer.handle("scroll", dx=0, dy=1)
+    coalescer.handle("down", b="left")
+    coalescer.handle("move", dx=5, dy=5)
+    coalescer.handle("up", b="left")
+    assert mouse.ops == [
+        ("move", (10, 0)), ("click", "right"),
+        ("scroll", (0, 1)), ("down", "left"),
+        ("move", (5, 5)), ("up", "left"),
+    ]
+    assert coalescer.stats.injections == 6
+    assert coalescer.stats.events == 6
+
+
+def test_moveto_replaces_earlier_motion(mouse):
+    coalescer = _MouseCoalescer(ConnectionStats(1, "mouse_ws"))
+    coalescer.handle("move", dx=50, dy=50)
+    coalescer.handle("moveto", dx=MOVETO_SCALE // 4, dy=MOVETO_SCALE)
+    coalescer.handle("moveto", dx=MOVETO_SCALE // 2, dy=MOVETO_SCALE // 2)
+    coalescer.handle("move", dx=2, dy=0)
+    coalescer.flush()
+    assert [op for op, _ in mouse.ops] == ["moveto", "move"]
+    assert mouse.ops[0][1] == pytest.approx((500, 250), abs=0.1)
+    assert mouse.ops[1][1] == (2, 0)
+
+
+def test_flush_with_nothing_pending_injects_nothing(mouse):
+    coalescer = _MouseCoalescer(ConnectionStats(1, "mouse_ws"))
+    coalescer.flush()
+    assert mouse.ops == []
+    assert coalescer.stats.injections == 0
@@ -0,0 +1,57 @@
+import pytest
+
+import replay_input
+
+
+def test_typed_text_reaches_the_fake_keyboard(system_client, auth_headers, injections):
+    r = system_client.post("/system/keyboardType", json={"text": "hello"}, headers=auth_headers)
+    assert r.status_code == 200
+    r = system_client.post("/system/keyboardType", json={"key": "enter"}, headers=auth_headers)
+    assert r.status_code == 200
+    assert injections() == [("type", "hello"), ("key_down", "enter"), ("key_up", "enter")]
+
+
+def test_reset_injections_forgets_earlier_ops(system_client, auth_headers, injections):
+    system_client.post("/system/keyboardType", json={"text": "a"}, headers=auth_headers)
+    replay_input.reset_injections()
+    assert injections() == []
+
+
+def test_fake_clipboard_round_trips(monkeypatch):
+    from src.utils import clipboard
+    monkeypatch.setattr(clipboard, "get_clipboard", clipboard.get_clipboard)
+    monkeypatch.setattr(clipboard, "set_clipboard", clipboard.set_clipboard)
+    replay_input.install_fake_clipboard()
+    clipboard.set_clipboard("copied")
+    assert clipboard.get_clipboard() == "copied"
+
+
+def test_percentiles_pick_from_sorted_values():
+    assert replay_input.percentiles([]) == {"count": 0}
+    report = replay_input.percentiles([5.0, 1.0, 3.0, 2.0, 4.0])
+    assert report == {"count": 5, "p50_ms": 3.0, "p90_ms": 5.0, "p99_ms": 5.0, "max_ms": 5.0}
+
+
+@pytest.fixture
+def sessions_dir(monkeypatch, tmp_path):
+    from src.services.input_recorder import session_recorder
+    monkeypatch.setattr(session_recorder, "directory", str(tmp_path))
+    yield tmp_path
+    session_recorder.stop()
+
+
+def test_recorded_session_replays_its_http_events(system_client, auth_headers, sessions_dir):
+    r = system_client.post("/system/input/record/start", json={"name": "bench_1"}, headers=auth_headers)
+    assert r.status_code == 200
+    system_client.post("/system/keyboardType", json={"text": "hi"}, headers=auth_headers)
+    summary = system_client.post("/system/input/record/stop", headers=auth_headers).get_json()
+    assert summary["path"] == str(sessions_dir / "bench_1.jsonl")
+    connections = replay_input.load_session(summary["path"])
+    assert [e["body"] for e in connections["http"]["events"]] == [{"text": "hi"}]
+
+
+@pytest.mark.parametrize("name", ["bench\n", "../escape", "", "x" * 65, 123, ["a"]])
+def test_record_start_rejects_bad_session_names(system_client, auth_headers, sessions_dir, name):
+    r = system_client.post("/system/input/record/start", json={"name": name}, headers=auth_headers)
+    assert r.status_code == 400
+    assert list(sessions_dir.iterdir()) == []
@@ -0,0 +1,68 @@
+import threading
+import time
+
+from src.services.slider_setter import SliderSetter, slider_stats
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+def test_latest_value_wins_during_a_slow_apply():
+    applied = []
+    busy = threading.Event()
+    release = threading.Event()
+
+    def apply(value):
+        applied.append(value)
+        busy.set()
+        release.wait(2)
+
+    setter = SliderSetter("test_latest_wins", apply, min_interval=0.01)
+    setter.set(10)
+    assert busy.wait(2)
+    for value in (20, 30, 40):
+        setter.set(value)
+    release.set()
+    wait_until(lambda: setter.stats()["applied"] == 2)
+    time.sleep(0.05)
+
+    assert applied == [10, 40]
+    stats = setter.stats()
+    assert stats["received"] == 4
+    assert stats["discarded"] == 2
+    assert stats["last_applied"] == 40
+    assert stats["pending"] is None
+
+
+def test_applies_at_most_once_per_min_interval():
+    times = []
+    setter = SliderSetter("test_rate_limit", lambda value: times.append(time.monotonic()), min_interval=0.1)
+    setter.set(1)
+    wait_until(lambda: len(times) == 1)
+    setter.set(2)
+    setter.set(3)
+    wait_until(lambda: len(times) == 2)
+    assert times[1] - times[0] >= 0.1 - 0.005
+    assert setter.stats()["last_applied"] == 3
+
+
+def test_errors_are_counted_and_the_next_value_still_applies():
+    applied = []
+
+    def apply(value):
+        if value < 0:
+            raise ValueError("out of range")
+        applied.append(value)
+
+    setter = SliderSetter("test_errors", apply, min_interval=0.01)
+    setter.set(-1)
+    wait_until(lambda: setter.stats()["errors"] == 1)
+    setter.set(5)
+    wait_until(lambda: applied == [5])
+    assert setter.stats()["last_error"] == "out of range"
+    assert "test_errors" in slider_stats()
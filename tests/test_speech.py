@@ -0,0 +1,69 @@
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from src.utils.speech import ANNOUNCEMENTS, SpeechWorker
+
+
+class FakeEngine:
+    """pyttsx3 engine stand-in: records phrases, runAndWait blocks until released."""
+
+    def __init__(self):
+        self.said = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def setProperty(self, name, value):
+        pass
+
+    def say(self, text):
+        self.said.append(text)
+
+    def runAndWait(self):
+        self.release.wait(5)
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setitem(sys.modules, "pyttsx3", types.SimpleNamespace(init=lambda: engine))
+    return engine
+
+
+@pytest.fixture
+def warmed(monkeypatch):
+    """Announcements 'loaded' by the worker (no synthesis on Linux)."""
+    loaded = []
+    monkeypatch.setattr(SpeechWorker, "_load_clip", lambda self, text: loaded.append(text))
+    return loaded
+
+
+def test_announcements_are_warmed_when_the_worker_is_created(engine, warmed):
+    SpeechWorker()
+    wait_until(lambda: warmed == ANNOUNCEMENTS)
+    assert engine.said == []
+
+
+def test_pending_phrase_with_the_same_key_is_superseded(engine, warmed):
+    worker = SpeechWorker()
+    wait_until(lambda: warmed == ANNOUNCEMENTS)
+    engine.release.clear()
+    worker.say("busy")
+    wait_until(lambda: engine.said == ["busy"])  # the worker is now inside runAndWait
+
+    worker.say("Keyboard is disabled.", key="keyboard")
+    worker.say("Keyboard is enabled.", key="keyboard")
+    engine.release.set()
+    wait_until(lambda: worker.stats["spoken"] == 2)
+    assert engine.said == ["busy", "Keyboard is enabled."]
+    assert worker.stats["superseded"] == 1
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+from flask import Flask
+
+from src.services import system_stats
+from src.services.system_stats import ProcProvider, SystemStatsSampler
+
+
+class FakeProvider:
+    name = "fake"
+
+    def __init__(self):
+        self.n = 0
+
+    def sample(self):
+        self.n += 1
+        return {"cpu": 10.0 * self.n, "memory": 50.0, "disk": 20.0, "load": 1.5}
+
+
+def wait_for_samples(sampler, count, timeout=5):
+    deadline = time.monotonic() + timeout
+    while sampler.stats()["samples"] < count:
+        assert time.monotonic() < deadline, "sampler produced no samples"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def sampler():
+    s = SystemStatsSampler(provider_factory=FakeProvider, interval=0.01, history_seconds=1)
+    s.ensure_started()
+    wait_for_samples(s, 4)
+    return s
+
+
+@pytest.fixture
+def stats_client(monkeypatch, sampler):
+    from src.controllers import snapshot_controller
+    monkeypatch.setattr(snapshot_controller, "system_stats", sampler)
+    app = Flask(__name__)
+    app.register_blueprint(snapshot_controller.snapshot_bp, url_prefix="/system")
+    return app.test_client()
+
+
+def test_proc_provider_reads_cpu_and_memory(tmp_path):
+    (tmp_path / "stat").write_text("cpu  100 0 100 800 0 0 0 0 0 0\n")
+    (tmp_path / "meminfo").write_text("MemTotal: 1000 kB\nMemFree: 100 kB\nMemAvailable: 250 kB\n")
+    provider = ProcProvider(root=str(tmp_path))
+    (tmp_path / "stat").write_text("cpu  150 0 150 900 0 0 0 0 0 0\n")  # 100 busy of 200
+    sample = provider.sample()
+    assert sample["cpu"] == pytest.approx(50.0)
+    assert sample["memory"] == pytest.approx(75.0)
+
+
+def test_history_averages_into_buckets(sampler):
+    history = sampler.history(window=1, points=2)
+    assert len(history["time"]) == 2
+    assert history["memory"] == [50.0, 50.0]
+    assert history["cpu"][0] < history["cpu"][1]
+    assert set(history) == {"time", *system_stats.METRICS}
+
+
+def test_stats_route_returns_current_sample(stats_client, auth_headers):
+    r = stats_client.post("/system/stats", headers=auth_headers)
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["current"]["memory"] == 50.0
+    assert "history" not in body
+
+
+def test_stats_route_returns_history(stats_client, auth_headers):
+    r = stats_client.post("/system/stats", json={"window": 1, "points": 3}, headers=auth_headers)
+    assert r.status_code == 200
+    history = r.get_json()["history"]
+    assert 1 <= len(history["time"]) <= 3
+    assert history["load"][0] == 1.5
+
+
+@pytest.mark.parametrize("body", [{"window": 0}, {"points": -1}, {"window": "soon"}])
+def test_stats_route_rejects_bad_history_params(stats_client, auth_headers, body):
+    r = stats_client.post("/system/stats", json=body, headers=auth_headers)
+    assert r.status_code == 400
+
+
+def test_stats_route_requires_auth(stats_client):
+    assert stats_client.post("/system/stats").status_code == 401